@@ -1,10 +1,15 @@
 import csv
+import dataclasses
 
 def export_to_csv(data, output_file):
     def flatten(data, parent_key='', sep='.'):
         items = []
         for k, v in data.items():
             new_key = f'{parent_key}{sep}{k}' if parent_key else k
+            if dataclasses.is_dataclass(v) and not isinstance(v, type):
+                v = dataclasses.asdict(v)
+            if isinstance(v, memoryview):
+                v = v.tobytes()
             if isinstance(v, dict):
                 items.extend(flatten(v, new_key, sep=sep).items())
             elif isinstance(v, list):
@@ -1,11 +1,14 @@
 import json
 import base64
+import dataclasses
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj, bytes):
+        if isinstance(obj, (bytes, memoryview)):
             return base64.b64encode(obj).decode('utf-8')
         if isinstance(obj, (set, frozenset)):
             return list(obj)
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return dataclasses.asdict(obj)
         return super().default(obj)
 
 def export_to_json(data, filename):
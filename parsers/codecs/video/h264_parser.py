@@ -2,7 +2,11 @@ import re
 import math
 import struct
 
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
 import bitstring.exceptions
+import numpy as np
 from bitstring import BitStream, BitArray, ReadError
 
 NAL_UNIT_TYPES = {
@@ -22,6 +26,12 @@ NAL_UNIT_TYPES = {
     19: "Coded slice of an auxiliary coded picture without partitioning",
 }
 
+# Upper bounds for the terminator-delimited loops in the slice header.
+# Reference lists hold at most 32 entries; the mmco bound is generous since the
+# spec only limits it indirectly through max_num_ref_frames (<= 16).
+MAX_REF_PIC_LIST_MODIFICATIONS = 32
+MAX_MMCO_OPERATIONS = 64
+
 def read_ue_safe(bs):
     if bs.pos < bs.len:
         try:
@@ -32,6 +42,43 @@ def read_ue_safe(bs):
             return None
     return None
 
+def _build_ue_lut():
+    # Entry for each 16-bit window: (codeNum << 8) | code length, 0 when the code is longer than 15 bits
+    lut = [0] * 65536
+    for k in range(8):
+        length = 2 * k + 1
+        span = 1 << (16 - length)
+        for suffix in range(1 << k):
+            code = (1 << k) | suffix
+            base = code << (16 - length)
+            lut[base:base + span] = [((code - 1) << 8) | length] * span
+    return lut
+
+_UE_LUT = _build_ue_lut()
+
+# (Cb, Cr) fallback for references without explicit chroma weights or offsets; copied per
+# reference so the results stay lists
+_ZERO_PAIR = (0, 0)
+
+def read_ue_fast(bs):
+    pos = bs.pos
+    if bs.len - pos >= 16:
+        entry = _UE_LUT[bs[pos:pos + 16].uint]
+        if entry:
+            bs.pos = pos + (entry & 0xFF)
+            return entry >> 8
+    return read_ue_safe(bs)
+
+def read_se_fast(bs):
+    pos = bs.pos
+    if bs.len - pos >= 16:
+        entry = _UE_LUT[bs[pos:pos + 16].uint]
+        if entry:
+            bs.pos = pos + (entry & 0xFF)
+            k = entry >> 8
+            return (k + 1) >> 1 if k & 1 else -(k >> 1)
+    return read_se_safe(bs)
+
 def read_se_safe(bs):
     if bs.pos < bs.len:
         try:
@@ -165,18 +212,13 @@ def find_start_codes(data):
     return start_codes
 
 def remove_emulation_prevention_bytes(data):
-    # 0x000003 is the emulation prevention sequence
-    i = 0
-    output = bytearray()
-    while i < len(data):
-        # Look for the sequence 0x000003
-        if i < len(data) - 2 and data[i] == 0x00 and data[i+1] == 0x00 and data[i+2] == 0x03:
-            output.extend(data[i:i+2])
-            i += 3  # Skip the 0x03 byte
-        else:
-            output.append(data[i])
-            i += 1
-    return bytes(output)
+    # 0x000003 is the emulation prevention sequence; drop every 0x03 preceded by two zero bytes
+    data = bytes(data)
+    if b'\x00\x00\x03' not in data:
+        return data
+    a = np.frombuffer(data, dtype=np.uint8)
+    mask = (a[:-2] == 0) & (a[1:-1] == 0) & (a[2:] == 3)
+    return np.delete(a, np.flatnonzero(mask) + 2).tobytes()
 
 def parse_h264_nal_units(video_stream_data, sps, pps):
     nal_units = []
@@ -207,6 +249,7 @@ def parse_h264_nal_units(video_stream_data, sps, pps):
     parsed_filler_data = []
     parsed_sps_extension = []
     parsed_aux_slice = []
+    aux_slice_parser = None
 
     count = 0
     for nal in nal_units:
@@ -228,6 +271,7 @@ def parse_h264_nal_units(video_stream_data, sps, pps):
             elif sps is not None:
                 parsed_sps = parse_sps(sps)
                 nal['parsed_data'] = parsed_sps
+            aux_slice_parser = None
         elif nal_type == 8:  # PPS
             if pps is None:
                 parsed_pps = parse_pps(nal_data, parsed_sps)
@@ -235,6 +279,7 @@ def parse_h264_nal_units(video_stream_data, sps, pps):
             elif pps is not None:
                 parsed_pps = parse_pps(pps, parsed_sps)
                 nal['parsed_data'] = parsed_pps
+            aux_slice_parser = None
         elif nal_type == 6:  # SEI
             sei_data = parse_sei(nal_data)
             parsed_sei.extend(sei_data)
@@ -264,7 +309,9 @@ def parse_h264_nal_units(video_stream_data, sps, pps):
             parsed_sps_extension.append(sps_extension)
             nal['parsed_data'] = sps_extension
         elif nal_type == 19:  # Auxiliary slice
-            aux_slice = parse_aux_slice(nal_data, parsed_sps, parsed_pps)
+            if aux_slice_parser is None:
+                aux_slice_parser = make_aux_slice_parser(parsed_sps, parsed_pps)
+            aux_slice = aux_slice_parser(nal_data)
             parsed_aux_slice.append(aux_slice)
             nal['parsed_data'] = aux_slice
         else:
@@ -517,22 +564,16 @@ def more_rbsp_data(data, bit_pos):
     Check if there is more RBSP data.
     """
     byte_pos = bit_pos // 8
-    bit_in_byte = bit_pos % 8
 
     if byte_pos >= len(data):
         return False
 
-    trailing_data = data[byte_pos:]
-
-    # Find the last significant bit equal to 1
-    last_significant_bit_pos = -1
-    for i in range(len(trailing_data) * 8 - 1, -1, -1):
-        if (trailing_data[i // 8] >> (7 - (i % 8))) & 0x01:
-            last_significant_bit_pos = i + byte_pos * 8
-            break
-
-    if last_significant_bit_pos == -1:
+    # Find the last significant bit equal to 1: the lowest set bit of the last non-zero byte
+    trailing_data = bytes(data[byte_pos:]).rstrip(b'\x00')
+    if not trailing_data:
         return False
+    last_byte = trailing_data[-1]
+    last_significant_bit_pos = (byte_pos + len(trailing_data)) * 8 - (last_byte & -last_byte).bit_length()
 
     # Check if there is more data before the rbsp_trailing_bits() structure
     return last_significant_bit_pos > bit_pos
@@ -669,40 +710,36 @@ def scaling_list_8x8(bs):
 
 
 def parse_sei(data):
-    bs = BitStream(data)
+    # SEI message headers and payloads are all whole bytes, so scan the buffer directly
+    buf = bytes(data)
+    end = len(buf)
+    offset = 0
     sei_messages = []
 
-    while bs.pos < bs.len:
+    while offset < end:
         sei_message = {}
 
-        # Read sei_payload_type
-        payload_type = 0
-        while True:
-            if bs.pos + 8 > bs.len:
-                return sei_messages
-            byte = read_uint_safe(bs, 8)
-            payload_type += byte
-            if byte != 0xFF:
-                break
-        sei_message['payload_type'] = payload_type
-
-        # Read sei_payload_size
-        payload_size = 0
-        while True:
-            if bs.pos + 8 > bs.len:
-                return sei_messages
-            byte = read_uint_safe(bs, 8)
-            payload_size += byte
-            if byte != 0xFF:
-                break
-        sei_message['payload_size'] = payload_size
+        # Read sei_payload_type and sei_payload_size: a run of 0xFF bytes plus one final byte each
+        for key in ('payload_type', 'payload_size'):
+            value = 0
+            while True:
+                if offset >= end:
+                    return sei_messages
+                byte = buf[offset]
+                offset += 1
+                value += byte
+                if byte != 0xFF:
+                    break
+            sei_message[key] = value
+        payload_size = sei_message['payload_size']
 
         # Ensure there is enough data for the payload
-        if bs.pos + payload_size * 8 > bs.len:
+        if offset + payload_size > end:
             raise ValueError("Insufficient data for reading sei_payload_data")
 
         # Read sei_payload_data
-        sei_message['payload_data'] = bs.read(f'bytes:{payload_size}')
+        sei_message['payload_data'] = buf[offset:offset + payload_size]
+        offset += payload_size
         sei_messages.append(sei_message)
 
     return sei_messages
@@ -1486,7 +1523,7 @@ def parse_ref_pic_list_mvc_modification(bs, slice_type):
         result['ref_pic_list_modification_flag_l0'] = flag_l0
         if flag_l0:
             modifications_l0 = []
-            while True:
+            for _ in range(MAX_REF_PIC_LIST_MODIFICATIONS + 1):
                 modification_of_pic_nums_idc = read_ue_safe(bs)
                 if modification_of_pic_nums_idc == 3:
                     break
@@ -1500,6 +1537,8 @@ def parse_ref_pic_list_mvc_modification(bs, slice_type):
                 elif modification_of_pic_nums_idc in [4, 5]:
                     item['abs_diff_view_idx_minus1'] = read_ue_safe(bs)
                 modifications_l0.append(item)
+            else:
+                raise ReadError('ref_pic_list_modification is not terminated')
             result['modifications_l0'] = modifications_l0
 
     # if( slice_type % 5 == 1 ) => B-slice
@@ -1508,7 +1547,7 @@ def parse_ref_pic_list_mvc_modification(bs, slice_type):
         result['ref_pic_list_modification_flag_l1'] = flag_l1
         if flag_l1:
             modifications_l1 = []
-            while True:
+            for _ in range(MAX_REF_PIC_LIST_MODIFICATIONS + 1):
                 modification_of_pic_nums_idc = read_ue_safe(bs)
                 if modification_of_pic_nums_idc == 3:
                     break
@@ -1522,6 +1561,8 @@ def parse_ref_pic_list_mvc_modification(bs, slice_type):
                 elif modification_of_pic_nums_idc in [4, 5]:
                     item['abs_diff_view_idx_minus1'] = read_ue_safe(bs)
                 modifications_l1.append(item)
+            else:
+                raise ReadError('ref_pic_list_modification is not terminated')
             result['modifications_l1'] = modifications_l1
 
     return result
@@ -1537,7 +1578,7 @@ def parse_ref_pic_list_modification(bs, slice_type):
         result['ref_pic_list_modification_flag_l0'] = flag_l0
         if flag_l0:
             modifications_l0 = []
-            while True:
+            for _ in range(MAX_REF_PIC_LIST_MODIFICATIONS + 1):
                 modification_of_pic_nums_idc = read_ue_safe(bs)
                 if modification_of_pic_nums_idc == 3:
                     break
@@ -1549,6 +1590,8 @@ def parse_ref_pic_list_modification(bs, slice_type):
                 elif modification_of_pic_nums_idc == 2:
                     item['long_term_pic_num'] = read_ue_safe(bs)
                 modifications_l0.append(item)
+            else:
+                raise ReadError('ref_pic_list_modification is not terminated')
             result['modifications_l0'] = modifications_l0
 
     # if( slice_type % 5 == 1 ) => B-slice
@@ -1557,7 +1600,7 @@ def parse_ref_pic_list_modification(bs, slice_type):
         result['ref_pic_list_modification_flag_l1'] = flag_l1
         if flag_l1:
             modifications_l1 = []
-            while True:
+            for _ in range(MAX_REF_PIC_LIST_MODIFICATIONS + 1):
                 modification_of_pic_nums_idc = read_ue_safe(bs)
                 if modification_of_pic_nums_idc == 3:
                     break
@@ -1569,6 +1612,8 @@ def parse_ref_pic_list_modification(bs, slice_type):
                 elif modification_of_pic_nums_idc == 2:
                     item['long_term_pic_num'] = read_ue_safe(bs)
                 modifications_l1.append(item)
+            else:
+                raise ReadError('ref_pic_list_modification is not terminated')
             result['modifications_l1'] = modifications_l1
 
     return result
@@ -1584,97 +1629,93 @@ def parse_pred_weight_table(bs, slice_header, sps, pps):
     nL1 = slice_header.get('num_ref_idx_l1_active_minus1', 0)
 
     # 1) luma_log2_weight_denom
-    luma_log2_weight_denom = read_ue_safe(bs)
+    luma_log2_weight_denom = read_ue_fast(bs)
     result['luma_log2_weight_denom'] = luma_log2_weight_denom
 
     # 2) chroma_log2_weight_denom (ChromaArrayType != 0 )
     if ChromaArrayType != 0:
-        chroma_log2_weight_denom = read_ue_safe(bs)
+        chroma_log2_weight_denom = read_ue_fast(bs)
         result['chroma_log2_weight_denom'] = chroma_log2_weight_denom
 
     # 3) L0
-    result['luma_weight_l0_flag'] = []
-    result['luma_weight_l0'] = []
-    result['luma_offset_l0'] = []
-    if ChromaArrayType != 0:
-        result['chroma_weight_l0_flag'] = []
-        result['chroma_weight_l0'] = []
-        result['chroma_offset_l0'] = []
-
-    for i in range(nL0 + 1):
-        lw_flag = read_bool_safe(bs)  # luma_weight_l0_flag
-        result['luma_weight_l0_flag'].append(lw_flag)
-        luma_weight = 0
-        luma_offset = 0
-        if lw_flag:
-            luma_weight = read_se_safe(bs)  # luma_weight_l0[i]
-            luma_offset = read_se_safe(bs)  # luma_offset_l0[i]
-        result['luma_weight_l0'].append(luma_weight)
-        result['luma_offset_l0'].append(luma_offset)
-
-        if ChromaArrayType != 0:
-            cw_flag = read_bool_safe(bs)  # chroma_weight_l0_flag
-            result['chroma_weight_l0_flag'].append(cw_flag)
-            if cw_flag:
-                cw_list = []
-                co_list = []
-                for j in range(2):
-                    cw_val = read_se_safe(bs)  # chroma_weight_l0[i][j]
-                    co_val = read_se_safe(bs)  # chroma_offset_l0[i][j]
-                    cw_list.append(cw_val)
-                    co_list.append(co_val)
-            else:
-                cw_list = [0, 0]
-                co_list = [0, 0]
-            if 'chroma_weight_l0' not in result:
-                result['chroma_weight_l0'] = []
-                result['chroma_offset_l0'] = []
-            result['chroma_weight_l0'].append(cw_list)
-            result['chroma_offset_l0'].append(co_list)
+    parse_pred_weight_list(bs, result, 'l0', nL0, ChromaArrayType)
 
     # 4) L1 (B-slice : slice_type % 5 == 1)
     if (slice_header['slice_type'] % 5) == 1:
-        result['luma_weight_l1_flag'] = []
-        result['luma_weight_l1'] = []
-        result['luma_offset_l1'] = []
-        if ChromaArrayType != 0:
-            result['chroma_weight_l1_flag'] = []
-            result['chroma_weight_l1'] = []
-            result['chroma_offset_l1'] = []
-
-        for i in range(nL1 + 1):
-            lw_flag = read_bool_safe(bs)  # luma_weight_l1_flag
-            result['luma_weight_l1_flag'].append(lw_flag)
-            luma_weight = 0
-            luma_offset = 0
-            if lw_flag:
-                luma_weight = read_se_safe(bs)  # luma_weight_l1[i]
-                luma_offset = read_se_safe(bs)  # luma_offset_l1[i]
-            result['luma_weight_l1'].append(luma_weight)
-            result['luma_offset_l1'].append(luma_offset)
-
-            if ChromaArrayType != 0:
-                cw_flag = read_bool_safe(bs)  # chroma_weight_l1_flag
-                result['chroma_weight_l1_flag'].append(cw_flag)
-                if cw_flag:
-                    cw_list = []
-                    co_list = []
-                    for j in range(2):
-                        cw_val = read_se_safe(bs)  # chroma_weight_l1[i][j]
-                        co_val = read_se_safe(bs)  # chroma_offset_l1[i][j]
-                        cw_list.append(cw_val)
-                        co_list.append(co_val)
-                else:
-                    cw_list = [0, 0]
-                    co_list = [0, 0]
-                if 'chroma_weight_l1' not in result:
-                    result['chroma_weight_l1'] = []
-                    result['chroma_offset_l1'] = []
-                result['chroma_weight_l1'].append(cw_list)
-                result['chroma_offset_l1'].append(co_list)
+        parse_pred_weight_list(bs, result, 'l1', nL1, ChromaArrayType)
 
     return result
 
+def parse_pred_weight_list(bs, result, lx, num_ref_idx_active_minus1, ChromaArrayType):
+    luma_weight_flag = []
+    luma_weight = []
+    luma_offset = []
+
+    if ChromaArrayType == 0:
+        # Monochrome: only luma weights are coded
+        for i in range(num_ref_idx_active_minus1 + 1):
+            lw_flag = read_bool_safe(bs)  # luma_weight_lX_flag
+            luma_weight_flag.append(lw_flag)
+            if lw_flag:
+                luma_weight.append(read_se_fast(bs))  # luma_weight_lX[i]
+                luma_offset.append(read_se_fast(bs))  # luma_offset_lX[i]
+            else:
+                luma_weight.append(0)
+                luma_offset.append(0)
+        result.update({
+            f'luma_weight_{lx}_flag': luma_weight_flag,
+            f'luma_weight_{lx}': luma_weight,
+            f'luma_offset_{lx}': luma_offset,
+        })
+        return
+
+    chroma_weight_flag = []
+    chroma_weight = []
+    chroma_offset = []
+
+    for i in range(num_ref_idx_active_minus1 + 1):
+        lw_flag = read_bool_safe(bs)  # luma_weight_lX_flag
+        luma_weight_flag.append(lw_flag)
+        if lw_flag:
+            luma_weight.append(read_se_fast(bs))  # luma_weight_lX[i]
+            luma_offset.append(read_se_fast(bs))  # luma_offset_lX[i]
+        else:
+            luma_weight.append(0)
+            luma_offset.append(0)
+
+        cw_flag = read_bool_safe(bs)  # chroma_weight_lX_flag
+        chroma_weight_flag.append(cw_flag)
+        if cw_flag:
+            cw_list = []
+            co_list = []
+            for j in range(2):
+                cw_list.append(read_se_fast(bs))  # chroma_weight_lX[i][j]
+                co_list.append(read_se_fast(bs))  # chroma_offset_lX[i][j]
+        else:
+            cw_list = list(_ZERO_PAIR)
+            co_list = list(_ZERO_PAIR)
+        chroma_weight.append(cw_list)
+        chroma_offset.append(co_list)
+
+    result.update({
+        f'luma_weight_{lx}_flag': luma_weight_flag,
+        f'luma_weight_{lx}': luma_weight,
+        f'luma_offset_{lx}': luma_offset,
+        f'chroma_weight_{lx}_flag': chroma_weight_flag,
+        f'chroma_weight_{lx}': chroma_weight,
+        f'chroma_offset_{lx}': chroma_offset,
+    })
+
+# Syntax elements that follow each memory_management_control_operation, in bitstream order
+_MMCO_FIELDS = {
+    1: ('difference_of_pic_nums_minus1',),
+    2: ('long_term_pic_num',),
+    3: ('difference_of_pic_nums_minus1', 'long_term_frame_idx'),
+    4: ('max_long_term_frame_idx_plus1',),
+    5: (),
+    6: ('long_term_frame_idx',),
+}
+
 def parse_dec_ref_pic_marking(bs, IdrPicFlag):
     result = {}
     if IdrPicFlag:
@@ -1686,22 +1727,18 @@ def parse_dec_ref_pic_marking(bs, IdrPicFlag):
         result['adaptive_ref_pic_marking_mode_flag'] = read_bool_safe(bs)
         if result['adaptive_ref_pic_marking_mode_flag']:
             operations = []
-            while True:
-                mmco = read_ue_safe(bs)
+            for _ in range(MAX_MMCO_OPERATIONS + 1):
+                mmco = read_ue_fast(bs)
                 if mmco == 0:
                     break
                 op = {
                     'memory_management_control_operation': mmco
                 }
-                if mmco in [1, 3]:
-                    op['difference_of_pic_nums_minus1'] = read_ue_safe(bs)
-                if mmco == 2:
-                    op['long_term_pic_num'] = read_ue_safe(bs)
-                if mmco in [3, 6]:
-                    op['long_term_frame_idx'] = read_ue_safe(bs)
-                if mmco == 4:
-                    op['max_long_term_frame_idx_plus1'] = read_ue_safe(bs)
+                for name in _MMCO_FIELDS.get(mmco, ()):
+                    op[name] = read_ue_fast(bs)
                 operations.append(op)
+            else:
+                raise ReadError('dec_ref_pic_marking is not terminated')
             result['operations'] = operations
     return result
 
@@ -1726,12 +1763,9 @@ def parse_eos(data):
 
 def parse_filler_data(data):
     # Filler data, can be ignored or processed if necessary
-    bs = BitStream(data)
-    filler_data = []
-    while bs.pos < bs.len:
-        filler_data.append(read_uint_safe(bs, 8))
+    # Emulation prevention bytes are already stripped in parse_nal_unit, so every byte is payload
     return {
-        'filler_data': filler_data
+        'filler_data': list(data)
     }
 
 def parse_sps_extension(data):
@@ -1756,100 +1790,163 @@ def parse_sps_extension(data):
     }
 
 
-def parse_aux_slice(data, sps, pps):
-    bs = BitStream(data)
-
-    first_mb_in_slice = read_ue_safe(bs)
-    slice_type = read_ue_safe(bs)
-    pic_parameter_set_id = read_ue_safe(bs)
-    frame_num = bs.read(f'uint:{sps["log2_max_frame_num_minus4"] + 4}')
-
-    field_pic_flag = None
-    bottom_field_flag = None
-    if sps['frame_mbs_only_flag'] == 0:
-        field_pic_flag = read_bool_safe(bs)
-        if field_pic_flag:
-            bottom_field_flag = read_bool_safe(bs)
-
-    idr_pic_id = None
-    pic_order_cnt_lsb = None
-    delta_pic_order_cnt_bottom = None
-    delta_pic_order_cnt = []
-    if slice_type in [5]:  # IDR slice
-        idr_pic_id = read_ue_safe(bs)
+@dataclass(slots=True)
+class AuxSlice:
+    first_mb_in_slice: Optional[int]
+    slice_type: Optional[int]
+    pic_parameter_set_id: Optional[int]
+    frame_num: int
+    field_pic_flag: Optional[bool] = None
+    bottom_field_flag: Optional[bool] = None
+    idr_pic_id: Optional[int] = None
+    pic_order_cnt_lsb: Optional[int] = None
+    delta_pic_order_cnt_bottom: Optional[int] = None
+    delta_pic_order_cnt: List[int] = field(default_factory=list)
+    redundant_pic_cnt: Optional[int] = None
+    direct_spatial_mv_pred_flag: Optional[bool] = None
+    num_ref_idx_active_override_flag: Optional[bool] = None
+    num_ref_idx_l0_active_minus1: Optional[int] = None
+    num_ref_idx_l1_active_minus1: Optional[int] = None
+    ref_pic_list_modification_flag_l0: Optional[bool] = None
+    modification_of_pic_nums_idc_l0: List[int] = field(default_factory=list)
+    ref_pic_list_modification_flag_l1: Optional[bool] = None
+    modification_of_pic_nums_idc_l1: List[int] = field(default_factory=list)
+
+    # Keep dict-style access working for callers written against the old dict result
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return asdict(self)
 
-    if sps['pic_order_cnt_type'] == 0:
-        pic_order_cnt_lsb = bs.read(f'uint:{sps["log2_max_pic_order_cnt_lsb_minus4"] + 4}')
-        if pps['bottom_field_pic_order_in_frame_present_flag'] and not field_pic_flag:
-            delta_pic_order_cnt_bottom = read_se_safe(bs)
-    elif sps['pic_order_cnt_type'] == 1 and not sps['delta_pic_order_always_zero_flag']:
-        delta_pic_order_cnt.append(read_se_safe(bs))
-        if pps['bottom_field_pic_order_in_frame_present_flag'] and not field_pic_flag:
-            delta_pic_order_cnt.append(read_se_safe(bs))
 
-    redundant_pic_cnt = None
-    if pps['redundant_pic_cnt_present_flag']:
-        redundant_pic_cnt = read_ue_safe(bs)
+def parse_aux_slice(data, sps, pps):
+    return make_aux_slice_parser(sps, pps)(data)
+
+
+def parse_aux_slices(datas, sps, pps):
+    # Batch variant for slices sharing one SPS/PPS: the specialized parser is built only once
+    parse = make_aux_slice_parser(sps, pps)
+    return [parse(data) for data in datas]
+
+
+def make_aux_slice_parser(sps, pps):
+    # SPS/PPS fields are constant for every slice that refers to them, so resolve them once
+    frame_num_fmt = f'uint:{sps["log2_max_frame_num_minus4"] + 4}'
+    has_field_pic = sps['frame_mbs_only_flag'] == 0
+    poc_type = sps['pic_order_cnt_type']
+    poc_lsb_fmt = None
+    if poc_type == 0:
+        poc_lsb_fmt = f'uint:{sps["log2_max_pic_order_cnt_lsb_minus4"] + 4}'
+    has_delta_poc = poc_type == 1 and not sps['delta_pic_order_always_zero_flag']
+    bottom_field_present = pps['bottom_field_pic_order_in_frame_present_flag']
+    has_rpc = pps['redundant_pic_cnt_present_flag']
+    default_l0_active_minus1 = pps['num_ref_idx_l0_default_active_minus1']
+    default_l1_active_minus1 = pps['num_ref_idx_l1_default_active_minus1']
+
+    def parse(data):
+        bs = BitStream(data)
 
-    direct_spatial_mv_pred_flag = None
-    num_ref_idx_active_override_flag = None
-    num_ref_idx_l0_active_minus1 = pps['num_ref_idx_l0_default_active_minus1']
-    num_ref_idx_l1_active_minus1 = pps['num_ref_idx_l1_default_active_minus1']
-    if slice_type in [0, 5, 2, 7, 4, 9]:
-        num_ref_idx_active_override_flag = read_bool_safe(bs)
-        if num_ref_idx_active_override_flag:
-            num_ref_idx_l0_active_minus1 = read_ue_safe(bs)
-            if slice_type in [2, 7]:
-                num_ref_idx_l1_active_minus1 = read_ue_safe(bs)
-
-    ref_pic_list_modification_flag_l0 = None
-    modification_of_pic_nums_idc_l0 = []
-    if slice_type in [0, 5, 1, 6]:
-        ref_pic_list_modification_flag_l0 = read_bool_safe(bs)
-        if ref_pic_list_modification_flag_l0:
-            while True:
-                modification_of_pic_nums_idc = read_ue_safe(bs)
-                modification_of_pic_nums_idc_l0.append(modification_of_pic_nums_idc)
-                if modification_of_pic_nums_idc == 3:
-                    break
-                if modification_of_pic_nums_idc in [0, 1]:
-                    read_ue_safe(bs)  # abs_diff_pic_num_minus1
-                elif modification_of_pic_nums_idc == 2:
-                    read_ue_safe(bs)  # long_term_pic_num
+        first_mb_in_slice = read_ue_safe(bs)
+        slice_type = read_ue_safe(bs)
+        pic_parameter_set_id = read_ue_safe(bs)
+        frame_num = bs.read(frame_num_fmt)
+
+        field_pic_flag = None
+        bottom_field_flag = None
+        if has_field_pic:
+            field_pic_flag = read_bool_safe(bs)
+            if field_pic_flag:
+                bottom_field_flag = read_bool_safe(bs)
+
+        idr_pic_id = None
+        pic_order_cnt_lsb = None
+        delta_pic_order_cnt_bottom = None
+        delta_pic_order_cnt = []
+        if slice_type in [5]:  # IDR slice
+            idr_pic_id = read_ue_safe(bs)
+
+        if poc_lsb_fmt is not None:
+            pic_order_cnt_lsb = bs.read(poc_lsb_fmt)
+            if bottom_field_present and not field_pic_flag:
+                delta_pic_order_cnt_bottom = read_se_safe(bs)
+        elif has_delta_poc:
+            delta_pic_order_cnt.append(read_se_safe(bs))
+            if bottom_field_present and not field_pic_flag:
+                delta_pic_order_cnt.append(read_se_safe(bs))
 
-    ref_pic_list_modification_flag_l1 = None
-    modification_of_pic_nums_idc_l1 = []
-    if slice_type in [1, 6]:
-        ref_pic_list_modification_flag_l1 = read_bool_safe(bs)
-        if ref_pic_list_modification_flag_l1:
-            while True:
-                modification_of_pic_nums_idc = read_ue_safe(bs)
-                modification_of_pic_nums_idc_l1.append(modification_of_pic_nums_idc)
-                if modification_of_pic_nums_idc == 3:
-                    break
-                if modification_of_pic_nums_idc in [0, 1]:
-                    read_ue_safe(bs)  # abs_diff_pic_num_minus1
-                elif modification_of_pic_nums_idc == 2:
-                    read_ue_safe(bs)  # long_term_pic_num
+        redundant_pic_cnt = None
+        if has_rpc:
+            redundant_pic_cnt = read_ue_safe(bs)
+
+        direct_spatial_mv_pred_flag = None
+        num_ref_idx_active_override_flag = None
+        num_ref_idx_l0_active_minus1 = default_l0_active_minus1
+        num_ref_idx_l1_active_minus1 = default_l1_active_minus1
+        if slice_type in [0, 5, 2, 7, 4, 9]:
+            num_ref_idx_active_override_flag = read_bool_safe(bs)
+            if num_ref_idx_active_override_flag:
+                num_ref_idx_l0_active_minus1 = read_ue_safe(bs)
+                if slice_type in [2, 7]:
+                    num_ref_idx_l1_active_minus1 = read_ue_safe(bs)
+
+        ref_pic_list_modification_flag_l0 = None
+        modification_of_pic_nums_idc_l0 = []
+        if slice_type in [0, 5, 1, 6]:
+            ref_pic_list_modification_flag_l0 = read_bool_safe(bs)
+            if ref_pic_list_modification_flag_l0:
+                for _ in range(MAX_REF_PIC_LIST_MODIFICATIONS + 1):
+                    modification_of_pic_nums_idc = read_ue_safe(bs)
+                    modification_of_pic_nums_idc_l0.append(modification_of_pic_nums_idc)
+                    if modification_of_pic_nums_idc == 3:
+                        break
+                    if modification_of_pic_nums_idc in [0, 1]:
+                        read_ue_safe(bs)  # abs_diff_pic_num_minus1
+                    elif modification_of_pic_nums_idc == 2:
+                        read_ue_safe(bs)  # long_term_pic_num
+                else:
+                    raise ReadError('ref_pic_list_modification is not terminated')
+
+        ref_pic_list_modification_flag_l1 = None
+        modification_of_pic_nums_idc_l1 = []
+        if slice_type in [1, 6]:
+            ref_pic_list_modification_flag_l1 = read_bool_safe(bs)
+            if ref_pic_list_modification_flag_l1:
+                for _ in range(MAX_REF_PIC_LIST_MODIFICATIONS + 1):
+                    modification_of_pic_nums_idc = read_ue_safe(bs)
+                    modification_of_pic_nums_idc_l1.append(modification_of_pic_nums_idc)
+                    if modification_of_pic_nums_idc == 3:
+                        break
+                    if modification_of_pic_nums_idc in [0, 1]:
+                        read_ue_safe(bs)  # abs_diff_pic_num_minus1
+                    elif modification_of_pic_nums_idc == 2:
+                        read_ue_safe(bs)  # long_term_pic_num
+                else:
+                    raise ReadError('ref_pic_list_modification is not terminated')
+
+        return AuxSlice(
+            first_mb_in_slice=first_mb_in_slice,
+            slice_type=slice_type,
+            pic_parameter_set_id=pic_parameter_set_id,
+            frame_num=frame_num,
+            field_pic_flag=field_pic_flag,
+            bottom_field_flag=bottom_field_flag,
+            idr_pic_id=idr_pic_id,
+            pic_order_cnt_lsb=pic_order_cnt_lsb,
+            delta_pic_order_cnt_bottom=delta_pic_order_cnt_bottom,
+            delta_pic_order_cnt=delta_pic_order_cnt,
+            redundant_pic_cnt=redundant_pic_cnt,
+            direct_spatial_mv_pred_flag=direct_spatial_mv_pred_flag,
+            num_ref_idx_active_override_flag=num_ref_idx_active_override_flag,
+            num_ref_idx_l0_active_minus1=num_ref_idx_l0_active_minus1,
+            num_ref_idx_l1_active_minus1=num_ref_idx_l1_active_minus1,
+            ref_pic_list_modification_flag_l0=ref_pic_list_modification_flag_l0,
+            modification_of_pic_nums_idc_l0=modification_of_pic_nums_idc_l0,
+            ref_pic_list_modification_flag_l1=ref_pic_list_modification_flag_l1,
+            modification_of_pic_nums_idc_l1=modification_of_pic_nums_idc_l1,
+        )
 
-    return {
-        'first_mb_in_slice': first_mb_in_slice,
-        'slice_type': slice_type,
-        'pic_parameter_set_id': pic_parameter_set_id,
-        'frame_num': frame_num,
-        'field_pic_flag': field_pic_flag,
-        'bottom_field_flag': bottom_field_flag,
-        'idr_pic_id': idr_pic_id,
-        'pic_order_cnt_lsb': pic_order_cnt_lsb,
-        'delta_pic_order_cnt_bottom': delta_pic_order_cnt_bottom,
-        'delta_pic_order_cnt': delta_pic_order_cnt,
-        'redundant_pic_cnt': redundant_pic_cnt,
-        'direct_spatial_mv_pred_flag': direct_spatial_mv_pred_flag,
-        'num_ref_idx_active_override_flag': num_ref_idx_active_override_flag,
-        'num_ref_idx_l0_active_minus1': num_ref_idx_l0_active_minus1,
-        'num_ref_idx_l1_active_minus1': num_ref_idx_l1_active_minus1,
-        'ref_pic_list_modification_flag_l0': ref_pic_list_modification_flag_l0,
-        'modification_of_pic_nums_idc_l0': modification_of_pic_nums_idc_l0,
-        'ref_pic_list_modification_flag_l1': ref_pic_list_modification_flag_l1,
-        'modification_of_pic_nums_idc_l1': modification_of_pic_nums_idc_l1,
-    }
\ No newline at end of file
+    return parse
@@ -1,10 +1,18 @@
+import itertools
+import logging
 import re
-import math
 import struct
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, List, Optional
+
 import numpy as np
-from bitstring import BitStream, ReadError
+from bitstring import Bits, ReadError
+
+logger = logging.getLogger(__name__)
 
-NAL_UNIT_TYPES = {
+NAL_UNIT_TYPE_NAMES = {
     0: "Trail_N",
     1: "Trail_R",
     2: "TSA_N",
@@ -15,6 +23,12 @@ NAL_UNIT_TYPES = {
     7: "RADL_R",
     8: "RASL_N",
     9: "RASL_R",
+    10: "RSV_VCL_N10",
+    11: "RSV_VCL_R11",
+    12: "RSV_VCL_N12",
+    13: "RSV_VCL_R13",
+    14: "RSV_VCL_N14",
+    15: "RSV_VCL_R15",
     16: "BLA_W_LP",
     17: "BLA_W_RADL",
     18: "BLA_N_LP",
@@ -65,19 +79,152 @@ NAL_UNIT_TYPES = {
     63: "UNSPEC63"
 }
 
+# nal_unit_type is 6 bits, so a dense tuple covers every value and lookups are a plain index
+NAL_UNIT_TYPES = tuple(NAL_UNIT_TYPE_NAMES[i] for i in range(64))
+
+EMULATION_PREVENTION_PATTERN = re.compile(b'\x00\x00\x03')
+
 def remove_emulation_prevention_bytes(data):
-    # 0x000003 is the emulation prevention sequence
-    i = 0
-    output = bytearray()
-    while i < len(data):
-        # Look for the sequence 0x000003
-        if i < len(data) - 2 and data[i] == 0x00 and data[i+1] == 0x00 and data[i+2] == 0x03:
-            output.extend(data[i:i+2])
-            i += 3  # Skip the 0x03 byte
+    # 0x000003 is the emulation prevention sequence; drop every 0x03 preceded by two zero bytes
+    data = memoryview(data)
+    if EMULATION_PREVENTION_PATTERN.search(data) is None:
+        # Most NAL units carry no emulation prevention bytes, so hand back a view without copying
+        return data
+    a = np.frombuffer(data, dtype=np.uint8)
+    mask = (a[:-2] == 0) & (a[1:-1] == 0) & (a[2:] == 3)
+    return memoryview(np.delete(a, np.flatnonzero(mask) + 2).tobytes())
+
+_MASK64 = (1 << 64) - 1
+
+class BitReader:
+    """
+    MSB-first bit reader over an immutable byte buffer.
+    Provides the subset of the bitstring.BitStream interface used by this module
+    (pos, len, read, peek) plus direct read_* methods for the hot paths.
+    """
+    __slots__ = ('buf', 'pos', 'len')
+
+    def __init__(self, data, copy=True):
+        # copy=False reads straight through a view of `data`; the helpers only index, slice and
+        # convert the buffer, and read_bytes returns bytes, so either backing works for every parser
+        if copy:
+            # A view spanning a whole bytes object is unwrapped instead of copied
+            if isinstance(data, memoryview) and type(data.obj) is bytes and data.nbytes == len(data.obj):
+                data = data.obj
+            self.buf = bytes(data)
+        else:
+            self.buf = memoryview(data)
+        self.pos = 0
+        self.len = len(self.buf) * 8
+
+    def __len__(self):
+        return self.len
+
+    def _peek_uint(self, pos, n):
+        end = pos + n
+        end_byte = (end + 7) >> 3
+        value = int.from_bytes(self.buf[pos >> 3:end_byte], 'big')
+        return (value >> ((end_byte << 3) - end)) & ((1 << n) - 1)
+
+    def read_uint(self, n):
+        if n < 0:
+            raise ValueError(f'Cannot read {n} bits.')
+        pos = self.pos
+        end = pos + n
+        if end > self.len:
+            raise ReadError(f'Reading {n} bits at position {pos} runs off the end of the buffer.')
+        self.pos = end
+        # _peek_uint inlined: this is the most frequently called read
+        end_byte = (end + 7) >> 3
+        value = int.from_bytes(self.buf[pos >> 3:end_byte], 'big')
+        return (value >> ((end_byte << 3) - end)) & ((1 << n) - 1)
+
+    def read_bool(self):
+        pos = self.pos
+        if pos >= self.len:
+            raise ReadError(f'Reading a bit at position {pos} runs off the end of the buffer.')
+        self.pos = pos + 1
+        return bool((self.buf[pos >> 3] >> (7 - (pos & 7))) & 1)
+
+    def read_ue(self):
+        start = pos = self.pos
+        byte_pos = pos >> 3
+        if byte_pos + 8 <= len(self.buf):
+            # Count leading zeros on a 64-bit window; codes that fit in it decode with one lookup
+            window = (int.from_bytes(self.buf[byte_pos:byte_pos + 8], 'big') << (pos & 7)) & _MASK64
+            if window:
+                code_len = 2 * (64 - window.bit_length()) + 1
+                if code_len <= 64 - (pos & 7):
+                    self.pos = pos + code_len
+                    return (window >> (64 - code_len)) - 1
+        length = self.len
+        # Find the leading 1 bit a window at a time instead of bit by bit
+        while pos < length:
+            n = min(56, length - pos)
+            window = self._peek_uint(pos, n)
+            if window:
+                pos += n - window.bit_length()
+                break
+            pos += n
         else:
-            output.append(data[i])
-            i += 1
-    return bytes(output)
+            raise ReadError(f'Exp-Golomb code at position {start} runs off the end of the buffer.')
+        leading_zeros = pos - start
+        if pos + leading_zeros + 1 > length:
+            raise ReadError(f'Exp-Golomb code at position {start} runs off the end of the buffer.')
+        self.pos = pos + leading_zeros + 1
+        return self._peek_uint(pos, leading_zeros + 1) - 1
+
+    def peek_uint8(self):
+        # Next 8 bits without consuming them; a plain byte index when byte-aligned
+        pos = self.pos
+        if pos + 8 > self.len:
+            raise ReadError(f'Reading 8 bits at position {pos} runs off the end of the buffer.')
+        if pos & 7 == 0:
+            return self.buf[pos >> 3]
+        return self._peek_uint(pos, 8)
+
+    def read_se(self):
+        k = self.read_ue()
+        return (k + 1) >> 1 if k & 1 else -(k >> 1)
+
+    def read_bytes(self, n):
+        pos = self.pos
+        if pos + 8 * n > self.len:
+            raise ReadError(f'Reading {n} bytes at position {pos} runs off the end of the buffer.')
+        if pos & 7 == 0:
+            self.pos = pos + 8 * n
+            # bytes() is free on a bytes slice and keeps a copy=False reader from handing out views
+            return bytes(self.buf[pos >> 3:(pos >> 3) + n])
+        return self.read_uint(8 * n).to_bytes(n, 'big')
+
+    def read(self, fmt):
+        if isinstance(fmt, int):
+            name, n = 'bits', fmt
+        else:
+            name, _, n = fmt.partition(':')
+            n = int(n) if n else 0
+        if name == 'uint':
+            return self.read_uint(n)
+        if name == 'bool':
+            return self.read_bool()
+        if name == 'ue':
+            return self.read_ue()
+        if name == 'se':
+            return self.read_se()
+        if name == 'bytes':
+            return self.read_bytes(n)
+        if name == 'bits':
+            return Bits(uint=self.read_uint(n), length=n) if n else Bits()
+        if name == 'bin':
+            return format(self.read_uint(n), f'0{n}b') if n else ''
+        raise ValueError(f'Unsupported read format {fmt!r}.')
+
+    def peek(self, fmt):
+        pos = self.pos
+        try:
+            return self.read(fmt)
+        finally:
+            self.pos = pos
 
 def read_f_safe(bs, bits=1):
     """Safely read fixed bits from the bitstream."""
@@ -85,73 +232,350 @@ def read_f_safe(bs, bits=1):
         try:
             return bs.read(f'bits:{bits}')
         except ReadError:
-            print(f'[Read Error] read_f_safe - position {bs.pos}')
+            logger.debug('[Read Error] read_f_safe - position %d', bs.pos)
             return None
     return None
 
+# Exp-Golomb fast path: decode off a 64-bit window where bit_length() counts the leading
+# zeros in one step and the whole code comes out of a single shift; codes longer than the
+# window or running past the end fall back to BitReader.read_ue
 def read_ue_safe(bs):
-    if bs.pos < bs.len:
+    pos = bs.pos
+    if pos < bs.len:
+        chunk = bs.buf[pos >> 3:(pos >> 3) + 8]
+        # Short chunks near the end are zero-padded on the right to a full 64-bit window
+        pad_bits = (8 - len(chunk)) << 3
+        window = (int.from_bytes(chunk, 'big') << (pad_bits + (pos & 7))) & _MASK64
+        code_len = 129 - 2 * window.bit_length()
+        if window and code_len <= 64 - (pos & 7) - pad_bits:
+            bs.pos = pos + code_len
+            return (window >> (64 - code_len)) - 1
         try:
-            return bs.read('ue')
+            return bs.read_ue()
         except ReadError:
-            print(f'[Read Error] read_ue_safe - position {bs.pos}')
+            logger.debug('[Read Error] read_ue_safe - position %d', bs.pos)
             return None
     return None
 
 def read_se_safe(bs):
-    if bs.pos < bs.len:
+    pos = bs.pos
+    if pos < bs.len:
+        chunk = bs.buf[pos >> 3:(pos >> 3) + 8]
+        pad_bits = (8 - len(chunk)) << 3
+        window = (int.from_bytes(chunk, 'big') << (pad_bits + (pos & 7))) & _MASK64
+        code_len = 129 - 2 * window.bit_length()
+        if window and code_len <= 64 - (pos & 7) - pad_bits:
+            bs.pos = pos + code_len
+            k = (window >> (64 - code_len)) - 1
+            return (k + 1) >> 1 if k & 1 else -(k >> 1)
         try:
-            return bs.read('se')
+            return bs.read_se()
         except ReadError:
-            print(f'[Read Error] read_se_safe - position {bs.pos}')
+            logger.debug('[Read Error] read_se_safe - position %d', bs.pos)
             return None
     return None
 
+def read_ues_safe(bs, count):
+    # `count` consecutive ue(v) codes; one 64-bit window load decodes every code that fits in it,
+    # anything else (long codes, the last bytes of the buffer) goes through read_ue_safe
+    values = []
+    append = values.append
+    buf = bs.buf
+    pos = bs.pos
+    while len(values) < count:
+        byte_pos = pos >> 3
+        if byte_pos + 8 > len(buf):
+            bs.pos = pos
+            values.extend([read_ue_safe(bs) for _ in range(count - len(values))])
+            return values
+        available = 64 - (pos & 7)
+        window = (int.from_bytes(buf[byte_pos:byte_pos + 8], 'big') << (pos & 7)) & _MASK64
+        used = 0
+        while window and len(values) < count:
+            code_len = 129 - 2 * window.bit_length()
+            if used + code_len > available:
+                break
+            append((window >> (64 - code_len)) - 1)
+            used += code_len
+            window = (window << code_len) & _MASK64
+        if used:
+            pos += used
+        else:
+            bs.pos = pos
+            append(read_ue_safe(bs))
+            pos = bs.pos
+    bs.pos = pos
+    return values
+
+def read_ses_safe(bs, count):
+    return [k if k is None else (k + 1) >> 1 if k & 1 else -(k >> 1) for k in read_ues_safe(bs, count)]
+
+# read_bool_safe and read_uint_safe are the bulk of all reads, so they work on the
+# BitReader buffer directly; the bounds check already rules out a ReadError
 def read_bool_safe(bs):
-    if bs.pos < bs.len:
-        try:
-            return bs.read('bool')
-        except ReadError:
-            print(f'[Read Error] read_bool_safe - position {bs.pos}')
-            return None
+    pos = bs.pos
+    if pos < bs.len:
+        bs.pos = pos + 1
+        return bool((bs.buf[pos >> 3] >> (7 - (pos & 7))) & 1)
     return None
 
 def read_uint_safe(bs, bits):
-    if bs.pos + bits <= bs.len:
-        try:
-            return bs.read(f'uint:{bits}')
-        except ReadError:
-            print(f'[Read Error] read_uint_safe - position {bs.pos}')
-            return None
+    pos = bs.pos
+    end = pos + bits
+    if end <= bs.len:
+        if bits <= 0:
+            return bs.read_uint(bits)
+        bs.pos = end
+        end_byte = (end + 7) >> 3
+        value = int.from_bytes(bs.buf[pos >> 3:end_byte], 'big')
+        return (value >> ((end_byte << 3) - end)) & ((1 << bits) - 1)
+    return None
+
+# Byte-wide widths dominate the SEI syntax; when byte-aligned these are plain buffer indexing
+def read_u8_safe(bs):
+    pos = bs.pos
+    if pos + 8 <= bs.len:
+        bs.pos = pos + 8
+        if pos & 7 == 0:
+            return bs.buf[pos >> 3]
+        return (int.from_bytes(bs.buf[pos >> 3:(pos >> 3) + 2], 'big') >> (8 - (pos & 7))) & 0xFF
     return None
 
-def parse_hevc_nal_units(video_stream_data, sps, pps, vps):
+def read_u16_safe(bs):
+    pos = bs.pos
+    if pos + 16 <= bs.len:
+        bs.pos = pos + 16
+        byte_pos = pos >> 3
+        if pos & 7 == 0:
+            buf = bs.buf
+            return (buf[byte_pos] << 8) | buf[byte_pos + 1]
+        return (int.from_bytes(bs.buf[byte_pos:byte_pos + 3], 'big') >> (8 - (pos & 7))) & 0xFFFF
+    return None
+
+def read_u32_safe(bs):
+    pos = bs.pos
+    if pos + 32 <= bs.len:
+        bs.pos = pos + 32
+        byte_pos = pos >> 3
+        if pos & 7 == 0:
+            return int.from_bytes(bs.buf[byte_pos:byte_pos + 4], 'big')
+        return (int.from_bytes(bs.buf[byte_pos:byte_pos + 5], 'big') >> (8 - (pos & 7))) & 0xFFFFFFFF
+    return None
+
+def read_flag_bits_safe(bs, count):
+    # Read `count` one-bit flags with a single bitstream access; also returns them packed MSB-first
+    value = read_uint_safe(bs, count)
+    if value is None:
+        flags = [read_bool_safe(bs) for _ in range(count)]
+        value = sum(1 << (count - 1 - j) for j, flag in enumerate(flags) if flag)
+        return flags, value
+    return [bool((value >> shift) & 1) for shift in range(count - 1, -1, -1)], value
+
+def read_flags_safe(bs, count):
+    pos = bs.pos
+    # Long runs are unpacked from the buffer by numpy rather than shifted out of one wide int
+    if count >= 64 and pos + count <= bs.len:
+        bs.pos = pos + count
+        start = pos & 7
+        raw = np.frombuffer(bs.buf, dtype=np.uint8, count=(start + count + 7) >> 3, offset=pos >> 3)
+        return np.unpackbits(raw)[start:start + count].astype(bool).tolist()
+    return read_flag_bits_safe(bs, count)[0]
+
+# widths -> every split of a run of fixed-width fields, so a run costs one read plus one index
+_field_tables = {}
+
+def _field_table(widths):
+    fields = []
+    for value in range(1 << sum(widths)):
+        shift = sum(widths)
+        split = []
+        for width in widths:
+            shift -= width
+            field = (value >> shift) & ((1 << width) - 1)
+            split.append(bool(field) if width == 1 else field)
+        fields.append(tuple(split))
+    table = _field_tables[widths] = tuple(fields)
+    return table
+
+def read_fields_safe(bs, widths):
+    # Read a run of fixed-width fields as one integer; one-bit fields come back as bools.
+    # Only pays off from about five fields up, below that separate reads are cheaper, and the
+    # lookup table holds 2**sum(widths) entries, so keep runs to about ten bits
+    value = read_uint_safe(bs, sum(widths))
+    if value is None:
+        return [read_bool_safe(bs) if width == 1 else read_uint_safe(bs, width) for width in widths]
+    table = _field_tables.get(widths) or _field_table(widths)
+    return table[value]
+
+# numpy dtypes for the uint widths that np.frombuffer can decode directly
+_UINT_DTYPES = {8: '>u1', 16: '>u2', 32: '>u4', 64: '>u8'}
+
+def read_uints_safe(bs, count, bits):
+    # `count` consecutive u(bits) values taken with one read; values past the end are None
+    if count <= 0:
+        return []
+    if bits <= 0:
+        return [0] * count
+    available = min(count, (bs.len - bs.pos) // bits)
+    if available < count:
+        return read_uints_safe(bs, available, bits) + [None] * (count - available)
+    if bits & 7:
+        return [read_uint_safe(bs, bits) for _ in range(count)]
+    raw = bs.read_bytes((count * bits) >> 3)
+    dtype = _UINT_DTYPES.get(bits)
+    if dtype is not None:
+        return np.frombuffer(raw, dtype=dtype).tolist()
+    size = bits >> 3
+    return [int.from_bytes(raw[i:i + size], 'big') for i in range(0, len(raw), size)]
+
+def _find_start_codes(buf):
+    # Yield (start, start_code_len) for every 0x000001 located with vectorized compares;
+    # a preceding 0x00 makes it a 4-byte start code
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    if arr.size < 3:
+        return
+    cand = np.flatnonzero((arr[:-2] == 0) & (arr[1:-1] == 0) & (arr[2:] == 1))
+    for idx in cand.tolist():
+        if idx > 0 and buf[idx - 1] == 0:
+            yield idx - 1, 4
+        else:
+            yield idx, 3
+
+def _iter_nal_units(mv, start_codes):
+    # Pair each start code with the next one to cut (offset, start_code_len, nal_unit) views
+    prev_start = prev_len = None
+    for start, start_code_len in start_codes:
+        if prev_start is not None:
+            yield prev_start, prev_len, mv[prev_start:start]
+        prev_start, prev_len = start, start_code_len
+    if prev_start is not None:
+        yield prev_start, prev_len, mv[prev_start:]
+
+# Streams usually repeat identical VPS/SPS/PPS at every IRAP picture, so parse each distinct one once
+PARAMETER_SET_CACHE_SIZE = 64
+_parameter_set_cache = OrderedDict()
+
+def parse_parameter_set_cached(parser, raw_data, data):
+    # Key on a copy so cached entries don't keep the whole stream behind a view alive
+    key = (parser, bytes(raw_data))
+    cached = _parameter_set_cache.get(key)
+    if cached is None:
+        # Parsed without 'data' so the entry holds no view into the stream; only the per-NAL copy gets it
+        cached = parser(raw_data, None)
+        _parameter_set_cache[key] = cached
+        if len(_parameter_set_cache) > PARAMETER_SET_CACHE_SIZE:
+            _parameter_set_cache.popitem(last=False)
+    else:
+        _parameter_set_cache.move_to_end(key)
+    # Shallow copy so each NAL keeps its own 'data' without touching the cached entry
+    parsed = cached.copy()
+    parsed['data'] = data
+    return parsed
+
+def _handle_vps(parsed_nal, state):
+    parsed_nal['parsed_data'] = (parse_parameter_set_cached(parse_vps, parsed_nal['raw_data'], parsed_nal['data']), parsed_nal['nal_start_offset'], parsed_nal['nal_length'])
+    state['vps_list'].append(parsed_nal)
+    state['parsed_vps'].append(parsed_nal)
+
+def _handle_sps(parsed_nal, state):
+    parsed_nal['parsed_data'] = (parse_parameter_set_cached(parse_sps, parsed_nal['raw_data'], parsed_nal['data']), parsed_nal['nal_start_offset'], parsed_nal['nal_length'])
+    state['sps_list'].append(parsed_nal)
+    state['parsed_sps'].append(parsed_nal)
+
+def _handle_pps(parsed_nal, state):
+    parsed_nal['parsed_data'] = (parse_parameter_set_cached(parse_pps, parsed_nal['raw_data'], parsed_nal['data']), parsed_nal['nal_start_offset'], parsed_nal['nal_length'])
+    state['pps_list'].append(parsed_nal)
+    state['parsed_pps'].append(parsed_nal)
+
+def _handle_sei_prefix(parsed_nal, state):
+    parsed_sps = state['parsed_sps']
+    latest_sps = parsed_sps[-1]['parsed_data'][0] if parsed_sps else None
+    sei_data = parse_sei_prefix(parsed_nal['raw_data'], latest_sps)
+    state['parsed_sei_prefix'].extend(sei_data)
+    parsed_nal['parsed_data'] = sei_data
+
+def _handle_sei_suffix(parsed_nal, state):
+    parsed_sps = state['parsed_sps']
+    latest_sps = parsed_sps[-1]['parsed_data'][0] if parsed_sps else None
+    sei_data = parse_sei_suffix(parsed_nal['raw_data'], latest_sps)
+    state['parsed_sei_suffix'].extend(sei_data)
+    parsed_nal['parsed_data'] = sei_data
+
+def _handle_slice(parsed_nal, state):
+    parsed_sps, parsed_pps = state['parsed_sps'], state['parsed_pps']
+    if parsed_sps and parsed_pps:
+        latest_sps = parsed_sps[-1]['parsed_data'][0]
+        latest_pps = parsed_pps[-1]['parsed_data'][0]
+        pending_slices = state['pending_slices']
+        if pending_slices is not None:
+            # Parsed later in worker processes; slice headers only depend on the active SPS/PPS
+            pending_slices.append((parsed_nal, latest_sps, latest_pps))
+            return
+        slice_segment = parse_slice_segment(parsed_nal['raw_data'], parsed_nal['nal_type'], latest_sps, latest_pps)
+        _store_slice_segment(parsed_nal, slice_segment, state)
+    else:
+        parsed_nal['parsed_data'] = None
+
+def _store_slice_segment(parsed_nal, slice_segment, state):
+    slice_segment['data'] = parsed_nal['data']
+    state['parsed_slice_segments'].append(slice_segment)
+    parsed_nal['parsed_data'] = slice_segment
+
+SLICE_BATCH_SIZE = 1000
+
+def _parse_slice_batch(batch):
+    return [parse_slice_segment(raw_data, nal_type, sps, pps) for raw_data, nal_type, sps, pps in batch]
+
+def _without_data(parameter_set, memo):
+    # 'data' is a memoryview, which can't be pickled, and slice parsing never reads it
+    key = id(parameter_set)
+    if key not in memo:
+        memo[key] = {k: v for k, v in parameter_set.items() if k != 'data'}
+    return memo[key]
+
+def _parse_pending_slices(state, max_workers):
+    pending_slices = state['pending_slices']
+    memo = {}
+    jobs = [(bytes(parsed_nal['raw_data']), parsed_nal['nal_type'], _without_data(sps, memo), _without_data(pps, memo))
+            for parsed_nal, sps, pps in pending_slices]
+    batches = [jobs[i:i + SLICE_BATCH_SIZE] for i in range(0, len(jobs), SLICE_BATCH_SIZE)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        slice_segments = [segment for batch in executor.map(_parse_slice_batch, batches) for segment in batch]
+    for (parsed_nal, _, _), slice_segment in zip(pending_slices, slice_segments):
+        _store_slice_segment(parsed_nal, slice_segment, state)
+
+# nal_type -> handler; VCL types 0-31 are all slice segments, anything else keeps its raw payload
+_NAL_HANDLERS = dict.fromkeys(range(32), _handle_slice)
+_NAL_HANDLERS.update({
+    32: _handle_vps,
+    33: _handle_sps,
+    34: _handle_pps,
+    39: _handle_sei_prefix,
+    40: _handle_sei_suffix,
+})
+
+def parse_hevc_nal_units(video_stream_data, sps, pps, vps, max_workers=None):
+    # max_workers > 1 parses slice segment headers in a process pool once the whole stream is scanned
     nal_units = []
-    vps_list, sps_list, pps_list = [], [], []
-    parsed_vps, parsed_sps, parsed_pps = [], [], []
-    parsed_sei_prefix, parsed_sei_suffix, parsed_slice_segments = [], [], []
-    
+    state = {
+        'vps_list': [], 'sps_list': [], 'pps_list': [],
+        'parsed_vps': [], 'parsed_sps': [], 'parsed_pps': [],
+        'parsed_sei_prefix': [], 'parsed_sei_suffix': [], 'parsed_slice_segments': [],
+        'pending_slices': [] if max_workers is not None and max_workers > 1 else None,
+    }
+
     # For abnormal video files
     if sps is not None:
-        sps_list = [{'raw_data': remove_emulation_prevention_bytes(sps[2:]), 'data': b'\x00\x00\x00\x01' + sps}, None, None]
+        state['sps_list'] = [{'raw_data': remove_emulation_prevention_bytes(sps[2:]), 'data': b'\x00\x00\x00\x01' + sps}, None, None]
     if pps is not None:
-        pps_list = [{'raw_data': remove_emulation_prevention_bytes(pps[2:]), 'data': b'\x00\x00\x00\x01' + pps}, None, None]
+        state['pps_list'] = [{'raw_data': remove_emulation_prevention_bytes(pps[2:]), 'data': b'\x00\x00\x00\x01' + pps}, None, None]
     if vps is not None: 
-        vps_list = [{'raw_data': remove_emulation_prevention_bytes(vps[2:]), 'data': b'\x00\x00\x00\x01' + vps}, None, None]
+        state['vps_list'] = [{'raw_data': remove_emulation_prevention_bytes(vps[2:]), 'data': b'\x00\x00\x00\x01' + vps}, None, None]
 
-    nal_start_codes = [(m.start(), m.end()) for m in re.finditer(b'\x00\x00\x01|\x00\x00\x00\x01', video_stream_data)]
+    # Slice NAL units out of a view of the stream; parsed NALs keep views into it instead of copies
+    mv = memoryview(video_stream_data)
 
-    for i, (nal_start, nal_end) in enumerate(nal_start_codes):
-        start_code_len = nal_end - nal_start
-        nal_start = nal_end
-        
-        if i + 1 < len(nal_start_codes):
-            next_start = nal_start_codes[i + 1][0]
-            nal_unit = video_stream_data[nal_start - start_code_len:next_start]
-        else:
-            nal_unit = video_stream_data[nal_start - start_code_len:]
-
-        tmp_nal_start_offset = nal_start - start_code_len
+    for tmp_nal_start_offset, start_code_len, nal_unit in _iter_nal_units(mv, _find_start_codes(video_stream_data)):
         tmp_nal_length = len(nal_unit)
 
         if len(nal_unit) <= 8:
@@ -163,51 +587,27 @@ def parse_hevc_nal_units(video_stream_data, sps, pps, vps):
         parsed_nal = parse_nal_unit(nal_unit, True, tmp_nal_start_offset, tmp_nal_length)
         nal_units.append(parsed_nal)
 
-        if nal_type == 32:  # VPS
-            parsed_nal['parsed_data'] = (parse_vps(parsed_nal['raw_data'], parsed_nal['data']), parsed_nal['nal_start_offset'], parsed_nal['nal_length'])
-            vps_list.append(parsed_nal)
-            parsed_vps.append(parsed_nal)
-        elif nal_type == 33:  # SPS
-            parsed_nal['parsed_data'] = (parse_sps(parsed_nal['raw_data'], parsed_nal['data']), parsed_nal['nal_start_offset'], parsed_nal['nal_length'])
-            sps_list.append(parsed_nal)
-            parsed_sps.append(parsed_nal)
-        elif nal_type == 34:  # PPS
-            parsed_nal['parsed_data'] = (parse_pps(parsed_nal['raw_data'], parsed_nal['data']), parsed_nal['nal_start_offset'], parsed_nal['nal_length'])
-            pps_list.append(parsed_nal)
-            parsed_pps.append(parsed_nal)
-        elif nal_type == 39:  # SEI Prefix
-            latest_sps = parsed_sps[-1]['parsed_data'][0] if parsed_sps else None
-            sei_data = parse_sei_prefix(parsed_nal['raw_data'], latest_sps)
-            parsed_sei_prefix.extend(sei_data)
-            parsed_nal['parsed_data'] = sei_data
-        elif nal_type == 40:  # SEI Suffix
-            latest_sps = parsed_sps[-1]['parsed_data'][0] if parsed_sps else None
-            sei_data = parse_sei_suffix(parsed_nal['raw_data'], latest_sps)
-            parsed_sei_suffix.extend(sei_data)
-            parsed_nal['parsed_data'] = sei_data
-        elif nal_type in range(0, 32):  # Slice types
-            if parsed_sps and parsed_pps:
-                latest_sps = parsed_sps[-1]['parsed_data'][0]
-                latest_pps = parsed_pps[-1]['parsed_data'][0]
-                slice_segment = parse_slice_segment(parsed_nal['raw_data'], nal_type, latest_sps, latest_pps)
-                slice_segment['data'] = parsed_nal['data']
-                parsed_slice_segments.append(slice_segment)
-                parsed_nal['parsed_data'] = slice_segment
-            else:
-                parsed_nal['parsed_data'] = None
+        handler = _NAL_HANDLERS.get(nal_type)
+        if handler is not None:
+            handler(parsed_nal, state)
         else:
             parsed_nal['parsed_data'] = parsed_nal['raw_data']
 
+    if state['pending_slices']:
+        _parse_pending_slices(state, max_workers)
+
     return {
         'nal_units': nal_units,
-        'vps': parsed_vps,
-        'sps': parsed_sps,
-        'pps': parsed_pps,
-        'sei_prefix': parsed_sei_prefix,
-        'sei_suffix': parsed_sei_suffix,
-        'slice_segments': parsed_slice_segments
+        'vps': state['parsed_vps'],
+        'sps': state['parsed_sps'],
+        'pps': state['parsed_pps'],
+        'sei_prefix': state['parsed_sei_prefix'],
+        'sei_suffix': state['parsed_sei_suffix'],
+        'slice_segments': state['parsed_slice_segments']
     }
 
+NAL_HEADER_STRUCT = struct.Struct('>H')
+
 def parse_nal_unit(nal_unit, has_start_code=False, nal_start_offset=None, nal_length=None):
     if has_start_code:
         start_code_len = 3 if nal_unit[:3] == b'\x00\x00\x01' else 4
@@ -216,20 +616,65 @@ def parse_nal_unit(nal_unit, has_start_code=False, nal_start_offset=None, nal_le
         nal_data = nal_unit
 
     # H.265 NAL unit header is 2 bytes
-    nal_header = (nal_data[0] << 8) | nal_data[1]
-    nal_data = remove_emulation_prevention_bytes(nal_data[2:])  # Start from the third byte
+    (nal_header,) = NAL_HEADER_STRUCT.unpack_from(nal_data)
+    nal_data = remove_emulation_prevention_bytes(memoryview(nal_data)[2:])  # Start from the third byte
 
     return {
         'forbidden_zero_bit': (nal_header >> 15) & 0x01,
         'nal_type': (nal_header >> 9) & 0x3F,
         'nuh_layer_id': (nal_header >> 3) & 0x3F,
         'nuh_temporal_id_plus1': nal_header & 0x07,
-        'data': nal_unit if has_start_code else b'\x00\x00\x00\x01' + nal_unit,
-        'raw_data': nal_data,  # Raw data without NAL header
+        'data': memoryview(nal_unit) if has_start_code else memoryview(b'\x00\x00\x00\x01' + nal_unit),
+        'raw_data': nal_data,  # Raw data without NAL header, a view where no bytes had to be removed
         'nal_start_offset': nal_start_offset,
         'nal_length': nal_length
     }
 
+def _compatibility_mask(*indices):
+    # general_profile_compatibility_flag[j] sits at bit 31 - j of the packed 32-bit value
+    return sum(1 << (31 - j) for j in indices)
+
+PROFILES_4_TO_11 = frozenset((4, 5, 6, 7, 8, 9, 10, 11))
+PROFILES_5_9_10_11 = frozenset((5, 9, 10, 11))
+PROFILES_INBLD = frozenset((1, 2, 3, 4, 5, 9, 11))
+MASK_4_TO_11 = _compatibility_mask(*PROFILES_4_TO_11)
+MASK_5_9_10_11 = _compatibility_mask(*PROFILES_5_9_10_11)
+MASK_INBLD = _compatibility_mask(*PROFILES_INBLD)
+
+# Placeholder flags for sub-layers without profile information; copied per sub-layer so
+# the results stay lists
+NO_COMPATIBILITY_FLAGS = (None,) * 32
+
+# Per-sub-layer fields of profile_tier_level(), in output order
+SUB_LAYER_PTL_KEYS = (
+    'sub_layer_profile_space',
+    'sub_layer_tier_flag',
+    'sub_layer_profile_idc',
+    'sub_layer_profile_compatibility_flag',
+    'sub_layer_progressive_source_flag',
+    'sub_layer_interlaced_source_flag',
+    'sub_layer_non_packed_constraint_flag',
+    'sub_layer_frame_only_constraint_flag',
+    'sub_layer_max_12bit_constraint_flag',
+    'sub_layer_max_10bit_constraint_flag',
+    'sub_layer_max_8bit_constraint_flag',
+    'sub_layer_max_422chroma_constraint_flag',
+    'sub_layer_max_420chroma_constraint_flag',
+    'sub_layer_max_monochrome_constraint_flag',
+    'sub_layer_intra_constraint_flag',
+    'sub_layer_one_picture_only_constraint_flag',
+    'sub_layer_lower_bit_rate_constraint_flag',
+    'sub_layer_max_14bit_constraint_flag',
+    'sub_layer_reserved_zero_33bits',
+    'sub_layer_reserved_zero_34bits',
+    'sub_layer_reserved_zero_35bits',
+    'sub_layer_reserved_zero_7bits',
+    'sub_layer_reserved_zero_43bits',
+    'sub_layer_inbld_flag',
+    'sub_layer_reserved_zero_bit',
+    'sub_layer_level_idc',
+)
+
 def parse_profile_tier_level(bs, profile_present_flag, max_num_sub_layers_minus1):
     profile_tier_level = {}
 
@@ -237,26 +682,25 @@ def parse_profile_tier_level(bs, profile_present_flag, max_num_sub_layers_minus1
         profile_tier_level['general_profile_space'] = read_uint_safe(bs, 2)
         profile_tier_level['general_tier_flag'] = read_bool_safe(bs)
         profile_tier_level['general_profile_idc'] = read_uint_safe(bs, 5)
-        profile_tier_level['general_profile_compatibility_flag'] = [read_bool_safe(bs) for _ in range(32)]
+        profile_tier_level['general_profile_compatibility_flag'], compatibility = read_flag_bits_safe(bs, 32)
+        profile_idc = profile_tier_level['general_profile_idc']
         profile_tier_level['general_progressive_source_flag'] = read_bool_safe(bs)
         profile_tier_level['general_interlaced_source_flag'] = read_bool_safe(bs)
         profile_tier_level['general_non_packed_constraint_flag'] = read_bool_safe(bs)
         profile_tier_level['general_frame_only_constraint_flag'] = read_bool_safe(bs)
 
-        if any(profile_tier_level['general_profile_idc'] == condition or
-               profile_tier_level['general_profile_compatibility_flag'][condition] for condition in [4, 5, 6, 7, 8, 9, 10, 11]):
-            profile_tier_level['general_max_12bit_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_max_10bit_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_max_8bit_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_max_422chroma_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_max_420chroma_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_max_monochrome_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_intra_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_one_picture_only_constraint_flag'] = read_bool_safe(bs)
-            profile_tier_level['general_lower_bit_rate_constraint_flag'] = read_bool_safe(bs)
-
-            if any(profile_tier_level['general_profile_idc'] == condition or
-                   profile_tier_level['general_profile_compatibility_flag'][condition] for condition in [5, 9, 10, 11]):
+        if profile_idc in PROFILES_4_TO_11 or compatibility & MASK_4_TO_11:
+            (profile_tier_level['general_max_12bit_constraint_flag'],
+             profile_tier_level['general_max_10bit_constraint_flag'],
+             profile_tier_level['general_max_8bit_constraint_flag'],
+             profile_tier_level['general_max_422chroma_constraint_flag'],
+             profile_tier_level['general_max_420chroma_constraint_flag'],
+             profile_tier_level['general_max_monochrome_constraint_flag'],
+             profile_tier_level['general_intra_constraint_flag'],
+             profile_tier_level['general_one_picture_only_constraint_flag'],
+             profile_tier_level['general_lower_bit_rate_constraint_flag']) = read_fields_safe(bs, (1, 1, 1, 1, 1, 1, 1, 1, 1))
+
+            if profile_idc in PROFILES_5_9_10_11 or compatibility & MASK_5_9_10_11:
                 profile_tier_level['general_max_14bit_constraint_flag'] = read_bool_safe(bs)
                 profile_tier_level['general_reserved_zero_33bits'] = read_uint_safe(bs, 33)
             else:
@@ -268,63 +712,51 @@ def parse_profile_tier_level(bs, profile_present_flag, max_num_sub_layers_minus1
         else:
             profile_tier_level['general_reserved_zero_43bits'] = read_uint_safe(bs, 43)
 
-        if any(profile_tier_level['general_profile_idc'] == condition or
-               profile_tier_level['general_profile_compatibility_flag'][condition] for condition in [1, 2, 3, 4, 5, 9, 11]):
+        if profile_idc in PROFILES_INBLD or compatibility & MASK_INBLD:
             profile_tier_level['general_inbld_flag'] = read_bool_safe(bs)
         else:
             profile_tier_level['general_reserved_zero_bit'] = read_bool_safe(bs)
 
     profile_tier_level['general_level_idc'] = read_uint_safe(bs, 8)
 
-    profile_tier_level['sub_layer_profile_present_flag'] = [read_bool_safe(bs) for _ in range(max_num_sub_layers_minus1)]
-    profile_tier_level['sub_layer_level_present_flag'] = [read_bool_safe(bs) for _ in range(max_num_sub_layers_minus1)]
-
-    profile_tier_level['reserved_zero_2bits'] = []
-    if max_num_sub_layers_minus1 > 0:
-        for i in range(max_num_sub_layers_minus1, 8):
-            profile_tier_level['reserved_zero_2bits'].append(read_uint_safe(bs, 2))
-
-    profile_tier_level['sub_layer_profile_space'] = []
-    profile_tier_level['sub_layer_tier_flag'] = []
-    profile_tier_level['sub_layer_profile_idc'] = []
-    profile_tier_level['sub_layer_profile_compatibility_flag'] = []
-    profile_tier_level['sub_layer_progressive_source_flag'] = []
-    profile_tier_level['sub_layer_interlaced_source_flag'] = []
-    profile_tier_level['sub_layer_non_packed_constraint_flag'] = []
-    profile_tier_level['sub_layer_frame_only_constraint_flag'] = []
-    profile_tier_level['sub_layer_max_12bit_constraint_flag'] = []
-    profile_tier_level['sub_layer_max_10bit_constraint_flag'] = []
-    profile_tier_level['sub_layer_max_8bit_constraint_flag'] = []
-    profile_tier_level['sub_layer_max_422chroma_constraint_flag'] = []
-    profile_tier_level['sub_layer_max_420chroma_constraint_flag'] = []
-    profile_tier_level['sub_layer_max_monochrome_constraint_flag'] = []
-    profile_tier_level['sub_layer_intra_constraint_flag'] = []
-    profile_tier_level['sub_layer_one_picture_only_constraint_flag'] = []
-    profile_tier_level['sub_layer_lower_bit_rate_constraint_flag'] = []
-    profile_tier_level['sub_layer_max_14bit_constraint_flag'] = []
-    profile_tier_level['sub_layer_reserved_zero_33bits'] = []
-    profile_tier_level['sub_layer_reserved_zero_34bits'] = []
-    profile_tier_level['sub_layer_reserved_zero_35bits'] = []
-    profile_tier_level['sub_layer_reserved_zero_7bits'] = []
-    profile_tier_level['sub_layer_reserved_zero_43bits'] = []
-    profile_tier_level['sub_layer_inbld_flag'] = []
-    profile_tier_level['sub_layer_reserved_zero_bit'] = []
-    profile_tier_level['sub_layer_level_idc'] = []
+    if max_num_sub_layers_minus1 == 0:
+        # Single sub-layer (the common case): no sub-layer syntax follows
+        profile_tier_level['sub_layer_profile_present_flag'] = []
+        profile_tier_level['sub_layer_level_present_flag'] = []
+        profile_tier_level['reserved_zero_2bits'] = []
+        for key in SUB_LAYER_PTL_KEYS:
+            profile_tier_level[key] = []
+        return profile_tier_level
+
+    # sub_layer_profile_present_flag[i] and sub_layer_level_present_flag[i] alternate per sub-layer
+    present_flags = read_flags_safe(bs, 2 * max_num_sub_layers_minus1)
+    profile_tier_level['sub_layer_profile_present_flag'] = present_flags[0::2]
+    profile_tier_level['sub_layer_level_present_flag'] = present_flags[1::2]
+
+    num_reserved = 8 - max_num_sub_layers_minus1
+    reserved = read_uint_safe(bs, 2 * num_reserved)
+    if reserved is None:
+        profile_tier_level['reserved_zero_2bits'] = [read_uint_safe(bs, 2) for _ in range(num_reserved)]
+    else:
+        profile_tier_level['reserved_zero_2bits'] = [(reserved >> shift) & 3 for shift in range(2 * num_reserved - 2, -1, -2)]
+
+    for key in SUB_LAYER_PTL_KEYS:
+        profile_tier_level[key] = []
 
     for i in range(max_num_sub_layers_minus1):
         if profile_tier_level['sub_layer_profile_present_flag'][i]:
             profile_tier_level['sub_layer_profile_space'].append(read_uint_safe(bs, 2))
             profile_tier_level['sub_layer_tier_flag'].append(read_bool_safe(bs))
             profile_tier_level['sub_layer_profile_idc'].append(read_uint_safe(bs, 5))
-            profile_tier_level['sub_layer_profile_compatibility_flag'].append([read_bool_safe(bs) for _ in range(32)])
+            sub_layer_flags, sub_layer_compatibility = read_flag_bits_safe(bs, 32)
+            profile_tier_level['sub_layer_profile_compatibility_flag'].append(sub_layer_flags)
+            sub_layer_idc = profile_tier_level['sub_layer_profile_idc'][i]
             profile_tier_level['sub_layer_progressive_source_flag'].append(read_bool_safe(bs))
             profile_tier_level['sub_layer_interlaced_source_flag'].append(read_bool_safe(bs))
             profile_tier_level['sub_layer_non_packed_constraint_flag'].append(read_bool_safe(bs))
             profile_tier_level['sub_layer_frame_only_constraint_flag'].append(read_bool_safe(bs))
 
-            if any(profile_tier_level['sub_layer_profile_idc'][i] == condition or
-                   (profile_tier_level['sub_layer_profile_compatibility_flag'][i][condition] if profile_tier_level['sub_layer_profile_compatibility_flag'][i] else False)
-                   for condition in [4, 5, 6, 7, 8, 9, 10, 11]):
+            if sub_layer_idc in PROFILES_4_TO_11 or sub_layer_compatibility & MASK_4_TO_11:
                 profile_tier_level['sub_layer_max_12bit_constraint_flag'].append(read_bool_safe(bs))
                 profile_tier_level['sub_layer_max_10bit_constraint_flag'].append(read_bool_safe(bs))
                 profile_tier_level['sub_layer_max_8bit_constraint_flag'].append(read_bool_safe(bs))
@@ -334,9 +766,7 @@ def parse_profile_tier_level(bs, profile_present_flag, max_num_sub_layers_minus1
                 profile_tier_level['sub_layer_intra_constraint_flag'].append(read_bool_safe(bs))
                 profile_tier_level['sub_layer_one_picture_only_constraint_flag'].append(read_bool_safe(bs))
                 profile_tier_level['sub_layer_lower_bit_rate_constraint_flag'].append(read_bool_safe(bs))
-                if any(profile_tier_level['sub_layer_profile_idc'][i] == condition or
-                       profile_tier_level['sub_layer_profile_compatibility_flag'][i][condition] for condition in
-                       [5, 9, 10, 11]):
+                if sub_layer_idc in PROFILES_5_9_10_11 or sub_layer_compatibility & MASK_5_9_10_11:
                     profile_tier_level['sub_layer_max_14bit_constraint_flag'].append(read_bool_safe(bs))
                     profile_tier_level['sub_layer_reserved_zero_33bits'].append(read_uint_safe(bs, 33))
                 else:
@@ -348,10 +778,7 @@ def parse_profile_tier_level(bs, profile_present_flag, max_num_sub_layers_minus1
             else:
                 profile_tier_level['sub_layer_reserved_zero_43bits'].append(read_uint_safe(bs, 43))
 
-            if any(profile_tier_level['sub_layer_profile_idc'][i] == condition or
-                   (profile_tier_level['sub_layer_profile_compatibility_flag'][i][condition] if
-                   profile_tier_level['sub_layer_profile_compatibility_flag'][i] else False)
-                   for condition in [1, 2, 3, 4, 5, 9, 11]):
+            if sub_layer_idc in PROFILES_INBLD or sub_layer_compatibility & MASK_INBLD:
                 profile_tier_level['sub_layer_inbld_flag'].append(read_bool_safe(bs))
             else:
                 profile_tier_level['sub_layer_reserved_zero_bit'].append(read_bool_safe(bs))
@@ -359,7 +786,7 @@ def parse_profile_tier_level(bs, profile_present_flag, max_num_sub_layers_minus1
             profile_tier_level['sub_layer_profile_space'].append(None)
             profile_tier_level['sub_layer_tier_flag'].append(None)
             profile_tier_level['sub_layer_profile_idc'].append(None)
-            profile_tier_level['sub_layer_profile_compatibility_flag'].append([None] * 32)
+            profile_tier_level['sub_layer_profile_compatibility_flag'].append(list(NO_COMPATIBILITY_FLAGS))
             profile_tier_level['sub_layer_progressive_source_flag'].append(None)
             profile_tier_level['sub_layer_interlaced_source_flag'].append(None)
             profile_tier_level['sub_layer_non_packed_constraint_flag'].append(None)
@@ -375,7 +802,7 @@ def parse_profile_tier_level(bs, profile_present_flag, max_num_sub_layers_minus1
 
 
 def parse_vps(raw_data, data):
-    bs = BitStream(raw_data)
+    bs = BitReader(raw_data)
     vps = {}
     vps['data'] = data
 
@@ -391,15 +818,19 @@ def parse_vps(raw_data, data):
     vps['profile_tier_level'] = parse_profile_tier_level(bs, 1, vps['vps_max_sub_layers_minus1'])
     vps['vps_sub_layer_ordering_info_present_flag'] = read_bool_safe(bs)
 
-    vps['vps_max_dec_pic_buffering_minus1'] = []
-    vps['vps_max_num_reorder_pics'] = []
-    vps['vps_max_latency_increase_plus1'] = []
-
-    num_layers = vps['vps_max_sub_layers_minus1'] + 1 if vps['vps_sub_layer_ordering_info_present_flag'] else 1
-    for i in range(num_layers):
-        vps['vps_max_dec_pic_buffering_minus1'].append(read_ue_safe(bs))
-        vps['vps_max_num_reorder_pics'].append(read_ue_safe(bs))
-        vps['vps_max_latency_increase_plus1'].append(read_ue_safe(bs))
+    if vps['vps_sub_layer_ordering_info_present_flag']:
+        vps['vps_max_dec_pic_buffering_minus1'] = []
+        vps['vps_max_num_reorder_pics'] = []
+        vps['vps_max_latency_increase_plus1'] = []
+        for i in range(vps['vps_max_sub_layers_minus1'] + 1):
+            vps['vps_max_dec_pic_buffering_minus1'].append(read_ue_safe(bs))
+            vps['vps_max_num_reorder_pics'].append(read_ue_safe(bs))
+            vps['vps_max_latency_increase_plus1'].append(read_ue_safe(bs))
+    else:
+        # Only the highest sub-layer's values are coded
+        vps['vps_max_dec_pic_buffering_minus1'] = [read_ue_safe(bs)]
+        vps['vps_max_num_reorder_pics'] = [read_ue_safe(bs)]
+        vps['vps_max_latency_increase_plus1'] = [read_ue_safe(bs)]
 
     vps['vps_max_layer_id'] = read_uint_safe(bs, 6)
     vps['vps_num_layer_sets_minus1'] = read_ue_safe(bs)
@@ -439,7 +870,7 @@ def parse_vps(raw_data, data):
 
 
 def parse_sps(raw_data, data):
-    bs = BitStream(raw_data)
+    bs = BitReader(raw_data)
     sps = {}
     sps['data'] = data
 
@@ -471,14 +902,19 @@ def parse_sps(raw_data, data):
     sps['log2_max_pic_order_cnt_lsb_minus4'] = read_ue_safe(bs)
 
     sps['sps_sub_layer_ordering_info_present_flag'] = read_bool_safe(bs)
-    sps['max_dec_pic_buffering_minus1'] = []
-    sps['max_num_reorder_pics'] = []
-    sps['max_latency_increase_plus1'] = []
-    start_layer = 0 if sps['sps_sub_layer_ordering_info_present_flag'] else sps['sps_max_sub_layers_minus1']
-    for i in range(start_layer, sps['sps_max_sub_layers_minus1'] + 1):
-        sps['max_dec_pic_buffering_minus1'].append(read_ue_safe(bs))
-        sps['max_num_reorder_pics'].append(read_ue_safe(bs))
-        sps['max_latency_increase_plus1'].append(read_ue_safe(bs))
+    if sps['sps_sub_layer_ordering_info_present_flag']:
+        sps['max_dec_pic_buffering_minus1'] = []
+        sps['max_num_reorder_pics'] = []
+        sps['max_latency_increase_plus1'] = []
+        for i in range(sps['sps_max_sub_layers_minus1'] + 1):
+            sps['max_dec_pic_buffering_minus1'].append(read_ue_safe(bs))
+            sps['max_num_reorder_pics'].append(read_ue_safe(bs))
+            sps['max_latency_increase_plus1'].append(read_ue_safe(bs))
+    else:
+        # Only the highest sub-layer's values are coded
+        sps['max_dec_pic_buffering_minus1'] = [read_ue_safe(bs)]
+        sps['max_num_reorder_pics'] = [read_ue_safe(bs)]
+        sps['max_latency_increase_plus1'] = [read_ue_safe(bs)]
 
     sps['log2_min_luma_coding_block_size_minus3'] = read_ue_safe(bs)
     sps['log2_diff_max_min_luma_coding_block_size'] = read_ue_safe(bs)
@@ -544,15 +980,15 @@ def parse_sps(raw_data, data):
 
 def parse_sps_range_extension(bs):
     sps_range_extension = {}
-    sps_range_extension['transform_skip_rotation_enabled_flag'] = read_bool_safe(bs)
-    sps_range_extension['transform_skip_context_enabled_flag'] = read_bool_safe(bs)
-    sps_range_extension['implicit_rdpcm_enabled_flag'] = read_bool_safe(bs)
-    sps_range_extension['explicit_rdpcm_enabled_flag'] = read_bool_safe(bs)
-    sps_range_extension['extended_precision_processing_flag'] = read_bool_safe(bs)
-    sps_range_extension['intra_smoothing_disabled_flag'] = read_bool_safe(bs)
-    sps_range_extension['high_precision_offsets_enabled_flag'] = read_bool_safe(bs)
-    sps_range_extension['persistent_rice_adaptation_enabled_flag'] = read_bool_safe(bs)
-    sps_range_extension['cabac_bypass_alignment_enabled_flag'] = read_bool_safe(bs)
+    (sps_range_extension['transform_skip_rotation_enabled_flag'],
+     sps_range_extension['transform_skip_context_enabled_flag'],
+     sps_range_extension['implicit_rdpcm_enabled_flag'],
+     sps_range_extension['explicit_rdpcm_enabled_flag'],
+     sps_range_extension['extended_precision_processing_flag'],
+     sps_range_extension['intra_smoothing_disabled_flag'],
+     sps_range_extension['high_precision_offsets_enabled_flag'],
+     sps_range_extension['persistent_rice_adaptation_enabled_flag'],
+     sps_range_extension['cabac_bypass_alignment_enabled_flag']) = read_fields_safe(bs, (1, 1, 1, 1, 1, 1, 1, 1, 1))
     return sps_range_extension
 
 def parse_sps_multilayer_extension(bs):
@@ -626,45 +1062,41 @@ def parse_sps_scc_extension(bs, chroma_format_idc):
 
 
 def parse_pps(raw_data, data):
-    bs = BitStream(raw_data)
+    bs = BitReader(raw_data)
     pps = {}
     pps['data'] = data
 
     pps['pps_pic_parameter_set_id'] = read_ue_safe(bs)
     pps['pps_seq_parameter_set_id'] = read_ue_safe(bs)
-    pps['dependent_slice_segments_enabled_flag'] = read_bool_safe(bs)
-    pps['output_flag_present_flag'] = read_bool_safe(bs)
-    pps['num_extra_slice_header_bits'] = read_uint_safe(bs, 3)
-    pps['sign_data_hiding_enabled_flag'] = read_bool_safe(bs)
-    pps['cabac_init_present_flag'] = read_bool_safe(bs)
+    (pps['dependent_slice_segments_enabled_flag'], pps['output_flag_present_flag'],
+     pps['num_extra_slice_header_bits'], pps['sign_data_hiding_enabled_flag'],
+     pps['cabac_init_present_flag']) = read_fields_safe(bs, (1, 1, 3, 1, 1))
     pps['num_ref_idx_l0_default_active_minus1'] = read_ue_safe(bs)
     pps['num_ref_idx_l1_default_active_minus1'] = read_ue_safe(bs)
     pps['init_qp_minus26'] = read_se_safe(bs)
     pps['constrained_intra_pred_flag'] = read_bool_safe(bs)
     pps['transform_skip_enabled_flag'] = read_bool_safe(bs)
-    pps['cu_qp_delta_enabled_flag'] = read_bool_safe(bs)
+    cu_qp_delta_enabled_flag = pps['cu_qp_delta_enabled_flag'] = read_bool_safe(bs)
 
-    if pps.get('cu_qp_delta_enabled_flag'):
+    if cu_qp_delta_enabled_flag:
         pps['diff_cu_qp_delta_depth'] = read_ue_safe(bs)
 
     pps['pps_cb_qp_offset'] = read_se_safe(bs)
     pps['pps_cr_qp_offset'] = read_se_safe(bs)
-    pps['pps_slice_chroma_qp_offsets_present_flag'] = read_bool_safe(bs)
-    pps['weighted_pred_flag'] = read_bool_safe(bs)
-    pps['weighted_bipred_flag'] = read_bool_safe(bs)
-    pps['transquant_bypass_enabled_flag'] = read_bool_safe(bs)
-    pps['tiles_enabled_flag'] = read_bool_safe(bs)
-    pps['entropy_coding_sync_enabled_flag'] = read_bool_safe(bs)
-
-    if pps.get('tiles_enabled_flag', False):
-        pps['num_tile_columns_minus1'] = read_ue_safe(bs)
-        pps['num_tile_rows_minus1'] = read_ue_safe(bs)
-        pps['uniform_spacing_flag'] = read_bool_safe(bs)
-        if not pps.get('uniform_spacing_flag'):
-            if pps.get('num_tile_columns_minus1') is not None:
-                pps['column_width_minus1'] = [read_ue_safe(bs) for _ in range(pps['num_tile_columns_minus1'])]
-            if pps.get('num_tile_rows_minus1') is not None:
-                pps['row_height_minus1'] = [read_ue_safe(bs) for _ in range(pps['num_tile_rows_minus1'])]
+    (pps['pps_slice_chroma_qp_offsets_present_flag'], pps['weighted_pred_flag'], pps['weighted_bipred_flag'],
+     pps['transquant_bypass_enabled_flag'], pps['tiles_enabled_flag'],
+     pps['entropy_coding_sync_enabled_flag']) = read_fields_safe(bs, (1, 1, 1, 1, 1, 1))
+    tiles_enabled_flag = pps['tiles_enabled_flag']
+
+    if tiles_enabled_flag:
+        num_tile_columns_minus1 = pps['num_tile_columns_minus1'] = read_ue_safe(bs)
+        num_tile_rows_minus1 = pps['num_tile_rows_minus1'] = read_ue_safe(bs)
+        uniform_spacing_flag = pps['uniform_spacing_flag'] = read_bool_safe(bs)
+        if not uniform_spacing_flag:
+            if num_tile_columns_minus1 is not None:
+                pps['column_width_minus1'] = read_ues_safe(bs, num_tile_columns_minus1)
+            if num_tile_rows_minus1 is not None:
+                pps['row_height_minus1'] = read_ues_safe(bs, num_tile_rows_minus1)
 
         pps['loop_filter_across_tiles_enabled_flag'] = read_bool_safe(bs)
     else: # for initialize
@@ -672,38 +1104,40 @@ def parse_pps(raw_data, data):
         pps['num_tile_rows_minus1'] = 0
 
     pps['pps_loop_filter_across_slices_enabled_flag'] = read_bool_safe(bs)
-    pps['deblocking_filter_control_present_flag'] = read_bool_safe(bs)
+    deblocking_filter_control_present_flag = pps['deblocking_filter_control_present_flag'] = read_bool_safe(bs)
 
-    if pps.get('deblocking_filter_control_present_flag'):
+    if deblocking_filter_control_present_flag:
         pps['deblocking_filter_override_enabled_flag'] = read_bool_safe(bs)
-        pps['pps_deblocking_filter_disabled_flag'] = read_bool_safe(bs)
-        if not pps['pps_deblocking_filter_disabled_flag']:
+        pps_deblocking_filter_disabled_flag = pps['pps_deblocking_filter_disabled_flag'] = read_bool_safe(bs)
+        if not pps_deblocking_filter_disabled_flag:
             pps['pps_beta_offset_div2'] = read_se_safe(bs)
             pps['pps_tc_offset_div2'] = read_se_safe(bs)
 
-    pps['pps_scaling_list_data_present_flag'] = read_bool_safe(bs)
-    if pps.get('pps_scaling_list_data_present_flag'):
+    pps_scaling_list_data_present_flag = pps['pps_scaling_list_data_present_flag'] = read_bool_safe(bs)
+    if pps_scaling_list_data_present_flag:
         pps['scaling_list_data'] = parse_scaling_list_data(bs)
 
     pps['lists_modification_present_flag'] = read_bool_safe(bs)
     pps['log2_parallel_merge_level_minus2'] = read_ue_safe(bs)
     pps['slice_segment_header_extension_present_flag'] = read_bool_safe(bs)
 
-    pps['pps_extension_present_flag'] = read_bool_safe(bs)
-    if pps.get('pps_extension_present_flag'):
-        pps['pps_range_extension_flag'] = read_bool_safe(bs)
-        pps['pps_multilayer_extension_flag'] = read_bool_safe(bs)
-        pps['pps_3d_extension_flag'] = read_bool_safe(bs)
-        pps['pps_scc_extension_flag'] = read_bool_safe(bs)
+    pps_extension_present_flag = pps['pps_extension_present_flag'] = read_bool_safe(bs)
+    if pps_extension_present_flag:
+        # The four extension flags are one u(4) read
+        range_flag, multilayer_flag, flag_3d, scc_flag = read_flags_safe(bs, 4)
+        pps['pps_range_extension_flag'] = range_flag
+        pps['pps_multilayer_extension_flag'] = multilayer_flag
+        pps['pps_3d_extension_flag'] = flag_3d
+        pps['pps_scc_extension_flag'] = scc_flag
         pps['pps_extension_4bits'] = read_uint_safe(bs, 4)
 
-        if pps.get('pps_range_extension_flag'):
+        if range_flag:
             pps['pps_range_extension'] = parse_pps_range_extension(bs)
-        if pps.get('pps_multilayer_extension_flag'):
+        if multilayer_flag:
             pps['pps_multilayer_extension'] = parse_pps_multilayer_extension(bs)
-        if pps.get('pps_3d_extension_flag'):
+        if flag_3d:
             pps['pps_3d_extension'] = parse_pps_3d_extension(bs)
-        if pps.get('pps_scc_extension_flag'):
+        if scc_flag:
             pps['pps_scc_extension'] = parse_pps_scc_extension(bs)
 
     return pps
@@ -723,71 +1157,80 @@ def parse_pps_range_extension(bs):
         pps_range_extension['diff_cu_chroma_qp_offset_depth'] = read_ue_safe(bs)
         pps_range_extension['chroma_qp_offset_list_len_minus1'] = read_ue_safe(bs)
 
-        pps_range_extension['cb_qp_offset_list'] = []
-        pps_range_extension['cr_qp_offset_list'] = []
-
-        for i in range(pps_range_extension['chroma_qp_offset_list_len_minus1'] + 1):
-            cb_qp_offset = read_se_safe(bs)
-            cr_qp_offset = read_se_safe(bs)
-            pps_range_extension['cb_qp_offset_list'].append(cb_qp_offset)
-            pps_range_extension['cr_qp_offset_list'].append(cr_qp_offset)
+        # cb_qp_offset_list[i] and cr_qp_offset_list[i] are coded as pairs
+        pairs = [(read_se_safe(bs), read_se_safe(bs)) for _ in range(pps_range_extension['chroma_qp_offset_list_len_minus1'] + 1)]
+        pps_range_extension['cb_qp_offset_list'], pps_range_extension['cr_qp_offset_list'] = _columns(pairs, 2)
 
     pps_range_extension['log2_sao_offset_scale_luma'] = read_ue_safe(bs)
     pps_range_extension['log2_sao_offset_scale_chroma'] = read_ue_safe(bs)
 
     return pps_range_extension
 
+def _columns(rows, width):
+    # Transpose fixed-width rows into `width` lists; no rows still gives empty lists
+    if not rows:
+        return [[] for _ in range(width)]
+    return [list(column) for column in zip(*rows)]
+
 def parse_pps_multilayer_extension(bs):
+    # Bound locally; the loops below make these the hottest names in the function
+    rb, ru, rs, rui = read_bool_safe, read_ue_safe, read_se_safe, read_uint_safe
     pps_multilayer_extension = {}
 
-    pps_multilayer_extension['poc_reset_info_present_flag'] = read_bool_safe(bs)
-    pps_multilayer_extension['pps_infer_scaling_list_flag'] = read_bool_safe(bs)
+    pps_multilayer_extension['poc_reset_info_present_flag'] = rb(bs)
+    pps_multilayer_extension['pps_infer_scaling_list_flag'] = rb(bs)
     if pps_multilayer_extension['pps_infer_scaling_list_flag']:
-        pps_multilayer_extension['pps_scaling_list_ref_layer_id'] = read_uint_safe(bs, 6)
-
-    pps_multilayer_extension['num_ref_loc_offsets'] = read_ue_safe(bs)
-    pps_multilayer_extension['ref_loc_offset_layer_id'] = []
-    pps_multilayer_extension['scaled_ref_layer_offset_present_flag'] = []
-    pps_multilayer_extension['scaled_ref_layer_left_offset'] = []
-    pps_multilayer_extension['scaled_ref_layer_top_offset'] = []
-    pps_multilayer_extension['scaled_ref_layer_right_offset'] = []
-    pps_multilayer_extension['scaled_ref_layer_bottom_offset'] = []
-    pps_multilayer_extension['ref_region_offset_present_flag'] = []
-    pps_multilayer_extension['ref_region_left_offset'] = []
-    pps_multilayer_extension['ref_region_top_offset'] = []
-    pps_multilayer_extension['ref_region_right_offset'] = []
-    pps_multilayer_extension['ref_region_bottom_offset'] = []
-    pps_multilayer_extension['resample_phase_set_present_flag'] = []
-    pps_multilayer_extension['phase_hor_luma'] = []
-    pps_multilayer_extension['phase_ver_luma'] = []
-    pps_multilayer_extension['phase_hor_chroma_plus8'] = []
-    pps_multilayer_extension['phase_ver_chroma_plus8'] = []
-
-    for i in range(pps_multilayer_extension['num_ref_loc_offsets']):
-        pps_multilayer_extension['ref_loc_offset_layer_id'].append(read_uint_safe(bs, 6))
-
-        pps_multilayer_extension['scaled_ref_layer_offset_present_flag'].append(read_bool_safe(bs))
-        if pps_multilayer_extension['scaled_ref_layer_offset_present_flag'][i]:
-            pps_multilayer_extension['scaled_ref_layer_left_offset'].append(read_se_safe(bs))
-            pps_multilayer_extension['scaled_ref_layer_top_offset'].append(read_se_safe(bs))
-            pps_multilayer_extension['scaled_ref_layer_right_offset'].append(read_se_safe(bs))
-            pps_multilayer_extension['scaled_ref_layer_bottom_offset'].append(read_se_safe(bs))
-
-        pps_multilayer_extension['ref_region_offset_present_flag'].append(read_bool_safe(bs))
-        if pps_multilayer_extension['ref_region_offset_present_flag'][i]:
-            pps_multilayer_extension['ref_region_left_offset'].append(read_se_safe(bs))
-            pps_multilayer_extension['ref_region_top_offset'].append(read_se_safe(bs))
-            pps_multilayer_extension['ref_region_right_offset'].append(read_se_safe(bs))
-            pps_multilayer_extension['ref_region_bottom_offset'].append(read_se_safe(bs))
-
-        pps_multilayer_extension['resample_phase_set_present_flag'].append(read_bool_safe(bs))
-        if pps_multilayer_extension['resample_phase_set_present_flag'][i]:
-            pps_multilayer_extension['phase_hor_luma'].append(read_ue_safe(bs))
-            pps_multilayer_extension['phase_ver_luma'].append(read_ue_safe(bs))
-            pps_multilayer_extension['phase_hor_chroma_plus8'].append(read_ue_safe(bs))
-            pps_multilayer_extension['phase_ver_chroma_plus8'].append(read_ue_safe(bs))
-
-    pps_multilayer_extension['colour_mapping_enabled_flag'] = read_bool_safe(bs)
+        pps_multilayer_extension['pps_scaling_list_ref_layer_id'] = rui(bs, 6)
+
+    num_ref_loc_offsets = ru(bs)
+    ref_loc_offset_layer_id = [None] * num_ref_loc_offsets
+    scaled_ref_layer_offset_present_flag = [None] * num_ref_loc_offsets
+    ref_region_offset_present_flag = [None] * num_ref_loc_offsets
+    resample_phase_set_present_flag = [None] * num_ref_loc_offsets
+    # The offset groups are only coded when their present flag is set, so collect them as rows
+    scaled_ref_layer_offsets = []
+    ref_region_offsets = []
+    resample_phases = []
+
+    for i in range(num_ref_loc_offsets):
+        ref_loc_offset_layer_id[i] = rui(bs, 6)
+
+        scaled_ref_layer_offset_present_flag[i] = rb(bs)
+        if scaled_ref_layer_offset_present_flag[i]:
+            scaled_ref_layer_offsets.append((rs(bs), rs(bs), rs(bs), rs(bs)))
+
+        ref_region_offset_present_flag[i] = rb(bs)
+        if ref_region_offset_present_flag[i]:
+            ref_region_offsets.append((rs(bs), rs(bs), rs(bs), rs(bs)))
+
+        resample_phase_set_present_flag[i] = rb(bs)
+        if resample_phase_set_present_flag[i]:
+            resample_phases.append((ru(bs), ru(bs), ru(bs), ru(bs)))
+
+    scaled_left, scaled_top, scaled_right, scaled_bottom = _columns(scaled_ref_layer_offsets, 4)
+    region_left, region_top, region_right, region_bottom = _columns(ref_region_offsets, 4)
+    phase_hor_luma, phase_ver_luma, phase_hor_chroma_plus8, phase_ver_chroma_plus8 = _columns(resample_phases, 4)
+    pps_multilayer_extension.update({
+        'num_ref_loc_offsets': num_ref_loc_offsets,
+        'ref_loc_offset_layer_id': ref_loc_offset_layer_id,
+        'scaled_ref_layer_offset_present_flag': scaled_ref_layer_offset_present_flag,
+        'scaled_ref_layer_left_offset': scaled_left,
+        'scaled_ref_layer_top_offset': scaled_top,
+        'scaled_ref_layer_right_offset': scaled_right,
+        'scaled_ref_layer_bottom_offset': scaled_bottom,
+        'ref_region_offset_present_flag': ref_region_offset_present_flag,
+        'ref_region_left_offset': region_left,
+        'ref_region_top_offset': region_top,
+        'ref_region_right_offset': region_right,
+        'ref_region_bottom_offset': region_bottom,
+        'resample_phase_set_present_flag': resample_phase_set_present_flag,
+        'phase_hor_luma': phase_hor_luma,
+        'phase_ver_luma': phase_ver_luma,
+        'phase_hor_chroma_plus8': phase_hor_chroma_plus8,
+        'phase_ver_chroma_plus8': phase_ver_chroma_plus8,
+    })
+
+    pps_multilayer_extension['colour_mapping_enabled_flag'] = rb(bs)
     if pps_multilayer_extension['colour_mapping_enabled_flag']:
         pps_multilayer_extension['colour_mapping_table'] = parse_colour_mapping_table(bs)
 
@@ -816,39 +1259,53 @@ def parse_colour_mapping_table(bs):
         colour_mapping_table['cm_adapt_threshold_u_delta'] = read_se_safe(bs)
         colour_mapping_table['cm_adapt_threshold_v_delta'] = read_se_safe(bs)
 
+    part_num_y = 1 << (colour_mapping_table['cm_y_part_num_log2'] or 0)
+    # CMResLSBits: length of res_coeff_r
+    res_ls_bits = max(0, 10 + (colour_mapping_table['luma_bit_depth_cm_input_minus8'] or 0)
+                      - (colour_mapping_table['luma_bit_depth_cm_output_minus8'] or 0)
+                      - (colour_mapping_table['cm_res_quant_bits'] or 0)
+                      - ((colour_mapping_table['cm_delta_flc_bits_minus1'] or 0) + 1))
     colour_mapping_table['colour_mapping_octants'] = parse_colour_mapping_octants(
-        bs, 0, 0, 0, 0, 1 << colour_mapping_table['cm_octant_depth']
+        bs, colour_mapping_table['cm_octant_depth'] or 0, part_num_y, res_ls_bits
     )
 
     return colour_mapping_table
 
-def parse_colour_mapping_octants(bs, inp_depth, idx_y, idx_cb, idx_cr, inp_length):
-    octants = {}
-
-    if inp_depth < read_uint_safe(bs, 2):
-        octants['split_octant_flag'] = read_bool_safe(bs)
-        if octants['split_octant_flag']:
-            for k in range(2):
-                for m in range(2):
-                    for n in range(2):
-                        parse_colour_mapping_octants(bs, inp_depth + 1,
-                                                     idx_y + (1 << inp_length) * k,
-                                                     idx_cb + (1 << inp_length) * m,
-                                                     idx_cr + (1 << inp_length) * n,
-                                                     inp_length // 2)
+# (k, m, n) child offsets of a split octant, in bitstream order
+OCTANT_CHILDREN = tuple((k, m, n) for k in range(2) for m in range(2) for n in range(2))
+
+def parse_colour_mapping_octants(bs, cm_octant_depth, part_num_y, res_ls_bits):
+    # Walks the octree with an explicit stack instead of recursing; every visited octant
+    # is appended to one flat list in bitstream (depth-first) order
+    rb, ru, rui = read_bool_safe, read_ue_safe, read_uint_safe
+    octants = []
+    stack = [(0, 0, 0, 0, 1 << cm_octant_depth)]
+    while stack:
+        inp_depth, idx_y, idx_cb, idx_cr, inp_length = stack.pop()
+        octant = {'inp_depth': inp_depth, 'idx_y': idx_y, 'idx_cb': idx_cb, 'idx_cr': idx_cr}
+        octant['split_octant_flag'] = rb(bs) if inp_depth < cm_octant_depth else False
+        octants.append(octant)
+
+        if octant['split_octant_flag']:
+            half = inp_length >> 1
+            # Pushed in reverse so the first child is parsed first
+            for k, m, n in reversed(OCTANT_CHILDREN):
+                stack.append((inp_depth + 1, idx_y + part_num_y * k * half, idx_cb + m * half, idx_cr + n * half, half))
         else:
-            octants['coded_res_flag'] = []
-            for i in range(1 << inp_length):
-                octants['coded_res_flag'].append(read_bool_safe(bs))
-                if octants['coded_res_flag'][i]:
-                    octants['res_coeff'] = []
-                    for c in range(3):
-                        res_coeff = {}
-                        res_coeff['res_coeff_q'] = read_ue_safe(bs)
-                        res_coeff['res_coeff_sign_flag'] = read_bool_safe(bs)
-                        if res_coeff['res_coeff_sign_flag']:
-                            res_coeff['res_coeff_abs_minus1'] = read_ue_safe(bs)
-                        octants['res_coeff'].append(res_coeff)
+            # One coded_res_flag per (i, j) with i < part_num_y, j < 4, in row order
+            coded_res_flags = octant['coded_res_flag'] = [None] * (part_num_y << 2)
+            res_coeffs = octant['res_coeff'] = []
+            for i in range(part_num_y << 2):
+                coded_res_flag = coded_res_flags[i] = rb(bs)
+                if coded_res_flag:
+                    for _ in range(3):
+                        res_coeff_q = ru(bs)
+                        res_coeff_r = rui(bs, res_ls_bits)
+                        if res_coeff_q or res_coeff_r:
+                            res_coeffs.append({'res_coeff_q': res_coeff_q, 'res_coeff_r': res_coeff_r,
+                                               'res_coeff_s': rb(bs)})
+                        else:
+                            res_coeffs.append({'res_coeff_q': res_coeff_q, 'res_coeff_r': res_coeff_r})
     return octants
 
 def parse_pps_3d_extension(bs):
@@ -934,7 +1391,17 @@ def parse_pps_scc_extension(bs):
 
     return pps_scc_extension
 
+# coefNum = Min(64, 1 << (4 + (sizeId << 1))) and the number of matrices per sizeId
+SCALING_LIST_COEF_NUM = (16, 64, 64, 64)
+SCALING_LIST_MATRIX_NUM = (6, 6, 6, 2)
+
+def _reconstruct_scaling_list(deltas, start):
+    # nextCoef = (nextCoef + delta + 256) % 256 at every step is a running sum taken mod 256;
+    # accumulate runs the loop in C and islice drops the seed value without a list copy
+    return [coef & 0xFF for coef in itertools.islice(itertools.accumulate(deltas, initial=start), 1, None)]
+
 def parse_scaling_list_data(bs):
+    rb, ru, rs = read_bool_safe, read_ue_safe, read_se_safe
     scaling_list_data = {}
 
     scaling_list_data['scaling_list_pred_mode_flag'] = []
@@ -944,48 +1411,46 @@ def parse_scaling_list_data(bs):
     scaling_list_data['ScalingList'] = []
 
     for sizeId in range(4):
-        scaling_list_data['scaling_list_pred_mode_flag'].append([])
-        scaling_list_data['scaling_list_pred_matrix_id_delta'].append([])
-        scaling_list_data['scaling_list_dc_coef_minus8'].append([])
-        scaling_list_data['scaling_list_delta_coef'].append([])
-        scaling_list_data['ScalingList'].append([])
-
-        for matrixId in range(6 if sizeId != 3 else 2):
-            scaling_list_data['scaling_list_pred_mode_flag'][sizeId].append(read_bool_safe(bs))
-
-            if scaling_list_data['scaling_list_pred_mode_flag'][sizeId][matrixId] is None:
+        matrix_num = SCALING_LIST_MATRIX_NUM[sizeId]
+        pred_mode_flags = []
+        pred_matrix_id_deltas = []
+        dc_coefs = []
+        delta_coefs = []
+        # One slot per matrixId; matrices predicted from another one stay empty
+        scaling_lists = [[] for _ in range(matrix_num)]
+        scaling_list_data['scaling_list_pred_mode_flag'].append(pred_mode_flags)
+        scaling_list_data['scaling_list_pred_matrix_id_delta'].append(pred_matrix_id_deltas)
+        scaling_list_data['scaling_list_dc_coef_minus8'].append(dc_coefs)
+        scaling_list_data['scaling_list_delta_coef'].append(delta_coefs)
+        scaling_list_data['ScalingList'].append(scaling_lists)
+
+        for matrixId in range(matrix_num):
+            pred_mode_flag = rb(bs)
+            pred_mode_flags.append(pred_mode_flag)
+            if pred_mode_flag is None:
                 return None
 
-            if not scaling_list_data['scaling_list_pred_mode_flag'][sizeId][matrixId]:
-                delta = read_ue_safe(bs)
+            if not pred_mode_flag:
+                delta = ru(bs)
                 if delta is None:
                     return None
-                scaling_list_data['scaling_list_pred_matrix_id_delta'][sizeId].append(delta)
+                pred_matrix_id_deltas.append(delta)
             else:
-                scaling_list_data['scaling_list_pred_matrix_id_delta'][sizeId].append(None)
+                pred_matrix_id_deltas.append(None)
 
-                coefNum = min(64, (1 << (4 + (sizeId << 1)))) if sizeId else 8
                 nextCoef = 8
-
                 if sizeId > 1:
-                    dc_coef = read_se_safe(bs)
+                    dc_coef = rs(bs)
                     if dc_coef is None:
                         return None
-                    scaling_list_data['scaling_list_dc_coef_minus8'][sizeId].append(dc_coef)
+                    dc_coefs.append(dc_coef)
                     nextCoef = dc_coef + 8
 
-                for i in range(coefNum):
-                    delta_coef = read_se_safe(bs)
-                    if delta_coef is None:
-                        return None
-                    scaling_list_data['scaling_list_delta_coef'][sizeId].append(delta_coef)
-                    nextCoef = (nextCoef + delta_coef + 256) % 256
-                    if len(scaling_list_data['ScalingList'][sizeId]) <= matrixId:
-                        scaling_list_data['ScalingList'][sizeId].append([])
-                    try:
-                        scaling_list_data['ScalingList'][sizeId][matrixId].append(nextCoef)
-                    except IndexError:  # to-do
-                        pass
+                deltas = [rs(bs) for _ in range(SCALING_LIST_COEF_NUM[sizeId])]
+                if None in deltas:
+                    return None
+                delta_coefs.extend(deltas)
+                scaling_lists[matrixId] = _reconstruct_scaling_list(deltas, nextCoef)
 
     return scaling_list_data
 
@@ -993,6 +1458,7 @@ def parse_scaling_list_data(bs):
 
 
 def parse_short_term_ref_pic_set(bs, st_rps_idx, num_short_term_ref_pic_sets):
+    rb, ru, rui = read_bool_safe, read_ue_safe, read_uint_safe
     short_term_ref_pic_set = {}
 
     short_term_ref_pic_set['inter_ref_pic_set_prediction_flag'] = None
@@ -1003,58 +1469,65 @@ def parse_short_term_ref_pic_set(bs, st_rps_idx, num_short_term_ref_pic_sets):
     short_term_ref_pic_set['use_delta_flag'] = []
 
     if st_rps_idx != 0:
-        short_term_ref_pic_set['inter_ref_pic_set_prediction_flag'] = read_bool_safe(bs)
+        short_term_ref_pic_set['inter_ref_pic_set_prediction_flag'] = rb(bs)
         if short_term_ref_pic_set['inter_ref_pic_set_prediction_flag']:
             if st_rps_idx == num_short_term_ref_pic_sets:
-                short_term_ref_pic_set['delta_idx_minus1'] = read_ue_safe(bs)
-            short_term_ref_pic_set['delta_rps_sign'] = read_uint_safe(bs, 1)
-            short_term_ref_pic_set['abs_delta_rps_minus1'] = read_ue_safe(bs)
+                short_term_ref_pic_set['delta_idx_minus1'] = ru(bs)
+            short_term_ref_pic_set['delta_rps_sign'] = rui(bs, 1)
+            short_term_ref_pic_set['abs_delta_rps_minus1'] = ru(bs)
             NumDeltaPocs = 0  # This should be calculated based on the reference picture set
             for j in range(NumDeltaPocs + 1):
-                used_by_curr_pic_flag = read_bool_safe(bs)
+                used_by_curr_pic_flag = rb(bs)
                 short_term_ref_pic_set['used_by_curr_pic_flag'].append(used_by_curr_pic_flag)
                 if not used_by_curr_pic_flag:
-                    short_term_ref_pic_set['use_delta_flag'].append(read_bool_safe(bs))
+                    short_term_ref_pic_set['use_delta_flag'].append(rb(bs))
     else:
-        short_term_ref_pic_set['num_negative_pics'] = read_ue_safe(bs)
-        short_term_ref_pic_set['num_positive_pics'] = read_ue_safe(bs)
-        short_term_ref_pic_set['delta_poc_s0_minus1'] = []
-        short_term_ref_pic_set['used_by_curr_pic_s0_flag'] = []
-        short_term_ref_pic_set['delta_poc_s1_minus1'] = []
-        short_term_ref_pic_set['used_by_curr_pic_s1_flag'] = []
+        num_negative_pics = short_term_ref_pic_set['num_negative_pics'] = ru(bs)
+        num_positive_pics = short_term_ref_pic_set['num_positive_pics'] = ru(bs)
+        delta_poc_s0_minus1 = short_term_ref_pic_set['delta_poc_s0_minus1'] = [None] * num_negative_pics
+        used_by_curr_pic_s0_flag = short_term_ref_pic_set['used_by_curr_pic_s0_flag'] = [None] * num_negative_pics
+        delta_poc_s1_minus1 = short_term_ref_pic_set['delta_poc_s1_minus1'] = [None] * num_positive_pics
+        used_by_curr_pic_s1_flag = short_term_ref_pic_set['used_by_curr_pic_s1_flag'] = [None] * num_positive_pics
 
-        for i in range(short_term_ref_pic_set['num_negative_pics']):
-            short_term_ref_pic_set['delta_poc_s0_minus1'].append(read_ue_safe(bs))
-            short_term_ref_pic_set['used_by_curr_pic_s0_flag'].append(read_bool_safe(bs))
+        for i in range(num_negative_pics):
+            delta_poc_s0_minus1[i] = ru(bs)
+            used_by_curr_pic_s0_flag[i] = rb(bs)
 
-        for i in range(short_term_ref_pic_set['num_positive_pics']):
-            short_term_ref_pic_set['delta_poc_s1_minus1'].append(read_ue_safe(bs))
-            short_term_ref_pic_set['used_by_curr_pic_s1_flag'].append(read_bool_safe(bs))
+        for i in range(num_positive_pics):
+            delta_poc_s1_minus1[i] = ru(bs)
+            used_by_curr_pic_s1_flag[i] = rb(bs)
 
     return short_term_ref_pic_set
 
 
+def _skip_ff_bytes(bs):
+    # Count and consume a run of 0xFF bytes straight off the buffer; bs must be byte-aligned
+    buf = bs.buf
+    start = end = bs.pos >> 3
+    while end < len(buf) and buf[end] == 0xFF:
+        end += 1
+    bs.pos = end << 3
+    return end - start
+
 def parse_sei_message(bs):
     sei_message = {}
 
     # Parse payloadType
     sei_message['payload_type'] = 0
-    while not bs.pos % 8 == 0:  # byte alignment check
-        bit = read_uint_safe(bs, 1)
-        if bit is not None:
-            sei_message['payload_type'] += bit
-    while bs.peek('uint:8') == 0xFF:
-        sei_message['payload_type'] += 255
-        bs.read(8)  # We need to skip these bytes
+    misaligned_bits = bs.pos & 7
+    if misaligned_bits:
+        # SEI messages start byte-aligned; stray bits left by a payload parser are folded in
+        # one read instead of bit by bit, keeping the historical sum of their values
+        bits = read_uint_safe(bs, 8 - misaligned_bits)
+        if bits is not None:
+            sei_message['payload_type'] += bin(bits).count('1')
+    sei_message['payload_type'] += 255 * _skip_ff_bytes(bs)
     payload_type_additional = read_uint_safe(bs, 8)
     if payload_type_additional is not None:
         sei_message['payload_type'] += payload_type_additional
 
     # Parse payloadSize
-    sei_message['payload_size'] = 0
-    while bs.peek('uint:8') == 0xFF:
-        sei_message['payload_size'] += 255
-        bs.read(8)  # We need to skip these bytes
+    sei_message['payload_size'] = 255 * _skip_ff_bytes(bs)
     payload_size_additional = read_uint_safe(bs, 8)
     if payload_size_additional is not None:
         sei_message['payload_size'] += payload_size_additional
@@ -1062,211 +1535,206 @@ def parse_sei_message(bs):
     return sei_message
 
 def more_data_in_payload(bs):
-    if bs.pos >= len(bs) - 8:  
-        return False
-    next_bits = bs.peek('uint:8')
-    if next_bits == 0x80:  # rbsp_trailing_bits()
+    pos = bs.pos
+    if pos >= bs.len - 8:
         return False
-    return True
+    # 0x80 is rbsp_trailing_bits()
+    if pos & 7 == 0:
+        return bs.buf[pos >> 3] != 0x80
+    return bs.peek_uint8() != 0x80
+
+class _DictAccess:
+    __slots__ = ()
+
+    # Keep dict-style access working for callers written against the old dict result
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass(slots=True)
+class SEIPayload(_DictAccess):
+    type: int
+    size: int
+    parsed_data: Any = None
+
+# HDR metadata SEIs are typically repeated byte for byte at every IRAP picture, so parse each
+# distinct payload once; cached results are shared between the messages that hit them.
+# Only the fixed-layout MDCV, CLLI and AVE payloads are cached, and only at their full size,
+# where the result depends on nothing but the payload bytes
+SEI_PAYLOAD_CACHE_SIZE = 64
+CACHED_SEI_PAYLOAD_SIZES = {137: 24, 144: 4, 148: 8}
+_sei_payload_cache = OrderedDict()
+
+# None parses every SEI type; a set of payloadType values limits parsing to those types, and
+# the others are stepped over with parsed_data None
+ENABLED_SEI_PAYLOAD_TYPES = None
 
 def parse_sei_payload(bs, payload_type, payload_size, sps=None):
-    payload = {}
-    payload['type'] = payload_type
-    payload['size'] = payload_size
-
     start_pos = bs.pos
-    if payload_type == 0:
-        payload['parsed_data'] = parse_buffering_period(bs, sps)
-    elif payload_type == 1:
-        payload['parsed_data'] = parse_pic_timing(bs, sps)
-    elif payload_type == 2:
-        payload['parsed_data'] = parse_pan_scan_rect(bs)
-    elif payload_type == 3:
-        payload['parsed_data'] = parse_filler_payload(bs, payload_size)
-    elif payload_type == 4:
-        payload['parsed_data'] = parse_user_data_registered_itu_t_t35(bs, payload_size)
-    elif payload_type == 5:
-        payload['parsed_data'] = parse_user_data_unregistered(bs, payload_size)
-    elif payload_type == 6:
-        payload['parsed_data'] = parse_recovery_point(bs)
-    elif payload_type == 9:
-        payload['parsed_data'] = parse_scene_info(bs)
-    elif payload_type == 15:
-        payload['parsed_data'] = parse_picture_snapshot(bs)
-    elif payload_type == 16:
-        payload['parsed_data'] = parse_progressive_refinement_segment_start(bs)
-    elif payload_type == 17:
-        payload['parsed_data'] = parse_progressive_refinement_segment_end(bs)
-    elif payload_type == 19:
-        payload['parsed_data'] = parse_film_grain_characteristics(bs)
-    elif payload_type == 22:
-        payload['parsed_data'] = parse_post_filter_hint(bs)
-    elif payload_type == 23:
-        payload['parsed_data'] = parse_tone_mapping_info(bs)
-    elif payload_type == 45:
-        payload['parsed_data'] = parse_frame_packing_arrangement(bs)
-    elif payload_type == 47:
-        payload['parsed_data'] = parse_display_orientation(bs)
-    elif payload_type == 128:
-        payload['parsed_data'] = parse_structure_of_pictures_info(bs)
-    elif payload_type == 129:
-        payload['parsed_data'] = parse_active_parameter_sets(bs)
-    elif payload_type == 130:
-        payload['parsed_data'] = parse_decoding_unit_info(bs, sps)
-    elif payload_type == 131:
-        payload['parsed_data'] = parse_temporal_sub_layer_zero_index(bs)
-    elif payload_type == 132:
-        payload['parsed_data'] = parse_decoded_picture_hash(bs)
-    elif payload_type == 133:
-        payload['parsed_data'] = parse_scalable_nesting(bs, payload_size)
-    elif payload_type == 134:
-        payload['parsed_data'] = parse_region_refresh_info(bs)
-    elif payload_type == 135:
-        payload['parsed_data'] = parse_no_display(bs)
-    elif payload_type == 136:
-        payload['parsed_data'] = parse_time_code(bs)
-    elif payload_type == 137:
-        payload['parsed_data'] = parse_mastering_display_colour_volume(bs)
-    elif payload_type == 138:
-        payload['parsed_data'] = parse_segmented_rect_frame_packing_arrangement(bs)
-    elif payload_type == 139:
-        payload['parsed_data'] = parse_temporal_motion_constrained_tile_sets(bs)
-    elif payload_type == 140:
-        payload['parsed_data'] = parse_chroma_resampling_filter_hint(bs)
-    elif payload_type == 141:
-        payload['parsed_data'] = parse_knee_function_info(bs)
-    elif payload_type == 142:
-        payload['parsed_data'] = parse_colour_remapping_info(bs)
-    elif payload_type == 143:
-        payload['parsed_data'] = parse_deinterlaced_field_identification(bs)
-    elif payload_type == 144:
-        payload['parsed_data'] = parse_content_light_level_info(bs)
-    elif payload_type == 145:
-        payload['parsed_data'] = parse_dependent_rap_indication(bs)
-    elif payload_type == 146:
-        payload['parsed_data'] = parse_coded_region_completion(bs)
-    elif payload_type == 147:
-        payload['parsed_data'] = parse_alternative_transfer_characteristics(bs)
-    elif payload_type == 148:
-        payload['parsed_data'] = parse_ambient_viewing_environment(bs)
-    elif payload_type == 149:
-        payload['parsed_data'] = parse_content_colour_volume(bs)
-    elif payload_type == 150:
-        payload['parsed_data'] = parse_equirectangular_projection(bs)
-    elif payload_type == 151:
-        payload['parsed_data'] = parse_cubemap_projection(bs)
-    elif payload_type == 152:
-        payload['parsed_data'] = parse_fisheye_video_info(bs)
-    elif payload_type == 154:
-        payload['parsed_data'] = parse_sphere_rotation(bs)
-    elif payload_type == 155:
-        payload['parsed_data'] = parse_regionwise_packing(bs)
-    elif payload_type == 156:
-        payload['parsed_data'] = parse_omni_viewport(bs)
-    elif payload_type == 157:
-        payload['parsed_data'] = parse_regional_nesting(bs)
-    elif payload_type == 158:
-        payload['parsed_data'] = parse_mcts_extraction_info_sets(bs)
-    elif payload_type == 159:
-        payload['parsed_data'] = parse_mcts_extraction_info_nesting(bs)
-    elif payload_type == 161:
-        payload['parsed_data'] = parse_alpha_channel_info(bs)
-    elif payload_type == 162:
-        payload['parsed_data'] = parse_depth_representation_info(bs)
-    elif payload_type == 163:
-        payload['parsed_data'] = parse_multiview_scene_info(bs)
-    elif payload_type == 164:
-        payload['parsed_data'] = parse_multiview_acquisition_info(bs)
-    elif payload_type == 165:
-        payload['parsed_data'] = parse_multiview_view_position(bs)
-    elif payload_type == 200:
-        payload['parsed_data'] = parse_sei_manifest(bs)
-    elif payload_type == 201:
-        payload['parsed_data'] = parse_sei_prefix_indication(bs)
-    elif payload_type == 202:
-        payload['parsed_data'] = parse_annotated_regions(bs)
+    end_pos = start_pos + payload_size * 8
+    bitstream_parser = _SEI_BITSTREAM_PARSERS.get(payload_type)
+    if ENABLED_SEI_PAYLOAD_TYPES is not None and payload_type not in ENABLED_SEI_PAYLOAD_TYPES:
+        bs.pos = min(end_pos, bs.len)
+        parsed_data = None
+    elif CACHED_SEI_PAYLOAD_SIZES.get(payload_type) == payload_size and start_pos & 7 == 0 and end_pos <= bs.len:
+        key = (payload_type, bytes(bs.buf[start_pos >> 3:(start_pos >> 3) + payload_size]))
+        parsed_data = _sei_payload_cache.get(key)
+        if parsed_data is None:
+            parsed_data = bitstream_parser(bs)
+            _sei_payload_cache[key] = parsed_data
+            if len(_sei_payload_cache) > SEI_PAYLOAD_CACHE_SIZE:
+                _sei_payload_cache.popitem(last=False)
+        else:
+            _sei_payload_cache.move_to_end(key)
+            bs.pos = end_pos
+    elif bitstream_parser is not None:
+        parsed_data = bitstream_parser(bs)
+    elif payload_type in _SEI_PAYLOAD_PARSERS:
+        parsed_data = _SEI_PAYLOAD_PARSERS[payload_type](bs, payload_size, sps)
     else:
-        payload['parsed_data'] = bs.read('bytes:' + str(payload_size))
+        # Unregistered and reserved types are kept as their raw payload bytes
+        parsed_data = bs.read_bytes(payload_size)
+    payload = SEIPayload(payload_type, payload_size, parsed_data)
+
+    if bs.pos < end_pos <= bs.len and end_pos - bs.pos < 8:
+        # payload_bit_equal_to_one and the zero bits that byte-align a payload ending mid-byte
+        bs.pos = end_pos
 
     # Check if we've read exactly payload_size bits
-    bits_read = bs.pos - start_pos
-    if bits_read != payload_size * 8:
+    if bs.pos != end_pos:
+        bits_read = bs.pos - start_pos
         print(f"Warning: Read {bits_read} bits, expected {payload_size * 8} bits for SEI payload type {payload_type}")
 
     return payload
 
+def _read_sei_header(buf, offset):
+    # payloadType and payloadSize of a byte-aligned SEI message, scanned straight off the bytes:
+    # each is a run of 0xFF bytes (255 apiece) plus one final byte
+    values = []
+    for _ in range(2):
+        value = 0
+        while offset < len(buf) and buf[offset] == 0xFF:
+            value += 255
+            offset += 1
+        if offset < len(buf):
+            value += buf[offset]
+            offset += 1
+        values.append(value)
+    return values[0], values[1], offset
+
+# HDR10 streams send MDCV followed by CLLI; with the CLLI header (type 144, size 4) in between,
+# the pair is one 30-byte run that unpacks in a single call
+HDR10_STATIC_LAYOUT = struct.Struct('>8H2I2x2H')
+_CLLI_HEADER = bytes((144, 4))
+
+def _parse_hdr10_static(buf, offset):
+    values = HDR10_STATIC_LAYOUT.unpack_from(buf, offset)
+    mdcv = MasteringDisplayColourVolume(list(values[0:6:2]), list(values[1:6:2]), *values[6:10])
+    clli = ContentLightLevelInfo(*values[10:])
+    return SEIPayload(137, 24, mdcv), SEIPayload(144, 4, clli)
+
+def _parse_sei_messages(data, sps):
+    bs = BitReader(data)
+    buf = bs.buf
+    messages = []
+    end = bs.len - 8
+
+    while bs.pos < end:  # Ensure we have at least one byte left
+        if bs.pos & 7:
+            # A payload parser stopped mid-byte; let parse_sei_message realign
+            message = parse_sei_message(bs)
+            payload_type, payload_size = message['payload_type'], message['payload_size']
+        else:
+            payload_type, payload_size, offset = _read_sei_header(buf, bs.pos >> 3)
+            if (payload_type == 137 and payload_size == 24 and buf[offset + 24:offset + 26] == _CLLI_HEADER
+                    and offset + HDR10_STATIC_LAYOUT.size <= len(buf)
+                    and (ENABLED_SEI_PAYLOAD_TYPES is None or {137, 144} <= ENABLED_SEI_PAYLOAD_TYPES)):
+                messages.extend(_parse_hdr10_static(buf, offset))
+                bs.pos = (offset + HDR10_STATIC_LAYOUT.size) << 3
+                continue
+            bs.pos = offset << 3
+        messages.append(parse_sei_payload(bs, payload_type, payload_size, sps))
+
+    return messages
+
 def parse_sei_prefix(data, sps):
-    bs = BitStream(data)
     sei_prefix = {}
-    sei_prefix['messages'] = []
-
-    while bs.pos < len(bs) - 8:
-        message = parse_sei_message(bs)
-        if message['payload_type'] is not None and message['payload_size'] is not None:
-            payload = parse_sei_payload(bs, message['payload_type'], message['payload_size'], sps)
-            sei_prefix['messages'].append(payload)
-
+    sei_prefix['messages'] = _parse_sei_messages(data, sps)
     return sei_prefix
 
 def parse_sei_suffix(data, sps):
-    bs = BitStream(data)
     sei_suffix = {}
-    sei_suffix['messages'] = []
-
-    while bs.pos < len(bs) - 8:  # Ensure we have at least one byte left
-        message = parse_sei_message(bs)
-        if message['payload_type'] is not None and message['payload_size'] is not None:
-            payload = parse_sei_payload(bs, message['payload_type'], message['payload_size'], sps)
-            sei_suffix['messages'].append(payload)
-
+    sei_suffix['messages'] = _parse_sei_messages(data, sps)
     return sei_suffix
 
+def _parse_initial_cpb_removal(bs, bp, prefix, cpb_cnt, length, alt_present):
+    # The NAL and VCL HRD loops share one layout, only the key prefix differs
+    ru = read_uint_safe
+    if alt_present:
+        rows = [(ru(bs, length), ru(bs, length), ru(bs, length), ru(bs, length)) for _ in range(cpb_cnt)]
+        delay, offset, alt_delay, alt_offset = _columns(rows, 4)
+    else:
+        rows = [(ru(bs, length), ru(bs, length)) for _ in range(cpb_cnt)]
+        delay, offset = _columns(rows, 2)
+        alt_delay, alt_offset = [], []
+    bp[prefix + '_initial_cpb_removal_delay'] = delay
+    bp[prefix + '_initial_cpb_removal_offset'] = offset
+    bp[prefix + '_initial_alt_cpb_removal_delay'] = alt_delay
+    bp[prefix + '_initial_alt_cpb_removal_offset'] = alt_offset
+
+def _sps_hrd_parameters(sps):
+    # The VUI hrd_parameters() the timing SEIs are coded against, or None when the SPS has none
+    if sps is None or not sps.get('vui_parameters_present_flag'):
+        return None
+    vui = sps.get('vui_parameters') or {}
+    if not vui.get('vui_hrd_parameters_present_flag'):
+        return None
+    hrd = vui.get('hrd_parameters')
+    # The SEI timing fields are only coded when a NAL or VCL HRD is (CpbDpbDelaysPresentFlag)
+    if not hrd or not (hrd.get('nal_hrd_parameters_present_flag') or hrd.get('vcl_hrd_parameters_present_flag')):
+        return None
+    return hrd
+
 def parse_buffering_period(bs, sps):
     bp = {}
-    if sps['vui_parameters_present_flag'] and sps['vui_parameters']['hrd_parameters_present_flag']:
-        hrd = sps['vui_parameters']['hrd_parameters']
+    hrd = _sps_hrd_parameters(sps)
+    if hrd is not None:
+        sub_pic_hrd_params_present_flag = hrd['sub_pic_hrd_params_present_flag']
+        au_cpb_removal_delay_length = hrd['au_cpb_removal_delay_length_minus1'] + 1
         bp['bp_seq_parameter_set_id'] = read_ue_safe(bs)
-        if not hrd['sub_pic_hrd_params_present_flag']:
+        if not sub_pic_hrd_params_present_flag:
             bp['irap_cpb_params_present_flag'] = read_bool_safe(bs)
-        if bp['irap_cpb_params_present_flag']:
-            bp['cpb_delay_offset'] = read_uint_safe(bs, hrd['au_cpb_removal_delay_length_minus1'] + 1)
+        # Inferred to be 0 when not present
+        irap_cpb_params_present_flag = bp.get('irap_cpb_params_present_flag', False)
+        if irap_cpb_params_present_flag:
+            bp['cpb_delay_offset'] = read_uint_safe(bs, au_cpb_removal_delay_length)
             bp['dpb_delay_offset'] = read_uint_safe(bs, hrd['dpb_output_delay_length_minus1'] + 1)
         bp['concatenation_flag'] = read_bool_safe(bs)
-        bp['au_cpb_removal_delay_delta_minus1'] = read_uint_safe(bs, hrd['au_cpb_removal_delay_length_minus1'] + 1)
+        bp['au_cpb_removal_delay_delta_minus1'] = read_uint_safe(bs, au_cpb_removal_delay_length)
+        alt_present = sub_pic_hrd_params_present_flag or irap_cpb_params_present_flag
         if hrd['nal_hrd_parameters_present_flag']:
-            bp['nal_initial_cpb_removal_delay'] = []
-            bp['nal_initial_cpb_removal_offset'] = []
-            bp['nal_initial_alt_cpb_removal_delay'] = []
-            bp['nal_initial_alt_cpb_removal_offset'] = []
-            for i in range(hrd['cpb_cnt_minus1'][0] + 1):
-                bp['nal_initial_cpb_removal_delay'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
-                bp['nal_initial_cpb_removal_offset'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
-                if hrd['sub_pic_hrd_params_present_flag'] or bp['irap_cpb_params_present_flag']:
-                    bp['nal_initial_alt_cpb_removal_delay'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
-                    bp['nal_initial_alt_cpb_removal_offset'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
+            _parse_initial_cpb_removal(bs, bp, 'nal', hrd['cpb_cnt_minus1'][0] + 1,
+                                       hrd['initial_cpb_removal_delay_length_minus1'] + 1, alt_present)
         if hrd['vcl_hrd_parameters_present_flag']:
-            bp['vcl_initial_cpb_removal_delay'] = []
-            bp['vcl_initial_cpb_removal_offset'] = []
-            bp['vcl_initial_alt_cpb_removal_delay'] = []
-            bp['vcl_initial_alt_cpb_removal_offset'] = []
-            for i in range(hrd['cpb_cnt_minus1'][0] + 1):
-                bp['vcl_initial_cpb_removal_delay'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
-                bp['vcl_initial_cpb_removal_offset'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
-                if hrd['sub_pic_hrd_params_present_flag'] or bp['irap_cpb_params_present_flag']:
-                    bp['vcl_initial_alt_cpb_removal_delay'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
-                    bp['vcl_initial_alt_cpb_removal_offset'].append(read_uint_safe(bs, hrd['initial_cpb_removal_delay_length_minus1'] + 1))
+            _parse_initial_cpb_removal(bs, bp, 'vcl', hrd['cpb_cnt_minus1'][0] + 1,
+                                       hrd['initial_cpb_removal_delay_length_minus1'] + 1, alt_present)
     return bp
 
 def parse_pic_timing(bs, sps):
     pt = {}
-    if sps.get('vui_parameters_present_flag'):
+    if sps is not None and sps.get('vui_parameters_present_flag'):
         vui = sps['vui_parameters']
         if vui.get('frame_field_info_present_flag'):
             pt['pic_struct'] = read_uint_safe(bs, 4)
             pt['source_scan_type'] = read_uint_safe(bs, 2)
             pt['duplicate_flag'] = read_bool_safe(bs)
-        if sps.get('hrd_parameters_present_flag'):
-            hrd = vui['hrd_parameters']
+        hrd = _sps_hrd_parameters(sps)
+        if hrd is not None:
             pt['au_cpb_removal_delay_minus1'] = read_uint_safe(bs, hrd['au_cpb_removal_delay_length_minus1'] + 1)
             pt['pic_dpb_output_delay'] = read_uint_safe(bs, hrd['dpb_output_delay_length_minus1'] + 1)
             if hrd['sub_pic_hrd_params_present_flag']:
@@ -1276,12 +1744,15 @@ def parse_pic_timing(bs, sps):
                 pt['du_common_cpb_removal_delay_flag'] = read_bool_safe(bs)
                 if pt['du_common_cpb_removal_delay_flag']:
                     pt['du_common_cpb_removal_delay_increment_minus1'] = read_uint_safe(bs, hrd['du_cpb_removal_delay_increment_length_minus1'] + 1)
-                pt['num_nalus_in_du_minus1'] = []
-                pt['du_cpb_removal_delay_increment_minus1'] = []
-                for i in range(pt['num_decoding_units_minus1'] + 1):
-                    pt['num_nalus_in_du_minus1'].append(read_ue_safe(bs))
-                    if not pt['du_common_cpb_removal_delay_flag'] and i < pt['num_decoding_units_minus1']:
-                        pt['du_cpb_removal_delay_increment_minus1'].append(read_uint_safe(bs, hrd['du_cpb_removal_delay_increment_length_minus1'] + 1))
+                num_decoding_units_minus1 = pt['num_decoding_units_minus1']
+                du_common_cpb_removal_delay_flag = pt['du_common_cpb_removal_delay_flag']
+                du_increment_length = hrd['du_cpb_removal_delay_increment_length_minus1'] + 1
+                num_nalus_in_du_minus1 = pt['num_nalus_in_du_minus1'] = []
+                du_cpb_removal_delay_increment_minus1 = pt['du_cpb_removal_delay_increment_minus1'] = []
+                for i in range(num_decoding_units_minus1 + 1):
+                    num_nalus_in_du_minus1.append(read_ue_safe(bs))
+                    if not du_common_cpb_removal_delay_flag and i < num_decoding_units_minus1:
+                        du_cpb_removal_delay_increment_minus1.append(read_uint_safe(bs, du_increment_length))
     return pt
 
 def parse_pan_scan_rect(bs):
@@ -1290,36 +1761,31 @@ def parse_pan_scan_rect(bs):
     psr['pan_scan_rect_cancel_flag'] = read_bool_safe(bs)
     if not psr['pan_scan_rect_cancel_flag']:
         psr['pan_scan_cnt_minus1'] = read_ue_safe(bs)
-        psr['pan_scan_rect_left_offset'] = []
-        psr['pan_scan_rect_right_offset'] = []
-        psr['pan_scan_rect_top_offset'] = []
-        psr['pan_scan_rect_bottom_offset'] = []
-        for i in range(psr['pan_scan_cnt_minus1'] + 1):
-            psr['pan_scan_rect_left_offset'].append(read_se_safe(bs))
-            psr['pan_scan_rect_right_offset'].append(read_se_safe(bs))
-            psr['pan_scan_rect_top_offset'].append(read_se_safe(bs))
-            psr['pan_scan_rect_bottom_offset'].append(read_se_safe(bs))
+        rs = read_se_safe
+        rects = [(rs(bs), rs(bs), rs(bs), rs(bs)) for _ in range(psr['pan_scan_cnt_minus1'] + 1)]
+        (psr['pan_scan_rect_left_offset'], psr['pan_scan_rect_right_offset'],
+         psr['pan_scan_rect_top_offset'], psr['pan_scan_rect_bottom_offset']) = _columns(rects, 4)
         psr['pan_scan_rect_persistence_flag'] = read_bool_safe(bs)
     return psr
 
 def parse_filler_payload(bs, payload_size):
     fp = {}
-    fp['filler_payload'] = bs.read('bytes:' + str(payload_size))
+    fp['filler_payload'] = bs.read_bytes(payload_size)
     return fp
 
 def parse_user_data_registered_itu_t_t35(bs, payload_size):
     udr = {}
-    udr['itu_t_t35_country_code'] = read_uint_safe(bs, 8)
+    udr['itu_t_t35_country_code'] = read_u8_safe(bs)
     if udr['itu_t_t35_country_code'] == 0xFF:
-        udr['itu_t_t35_country_code_extension_byte'] = read_uint_safe(bs, 8)
+        udr['itu_t_t35_country_code_extension_byte'] = read_u8_safe(bs)
     remaining_size = payload_size - (2 if udr['itu_t_t35_country_code'] == 0xFF else 1)
-    udr['itu_t_t35_payload_byte'] = bs.read('bytes:' + str(remaining_size))
+    udr['itu_t_t35_payload_byte'] = bs.read_bytes(remaining_size)
     return udr
 
 def parse_user_data_unregistered(bs, payload_size):
     udu = {}
-    udu['uuid_iso_iec_11578'] = bs.read('bytes:16')
-    udu['user_data_payload_byte'] = bs.read('bytes:' + str(payload_size - 16))
+    udu['uuid_iso_iec_11578'] = bs.read_bytes(16)
+    udu['user_data_payload_byte'] = bs.read_bytes(payload_size - 16)
     return udu
 
 def parse_recovery_point(bs):
@@ -1356,6 +1822,14 @@ def parse_progressive_refinement_segment_end(bs):
     prse['progressive_refinement_id'] = read_ue_safe(bs)
     return prse
 
+# Per-component film grain keys ('comp_model_value[0]', ...), formatted once instead of per SEI
+FGC_COMPONENT_KEYS = tuple(
+    tuple(f'{name}[{c}]' for name in ('num_intensity_intervals_minus1', 'num_model_values_minus1',
+                                      'intensity_interval_lower_bound', 'intensity_interval_upper_bound',
+                                      'comp_model_value'))
+    for c in range(3)
+)
+
 def parse_film_grain_characteristics(bs):
     fgc = {}
     fgc['film_grain_characteristics_cancel_flag'] = read_bool_safe(bs)
@@ -1366,27 +1840,26 @@ def parse_film_grain_characteristics(bs):
             fgc['film_grain_bit_depth_luma_minus8'] = read_uint_safe(bs, 3)
             fgc['film_grain_bit_depth_chroma_minus8'] = read_uint_safe(bs, 3)
             fgc['film_grain_full_range_flag'] = read_bool_safe(bs)
-            fgc['film_grain_colour_primaries'] = read_uint_safe(bs, 8)
-            fgc['film_grain_transfer_characteristics'] = read_uint_safe(bs, 8)
-            fgc['film_grain_matrix_coeffs'] = read_uint_safe(bs, 8)
+            fgc['film_grain_colour_primaries'] = read_u8_safe(bs)
+            fgc['film_grain_transfer_characteristics'] = read_u8_safe(bs)
+            fgc['film_grain_matrix_coeffs'] = read_u8_safe(bs)
         fgc['blending_mode_id'] = read_uint_safe(bs, 2)
         fgc['log2_scale_factor'] = read_uint_safe(bs, 4)
-        fgc['comp_model_present_flag'] = []
-        for c in range(3):
-            fgc['comp_model_present_flag'].append(read_bool_safe(bs))
+        comp_model_present_flag = fgc['comp_model_present_flag'] = [read_bool_safe(bs) for _ in range(3)]
         for c in range(3):
-            if fgc['comp_model_present_flag'][c]:
-                fgc[f'num_intensity_intervals_minus1[{c}]'] = read_uint_safe(bs, 8)
-                fgc[f'num_model_values_minus1[{c}]'] = read_uint_safe(bs, 3)
-                fgc[f'intensity_interval_lower_bound[{c}]'] = []
-                fgc[f'intensity_interval_upper_bound[{c}]'] = []
-                fgc[f'comp_model_value[{c}]'] = []
-                for i in range(fgc[f'num_intensity_intervals_minus1[{c}]'] + 1):
-                    fgc[f'intensity_interval_lower_bound[{c}]'].append(read_uint_safe(bs, 8))
-                    fgc[f'intensity_interval_upper_bound[{c}]'].append(read_uint_safe(bs, 8))
-                    fgc[f'comp_model_value[{c}]'].append([])
-                    for j in range(fgc[f'num_model_values_minus1[{c}]'] + 1):
-                        fgc[f'comp_model_value[{c}'][i].append(read_se_safe(bs))
+            if comp_model_present_flag[c]:
+                intervals_key, values_key, lower_key, upper_key, model_key = FGC_COMPONENT_KEYS[c]
+                num_intensity_intervals_minus1 = fgc[intervals_key] = read_u8_safe(bs)
+                num_model_values_minus1 = fgc[values_key] = read_uint_safe(bs, 3)
+                num_intervals = num_intensity_intervals_minus1 + 1
+                num_model_values = num_model_values_minus1 + 1
+                lower_bound = fgc[lower_key] = [None] * num_intervals
+                upper_bound = fgc[upper_key] = [None] * num_intervals
+                comp_model_value = fgc[model_key] = [None] * num_intervals
+                for i in range(num_intervals):
+                    lower_bound[i] = read_u8_safe(bs)
+                    upper_bound[i] = read_u8_safe(bs)
+                    comp_model_value[i] = read_ses_safe(bs, num_model_values)
         fgc['film_grain_characteristics_persistence_flag'] = read_bool_safe(bs)
     return fgc
 
@@ -1395,54 +1868,54 @@ def parse_post_filter_hint(bs):
     pfh['filter_hint_size_y'] = read_ue_safe(bs)
     pfh['filter_hint_size_x'] = read_ue_safe(bs)
     pfh['filter_hint_type'] = read_uint_safe(bs, 2)
-    pfh['filter_hint_value'] = []
-    for cy in range(pfh['filter_hint_size_y']):
-        pfh['filter_hint_value'].append([])
-        for cx in range(pfh['filter_hint_size_x']):
-            pfh['filter_hint_value'][cy].append(read_se_safe(bs))
+    size_x = pfh['filter_hint_size_x']
+    pfh['filter_hint_value'] = [[read_se_safe(bs) for _ in range(size_x)] for _ in range(pfh['filter_hint_size_y'])]
     return pfh
 
+# Bit depth (a u(8) field) rounded up to whole bytes, the width tone mapping and colour
+# remapping values are coded in
+_BYTE_ROUNDED_BITS = tuple(((depth + 7) >> 3) << 3 for depth in range(256))
+
 def parse_tone_mapping_info(bs):
     tmi = {}
     tmi['tone_map_id'] = read_ue_safe(bs)
     tmi['tone_map_cancel_flag'] = read_bool_safe(bs)
     if not tmi['tone_map_cancel_flag']:
         tmi['tone_map_persistence_flag'] = read_bool_safe(bs)
-        tmi['coded_data_bit_depth'] = read_uint_safe(bs, 8)
-        tmi['target_bit_depth'] = read_uint_safe(bs, 8)
+        tmi['coded_data_bit_depth'] = read_u8_safe(bs)
+        tmi['target_bit_depth'] = read_u8_safe(bs)
         tmi['tone_map_model_id'] = read_ue_safe(bs)
         if tmi['tone_map_model_id'] == 0:
-            tmi['min_value'] = read_uint_safe(bs, 32)
-            tmi['max_value'] = read_uint_safe(bs, 32)
+            tmi['min_value'] = read_u32_safe(bs)
+            tmi['max_value'] = read_u32_safe(bs)
         elif tmi['tone_map_model_id'] == 1:
-            tmi['sigmoid_midpoint'] = read_uint_safe(bs, 32)
-            tmi['sigmoid_width'] = read_uint_safe(bs, 32)
+            tmi['sigmoid_midpoint'] = read_u32_safe(bs)
+            tmi['sigmoid_width'] = read_u32_safe(bs)
         elif tmi['tone_map_model_id'] == 2:
-            tmi['start_of_coded_interval'] = []
-            for i in range(1 << tmi['target_bit_depth']):
-                tmi['start_of_coded_interval'].append(read_uint_safe(bs, ((tmi['coded_data_bit_depth'] + 7) >> 3) << 3))
+            tmi['start_of_coded_interval'] = read_uints_safe(bs, 1 << tmi['target_bit_depth'],
+                                                             _BYTE_ROUNDED_BITS[tmi['coded_data_bit_depth']])
         elif tmi['tone_map_model_id'] == 3:
-            tmi['num_pivots'] = read_uint_safe(bs, 16)
-            tmi['coded_pivot_value'] = []
-            tmi['target_pivot_value'] = []
-            for i in range(tmi['num_pivots']):
-                tmi['coded_pivot_value'].append(read_uint_safe(bs, ((tmi['coded_data_bit_depth'] + 7) >> 3) << 3))
-                tmi['target_pivot_value'].append(read_uint_safe(bs, ((tmi['target_bit_depth'] + 7) >> 3) << 3))
+            tmi['num_pivots'] = read_u16_safe(bs)
+            coded_bits = _BYTE_ROUNDED_BITS[tmi['coded_data_bit_depth']]
+            target_bits = _BYTE_ROUNDED_BITS[tmi['target_bit_depth']]
+            ru = read_uint_safe
+            pivots = [(ru(bs, coded_bits), ru(bs, target_bits)) for _ in range(tmi['num_pivots'])]
+            tmi['coded_pivot_value'], tmi['target_pivot_value'] = _columns(pivots, 2)
         elif tmi['tone_map_model_id'] == 4:
-            tmi['camera_iso_speed_idc'] = read_uint_safe(bs, 8)
+            tmi['camera_iso_speed_idc'] = read_u8_safe(bs)
             if tmi['camera_iso_speed_idc'] == 255:
-                tmi['camera_iso_speed_value'] = read_uint_safe(bs, 32)
-            tmi['exposure_index_idc'] = read_uint_safe(bs, 8)
+                tmi['camera_iso_speed_value'] = read_u32_safe(bs)
+            tmi['exposure_index_idc'] = read_u8_safe(bs)
             if tmi['exposure_index_idc'] == 255:
-                tmi['exposure_index_value'] = read_uint_safe(bs, 32)
+                tmi['exposure_index_value'] = read_u32_safe(bs)
             tmi['exposure_compensation_value_sign_flag'] = read_bool_safe(bs)
-            tmi['exposure_compensation_value_numerator'] = read_uint_safe(bs, 16)
-            tmi['exposure_compensation_value_denom_idc'] = read_uint_safe(bs, 16)
-            tmi['ref_screen_luminance_white'] = read_uint_safe(bs, 32)
-            tmi['extended_range_white_level'] = read_uint_safe(bs, 32)
-            tmi['nominal_black_level_code_value'] = read_uint_safe(bs, 16)
-            tmi['nominal_white_level_code_value'] = read_uint_safe(bs, 16)
-            tmi['extended_white_level_code_value'] = read_uint_safe(bs, 16)
+            tmi['exposure_compensation_value_numerator'] = read_u16_safe(bs)
+            tmi['exposure_compensation_value_denom_idc'] = read_u16_safe(bs)
+            tmi['ref_screen_luminance_white'] = read_u32_safe(bs)
+            tmi['extended_range_white_level'] = read_u32_safe(bs)
+            tmi['nominal_black_level_code_value'] = read_u16_safe(bs)
+            tmi['nominal_white_level_code_value'] = read_u16_safe(bs)
+            tmi['extended_white_level_code_value'] = read_u16_safe(bs)
     return tmi
 
 def parse_frame_packing_arrangement(bs):
@@ -1453,18 +1926,15 @@ def parse_frame_packing_arrangement(bs):
         fpa['frame_packing_arrangement_type'] = read_uint_safe(bs, 7)
         fpa['quincunx_sampling_flag'] = read_bool_safe(bs)
         fpa['content_interpretation_type'] = read_uint_safe(bs, 6)
-        fpa['spatial_flipping_flag'] = read_bool_safe(bs)
-        fpa['frame0_flipped_flag'] = read_bool_safe(bs)
-        fpa['field_views_flag'] = read_bool_safe(bs)
-        fpa['current_frame_is_frame0_flag'] = read_bool_safe(bs)
-        fpa['frame0_self_contained_flag'] = read_bool_safe(bs)
-        fpa['frame1_self_contained_flag'] = read_bool_safe(bs)
+        (fpa['spatial_flipping_flag'], fpa['frame0_flipped_flag'], fpa['field_views_flag'],
+         fpa['current_frame_is_frame0_flag'], fpa['frame0_self_contained_flag'],
+         fpa['frame1_self_contained_flag']) = read_fields_safe(bs, (1, 1, 1, 1, 1, 1))
         if not fpa['quincunx_sampling_flag'] and fpa['frame_packing_arrangement_type'] != 5:
             fpa['frame0_grid_position_x'] = read_uint_safe(bs, 4)
             fpa['frame0_grid_position_y'] = read_uint_safe(bs, 4)
             fpa['frame1_grid_position_x'] = read_uint_safe(bs, 4)
             fpa['frame1_grid_position_y'] = read_uint_safe(bs, 4)
-        fpa['frame_packing_arrangement_reserved_byte'] = read_uint_safe(bs, 8)
+        fpa['frame_packing_arrangement_reserved_byte'] = read_u8_safe(bs)
         fpa['frame_packing_arrangement_persistence_flag'] = read_bool_safe(bs)
     fpa['upsampled_aspect_ratio_flag'] = read_bool_safe(bs)
     return fpa
@@ -1475,7 +1945,7 @@ def parse_display_orientation(bs):
     if not do['display_orientation_cancel_flag']:
         do['hor_flip'] = read_bool_safe(bs)
         do['ver_flip'] = read_bool_safe(bs)
-        do['anticlockwise_rotation'] = read_uint_safe(bs, 16)
+        do['anticlockwise_rotation'] = read_u16_safe(bs)
         do['display_orientation_persistence_flag'] = read_bool_safe(bs)
     return do
 
@@ -1483,17 +1953,19 @@ def parse_structure_of_pictures_info(bs):
     sopi = {}
     sopi['sop_seq_parameter_set_id'] = read_ue_safe(bs)
     sopi['num_entries_in_sop_minus1'] = read_ue_safe(bs)
-    sopi['sop_vcl_nut'] = []
-    sopi['sop_temporal_id'] = []
-    sopi['sop_short_term_rps_idx'] = []
-    sopi['sop_poc_delta'] = []
-    for i in range(sopi['num_entries_in_sop_minus1'] + 1):
-        sopi['sop_vcl_nut'].append(read_uint_safe(bs, 6))
-        sopi['sop_temporal_id'].append(read_uint_safe(bs, 3))
-        if sopi['sop_vcl_nut'][i] != 19 and sopi['sop_vcl_nut'][i] != 20:
-            sopi['sop_short_term_rps_idx'].append(read_ue_safe(bs))
+    ru, ue, se = read_uint_safe, read_ue_safe, read_se_safe
+    num_entries = sopi['num_entries_in_sop_minus1'] + 1
+    sop_vcl_nut = sopi['sop_vcl_nut'] = [None] * num_entries
+    sop_temporal_id = sopi['sop_temporal_id'] = [None] * num_entries
+    sop_short_term_rps_idx = sopi['sop_short_term_rps_idx'] = []
+    sop_poc_delta = sopi['sop_poc_delta'] = []
+    for i in range(num_entries):
+        vcl_nut = sop_vcl_nut[i] = ru(bs, 6)
+        sop_temporal_id[i] = ru(bs, 3)
+        if vcl_nut != 19 and vcl_nut != 20:
+            sop_short_term_rps_idx.append(ue(bs))
             if i > 0:
-                sopi['sop_poc_delta'].append(read_se_safe(bs))
+                sop_poc_delta.append(se(bs))
     return sopi
 
 def parse_active_parameter_sets(bs):
@@ -1502,16 +1974,16 @@ def parse_active_parameter_sets(bs):
     aps['self_contained_cvs_flag'] = read_bool_safe(bs)
     aps['no_parameter_set_update_flag'] = read_bool_safe(bs)
     aps['num_sps_ids_minus1'] = read_ue_safe(bs)
-    aps['active_seq_parameter_set_id'] = []
-    for i in range(aps['num_sps_ids_minus1'] + 1):
-        aps['active_seq_parameter_set_id'].append(read_ue_safe(bs))
+    aps['active_seq_parameter_set_id'] = read_ues_safe(bs, aps['num_sps_ids_minus1'] + 1)
     return aps
 
 def parse_decoding_unit_info(bs, sps):
     dui = {}
-    hrd = sps['vui_parameters']['hrd_parameters']
+    hrd = _sps_hrd_parameters(sps)
+    if hrd is None:
+        return dui
     dui['decoding_unit_idx'] = read_ue_safe(bs)
-    if not hrd['sub_pic_cpb_params_in_pic_timing_sei_flag']:
+    if not hrd.get('sub_pic_cpb_params_in_pic_timing_sei_flag'):
         dui['du_spt_cpb_removal_delay_increment'] = read_uint_safe(bs, hrd['du_cpb_removal_delay_increment_length_minus1'] + 1)
     dui['dpb_output_du_delay_present_flag'] = read_bool_safe(bs)
     if dui['dpb_output_du_delay_present_flag']:
@@ -1520,26 +1992,37 @@ def parse_decoding_unit_info(bs, sps):
 
 def parse_temporal_sub_layer_zero_index(bs):
     tslzi = {}
-    tslzi['temporal_sub_layer_zero_idx'] = read_uint_safe(bs, 8)
-    tslzi['irap_pic_id'] = read_uint_safe(bs, 8)
+    tslzi['temporal_sub_layer_zero_idx'] = read_u8_safe(bs)
+    tslzi['irap_pic_id'] = read_u8_safe(bs)
     return tslzi
 
 
 def parse_decoded_picture_hash(bs):
     dph = {}
-    dph['hash_type'] = read_uint_safe(bs, 8)
+    dph['hash_type'] = read_u8_safe(bs)
     dph['picture_md5'] = []
-    for i in range(3):  # Assumes 4:2:0 color format. Adjust if needed.
-        if dph['hash_type'] == 0:
-            dph['picture_md5'].append(bs.read('bytes:16'))
-        elif dph['hash_type'] == 1:
-            dph['picture_crc'].append(read_uint_safe(bs, 16))
-        elif dph['hash_type'] == 2:
-            dph['picture_checksum'].append(read_uint_safe(bs, 32))
+    # One hash per colour component (assumes 3, i.e. not 4:0:0); the three are contiguous,
+    # so they come out of a single read
+    if dph['hash_type'] == 0:
+        if bs.pos + 384 <= bs.len:
+            md5 = bs.read_bytes(48)
+            dph['picture_md5'] = [md5[0:16], md5[16:32], md5[32:48]]
+        else:
+            dph['picture_md5'] = [bs.read_bytes(16) if bs.pos + 128 <= bs.len else None for _ in range(3)]
+    elif dph['hash_type'] == 1:
+        if bs.pos + 48 <= bs.len:
+            dph['picture_crc'] = list(struct.unpack('>3H', bs.read_bytes(6)))
+        else:
+            dph['picture_crc'] = [read_u16_safe(bs) for _ in range(3)]
+    elif dph['hash_type'] == 2:
+        if bs.pos + 96 <= bs.len:
+            dph['picture_checksum'] = list(struct.unpack('>3I', bs.read_bytes(12)))
+        else:
+            dph['picture_checksum'] = [read_u32_safe(bs) for _ in range(3)]
     return dph
 
 
-def parse_scalable_nesting(bs, payload_size):
+def parse_scalable_nesting(bs, payload_size, sps=None):
     sn = {}
     start_pos = bs.pos
     sn['bitstream_subset_flag'] = read_bool_safe(bs)
@@ -1549,36 +2032,41 @@ def parse_scalable_nesting(bs, payload_size):
         sn['nesting_num_ops_minus1'] = read_ue_safe(bs)
         sn['nesting_max_temporal_id_plus1'] = []
         sn['nesting_op_idx'] = []
-        for i in range(sn['nesting_num_ops_minus1'] + 1):
-            if not sn['default_op_flag'] or i == 0:
-                sn['nesting_max_temporal_id_plus1'].append(read_uint_safe(bs, 3))
-            if not sn['default_op_flag']:
-                sn['nesting_op_idx'].append(read_ue_safe(bs))
-    sn['all_layers_flag'] = read_bool_safe(bs)
-    if not sn['all_layers_flag']:
-        sn['nesting_no_op_max_temporal_id_plus1'] = read_uint_safe(bs, 3)
-        sn['nesting_num_layers_minus1'] = read_ue_safe(bs)
-        sn['nesting_layer_id'] = []
-        for i in range(sn['nesting_num_layers_minus1'] + 1):
-            sn['nesting_layer_id'].append(read_uint_safe(bs, 6))
-
-    # Parse nested SEI messages
-    sn['nested_sei_messages'] = []
-    while bs.pos - start_pos < payload_size * 8:
-        nested_payload_type = 0
-        while read_uint_safe(bs, 8) == 0xFF:
-            nested_payload_type += 255
-        nested_payload_type += read_uint_safe(bs, 8)
+        # With default_op_flag set, operation point 0 is the default one and is not coded
+        for i in range(int(bool(sn['default_op_flag'])), sn['nesting_num_ops_minus1'] + 1):
+            sn['nesting_max_temporal_id_plus1'].append(read_uint_safe(bs, 3))
+            sn['nesting_op_idx'].append(read_ue_safe(bs))
+    else:
+        sn['all_layers_flag'] = read_bool_safe(bs)
+        if not sn['all_layers_flag']:
+            sn['nesting_no_op_max_temporal_id_plus1'] = read_uint_safe(bs, 3)
+            sn['nesting_num_layers_minus1'] = read_ue_safe(bs)
+            sn['nesting_layer_id'] = [read_uint_safe(bs, 6) for _ in range(sn['nesting_num_layers_minus1'] + 1)]
 
-        nested_payload_size = 0
-        while read_uint_safe(bs, 8) == 0xFF:
-            nested_payload_size += 255
-        nested_payload_size += read_uint_safe(bs, 8)
+    # nesting_zero_bit up to the byte boundary the nested sei_message()s start on
+    if bs.pos & 7:
+        read_uint_safe(bs, 8 - (bs.pos & 7))
 
-        sn['nested_sei_messages'].append(parse_sei_payload(bs, nested_payload_type, nested_payload_size))
+    sn['nested_sei_messages'] = []
+    # A payload_size running past the data stops at its end
+    end_pos = min(start_pos + payload_size * 8, bs.len)
+    while bs.pos < end_pos:
+        sn['nested_sei_messages'].append(_parse_nested_sei_message(bs, sps))
 
     return sn
 
+def _parse_nested_sei_message(bs, sps=None):
+    # A nested sei_message(); its header is scanned a byte run at a time like the outer ones, and the
+    # payload goes through parse_sei_payload so it shares the dispatch tables and payload cache
+    # A final byte past the end of the data adds nothing, as in _read_sei_header
+    nested_payload_type = 255 * _skip_ff_bytes(bs) + (read_u8_safe(bs) or 0)
+    nested_payload_size = 255 * _skip_ff_bytes(bs) + (read_u8_safe(bs) or 0)
+    payload_start = bs.pos
+    payload = parse_sei_payload(bs, nested_payload_type, nested_payload_size, sps)
+    # Resume at the declared end so the payload's own alignment bits are not taken as the next header
+    bs.pos = min(payload_start + nested_payload_size * 8, bs.len)
+    return payload
+
 
 def parse_region_refresh_info(bs):
     rri = {}
@@ -1594,47 +2082,73 @@ def parse_no_display(bs):
 def parse_time_code(bs):
     tc = {}
     tc['num_clock_ts'] = read_uint_safe(bs, 2)
-    tc['clock_timestamp'] = []
+    ru, rb = read_uint_safe, read_bool_safe
+    clock_timestamp = tc['clock_timestamp'] = []
     for i in range(tc['num_clock_ts']):
         cts = {}
-        cts['clock_timestamp_flag'] = read_bool_safe(bs)
+        cts['clock_timestamp_flag'] = rb(bs)
         if cts['clock_timestamp_flag']:
-            cts['units_field_based_flag'] = read_bool_safe(bs)
-            cts['counting_type'] = read_uint_safe(bs, 5)
-            cts['full_timestamp_flag'] = read_bool_safe(bs)
-            cts['discontinuity_flag'] = read_bool_safe(bs)
-            cts['cnt_dropped_flag'] = read_bool_safe(bs)
-            cts['n_frames'] = read_uint_safe(bs, 9)
+            (cts['units_field_based_flag'], cts['counting_type'], cts['full_timestamp_flag'],
+             cts['discontinuity_flag'], cts['cnt_dropped_flag']) = read_fields_safe(bs, (1, 5, 1, 1, 1))
+            cts['n_frames'] = ru(bs, 9)
             if cts['full_timestamp_flag']:
-                cts['seconds_value'] = read_uint_safe(bs, 6)
-                cts['minutes_value'] = read_uint_safe(bs, 6)
-                cts['hours_value'] = read_uint_safe(bs, 5)
+                cts['seconds_value'] = ru(bs, 6)
+                cts['minutes_value'] = ru(bs, 6)
+                cts['hours_value'] = ru(bs, 5)
             else:
-                cts['seconds_flag'] = read_bool_safe(bs)
+                cts['seconds_flag'] = rb(bs)
                 if cts['seconds_flag']:
-                    cts['seconds_value'] = read_uint_safe(bs, 6)
-                    cts['minutes_flag'] = read_bool_safe(bs)
+                    cts['seconds_value'] = ru(bs, 6)
+                    cts['minutes_flag'] = rb(bs)
                     if cts['minutes_flag']:
-                        cts['minutes_value'] = read_uint_safe(bs, 6)
-                        cts['hours_flag'] = read_bool_safe(bs)
+                        cts['minutes_value'] = ru(bs, 6)
+                        cts['hours_flag'] = rb(bs)
                         if cts['hours_flag']:
-                            cts['hours_value'] = read_uint_safe(bs, 5)
-            cts['time_offset_length'] = read_uint_safe(bs, 5)
-            if cts['time_offset_length'] > 0:
-                cts['time_offset_value'] = read_uint_safe(bs, cts['time_offset_length'])
-        tc['clock_timestamp'].append(cts)
+                            cts['hours_value'] = ru(bs, 5)
+            time_offset_length = cts['time_offset_length'] = ru(bs, 5)
+            if time_offset_length > 0:
+                cts['time_offset_value'] = ru(bs, time_offset_length)
+        clock_timestamp.append(cts)
     return tc
 
 
+# Fixed layouts of the HDR metadata SEIs: a struct for the whole payload plus the field widths
+MDCV_LAYOUT = (struct.Struct('>8H2I'), (16,) * 8 + (32,) * 2)
+CLLI_LAYOUT = (struct.Struct('>2H'), (16, 16))
+AVE_LAYOUT = (struct.Struct('>I2H'), (32, 16, 16))
+
+def read_struct_safe(bs, layout):
+    # Unpack a run of big-endian uint fields from one read; when the run would pass the end,
+    # the fields are read one by one so the missing ones come back as None
+    packed, widths = layout
+    if bs.pos + 8 * packed.size <= bs.len:
+        return packed.unpack(bs.read_bytes(packed.size))
+    return [read_uint_safe(bs, width) for width in widths]
+
+@dataclass(slots=True)
+class MasteringDisplayColourVolume(_DictAccess):
+    display_primaries_x: List[Optional[int]]
+    display_primaries_y: List[Optional[int]]
+    white_point_x: Optional[int]
+    white_point_y: Optional[int]
+    max_display_mastering_luminance: Optional[int]
+    min_display_mastering_luminance: Optional[int]
+
+@dataclass(slots=True)
+class ContentLightLevelInfo(_DictAccess):
+    max_content_light_level: Optional[int]
+    max_pic_average_light_level: Optional[int]
+
+@dataclass(slots=True)
+class AmbientViewingEnvironment(_DictAccess):
+    ambient_illuminance: Optional[int]
+    ambient_light_x: Optional[int]
+    ambient_light_y: Optional[int]
+
 def parse_mastering_display_colour_volume(bs):
-    mdcv = {}
-    mdcv['display_primaries_x'] = [read_uint_safe(bs, 16) for _ in range(3)]
-    mdcv['display_primaries_y'] = [read_uint_safe(bs, 16) for _ in range(3)]
-    mdcv['white_point_x'] = read_uint_safe(bs, 16)
-    mdcv['white_point_y'] = read_uint_safe(bs, 16)
-    mdcv['max_display_mastering_luminance'] = read_uint_safe(bs, 32)
-    mdcv['min_display_mastering_luminance'] = read_uint_safe(bs, 32)
-    return mdcv
+    values = read_struct_safe(bs, MDCV_LAYOUT)
+    # display_primaries_x[c] and display_primaries_y[c] alternate per component
+    return MasteringDisplayColourVolume(list(values[0:6:2]), list(values[1:6:2]), *values[6:])
 
 
 def parse_segmented_rect_frame_packing_arrangement(bs):
@@ -1651,48 +2165,52 @@ def parse_temporal_motion_constrained_tile_sets(bs):
     if not tmcts['each_tile_one_tile_set_flag']:
         tmcts['limited_tile_set_display_flag'] = read_bool_safe(bs)
         tmcts['num_sets_in_message_minus1'] = read_ue_safe(bs)
-        tmcts['mcts_id'] = []
-        tmcts['display_tile_set_flag'] = []
-        tmcts['num_tile_rects_in_set_minus1'] = []
-        tmcts['top_left_tile_index'] = []
-        tmcts['bottom_right_tile_index'] = []
-        for i in range(tmcts['num_sets_in_message_minus1'] + 1):
-            tmcts['mcts_id'].append(read_ue_safe(bs))
-            if tmcts['limited_tile_set_display_flag']:
-                tmcts['display_tile_set_flag'].append(read_bool_safe(bs))
-            tmcts['num_tile_rects_in_set_minus1'].append(read_ue_safe(bs))
-            tmcts['top_left_tile_index'].append([])
-            tmcts['bottom_right_tile_index'].append([])
-            for j in range(tmcts['num_tile_rects_in_set_minus1'][i] + 1):
-                tmcts['top_left_tile_index'][i].append(read_ue_safe(bs))
-                tmcts['bottom_right_tile_index'][i].append(read_ue_safe(bs))
+        ue, rb = read_ue_safe, read_bool_safe
+        limited_tile_set_display_flag = tmcts['limited_tile_set_display_flag']
+        num_sets = tmcts['num_sets_in_message_minus1'] + 1
+        mcts_id = tmcts['mcts_id'] = [None] * num_sets
+        display_tile_set_flag = tmcts['display_tile_set_flag'] = []
+        num_tile_rects_in_set_minus1 = tmcts['num_tile_rects_in_set_minus1'] = [None] * num_sets
+        top_left_tile_index = tmcts['top_left_tile_index'] = [None] * num_sets
+        bottom_right_tile_index = tmcts['bottom_right_tile_index'] = [None] * num_sets
+        for i in range(num_sets):
+            mcts_id[i] = ue(bs)
+            if limited_tile_set_display_flag:
+                display_tile_set_flag.append(rb(bs))
+            num_rects_minus1 = num_tile_rects_in_set_minus1[i] = ue(bs)
+            corners = [(ue(bs), ue(bs)) for _ in range(num_rects_minus1 + 1)]
+            top_left_tile_index[i], bottom_right_tile_index[i] = _columns(corners, 2)
     tmcts['mc_exact_sample_value_match_flag'] = read_bool_safe(bs)
     tmcts['mcts_tier_level_idc_present_flag'] = read_bool_safe(bs)
     if tmcts['mcts_tier_level_idc_present_flag']:
         tmcts['mcts_tier_flag'] = read_bool_safe(bs)
-        tmcts['mcts_level_idc'] = read_uint_safe(bs, 8)
+        tmcts['mcts_level_idc'] = read_u8_safe(bs)
     return tmcts
 
 
 def parse_chroma_resampling_filter_hint(bs):
     crfh = {}
-    crfh['ver_chroma_filter_idc'] = read_uint_safe(bs, 8)
-    crfh['hor_chroma_filter_idc'] = read_uint_safe(bs, 8)
+    crfh['ver_chroma_filter_idc'] = read_u8_safe(bs)
+    crfh['hor_chroma_filter_idc'] = read_u8_safe(bs)
     crfh['ver_filtering_field_processing_flag'] = read_bool_safe(bs)
     if crfh['ver_chroma_filter_idc'] == 1 or crfh['hor_chroma_filter_idc'] == 1:
         crfh['target_format_idc'] = read_ue_safe(bs)
         if crfh['ver_chroma_filter_idc'] == 1:
-            num_vertical_filters = read_ue_safe(bs)
-            crfh['ver_tap_length_minus1'] = [read_ue_safe(bs) for _ in range(num_vertical_filters)]
-            crfh['ver_filter_coeff'] = [[read_se_safe(bs) for _ in range(crfh['ver_tap_length_minus1'][i] + 1)] for i in
-                                        range(num_vertical_filters)]
+            crfh['ver_tap_length_minus1'], crfh['ver_filter_coeff'] = _parse_chroma_filters(bs)
         if crfh['hor_chroma_filter_idc'] == 1:
-            num_horizontal_filters = read_ue_safe(bs)
-            crfh['hor_tap_length_minus1'] = [read_ue_safe(bs) for _ in range(num_horizontal_filters)]
-            crfh['hor_filter_coeff'] = [[read_se_safe(bs) for _ in range(crfh['hor_tap_length_minus1'][i] + 1)] for i in
-                                        range(num_horizontal_filters)]
+            crfh['hor_tap_length_minus1'], crfh['hor_filter_coeff'] = _parse_chroma_filters(bs)
     return crfh
 
+def _parse_chroma_filters(bs):
+    # Each filter codes its tap_length_minus1 directly followed by its coefficients
+    num_filters = read_ue_safe(bs)
+    tap_length_minus1 = [None] * num_filters
+    filter_coeff = [None] * num_filters
+    for i in range(num_filters):
+        tap_length_minus1[i] = read_ue_safe(bs)
+        filter_coeff[i] = read_ses_safe(bs, tap_length_minus1[i] + 1)
+    return tap_length_minus1, filter_coeff
+
 
 def parse_knee_function_info(bs):
     kfi = {}
@@ -1700,16 +2218,17 @@ def parse_knee_function_info(bs):
     kfi['knee_function_cancel_flag'] = read_bool_safe(bs)
     if not kfi['knee_function_cancel_flag']:
         kfi['knee_function_persistence_flag'] = read_bool_safe(bs)
-        kfi['input_d_range'] = read_uint_safe(bs, 32)
-        kfi['input_disp_luminance'] = read_uint_safe(bs, 32)
-        kfi['output_d_range'] = read_uint_safe(bs, 32)
-        kfi['output_disp_luminance'] = read_uint_safe(bs, 32)
+        kfi['input_d_range'] = read_u32_safe(bs)
+        kfi['input_disp_luminance'] = read_u32_safe(bs)
+        kfi['output_d_range'] = read_u32_safe(bs)
+        kfi['output_disp_luminance'] = read_u32_safe(bs)
         kfi['num_knee_points_minus1'] = read_ue_safe(bs)
-        kfi['input_knee_point'] = []
-        kfi['output_knee_point'] = []
-        for i in range(kfi['num_knee_points_minus1'] + 1):
-            kfi['input_knee_point'].append(read_uint_safe(bs, 10))
-            kfi['output_knee_point'].append(read_uint_safe(bs, 10))
+        num_knee_points = kfi['num_knee_points_minus1'] + 1
+        input_knee_point = kfi['input_knee_point'] = [None] * num_knee_points
+        output_knee_point = kfi['output_knee_point'] = [None] * num_knee_points
+        for i in range(num_knee_points):
+            input_knee_point[i] = read_uint_safe(bs, 10)
+            output_knee_point[i] = read_uint_safe(bs, 10)
     return kfi
 
 def parse_colour_remapping_info(bs):
@@ -1721,41 +2240,47 @@ def parse_colour_remapping_info(bs):
         cri['colour_remap_video_signal_info_present_flag'] = read_bool_safe(bs)
         if cri['colour_remap_video_signal_info_present_flag']:
             cri['colour_remap_full_range_flag'] = read_bool_safe(bs)
-            cri['colour_remap_primaries'] = read_uint_safe(bs, 8)
-            cri['colour_remap_transfer_function'] = read_uint_safe(bs, 8)
-            cri['colour_remap_matrix_coefficients'] = read_uint_safe(bs, 8)
-        cri['colour_remap_input_bit_depth'] = read_uint_safe(bs, 8)
-        cri['colour_remap_output_bit_depth'] = read_uint_safe(bs, 8)
-        cri['pre_lut_num_val_minus1'] = [read_uint_safe(bs, 8) for _ in range(3)]
-        cri['pre_lut_coded_value'] = []
-        cri['pre_lut_target_value'] = []
-        for i in range(3):
-            if cri['pre_lut_num_val_minus1'][i] > 0:
-                cri['pre_lut_coded_value'].append([read_uint_safe(bs, cri['colour_remap_input_bit_depth']) for _ in range(cri['pre_lut_num_val_minus1'][i] + 1)])
-                cri['pre_lut_target_value'].append([read_uint_safe(bs, cri['colour_remap_output_bit_depth']) for _ in range(cri['pre_lut_num_val_minus1'][i] + 1)])
+            cri['colour_remap_primaries'] = read_u8_safe(bs)
+            cri['colour_remap_transfer_function'] = read_u8_safe(bs)
+            cri['colour_remap_matrix_coefficients'] = read_u8_safe(bs)
+        cri['colour_remap_input_bit_depth'] = read_u8_safe(bs)
+        cri['colour_remap_output_bit_depth'] = read_u8_safe(bs)
+        input_bits = _BYTE_ROUNDED_BITS[cri['colour_remap_input_bit_depth']]
+        output_bits = _BYTE_ROUNDED_BITS[cri['colour_remap_output_bit_depth']]
+        (cri['pre_lut_num_val_minus1'], cri['pre_lut_coded_value'],
+         cri['pre_lut_target_value']) = _parse_colour_remap_luts(bs, input_bits, output_bits)
         cri['colour_remap_matrix_present_flag'] = read_bool_safe(bs)
         if cri['colour_remap_matrix_present_flag']:
             cri['log2_matrix_denom'] = read_uint_safe(bs, 4)
             cri['colour_remap_coeffs'] = [[read_se_safe(bs) for _ in range(3)] for _ in range(3)]
-        cri['post_lut_num_val_minus1'] = [read_uint_safe(bs, 8) for _ in range(3)]
-        cri['post_lut_coded_value'] = []
-        cri['post_lut_target_value'] = []
-        for i in range(3):
-            if cri['post_lut_num_val_minus1'][i] > 0:
-                cri['post_lut_coded_value'].append([read_uint_safe(bs, cri['colour_remap_output_bit_depth']) for _ in range(cri['post_lut_num_val_minus1'][i] + 1)])
-                cri['post_lut_target_value'].append([read_uint_safe(bs, cri['colour_remap_output_bit_depth']) for _ in range(cri['post_lut_num_val_minus1'][i] + 1)])
+        (cri['post_lut_num_val_minus1'], cri['post_lut_coded_value'],
+         cri['post_lut_target_value']) = _parse_colour_remap_luts(bs, output_bits, output_bits)
     return cri
 
+def _parse_colour_remap_luts(bs, coded_bits, target_bits):
+    # Per component: lut_num_val_minus1, then (coded_value, target_value) pairs when it is > 0
+    num_val_minus1, coded_value, target_value = [], [], []
+    for c in range(3):
+        lut_num_val_minus1 = read_u8_safe(bs)
+        num_val_minus1.append(lut_num_val_minus1)
+        if lut_num_val_minus1 > 0:
+            if coded_bits == target_bits:
+                values = read_uints_safe(bs, 2 * (lut_num_val_minus1 + 1), coded_bits)
+                coded, target = values[0::2], values[1::2]
+            else:
+                coded, target = _columns([(read_uint_safe(bs, coded_bits), read_uint_safe(bs, target_bits))
+                                          for _ in range(lut_num_val_minus1 + 1)], 2)
+            coded_value.append(coded)
+            target_value.append(target)
+    return num_val_minus1, coded_value, target_value
+
 def parse_deinterlaced_field_identification(bs):
     dfi = {}
     dfi['deinterlaced_picture_source_parity_flag'] = read_bool_safe(bs)
     return dfi
 
 def parse_content_light_level_info(bs):
-    clli = {}
-    clli['max_content_light_level'] = read_uint_safe(bs, 16)
-    clli['max_pic_average_light_level'] = read_uint_safe(bs, 16)
-    return clli
+    return ContentLightLevelInfo(*read_struct_safe(bs, CLLI_LAYOUT))
 
 def parse_dependent_rap_indication(bs):
     # This SEI message does not carry any payload
@@ -1769,15 +2294,11 @@ def parse_coded_region_completion(bs):
 
 def parse_alternative_transfer_characteristics(bs):
     atc = {}
-    atc['preferred_transfer_characteristics'] = read_uint_safe(bs, 8)
+    atc['preferred_transfer_characteristics'] = read_u8_safe(bs)
     return atc
 
 def parse_ambient_viewing_environment(bs):
-    ave = {}
-    ave['ambient_illuminance'] = read_uint_safe(bs, 32)
-    ave['ambient_light_x'] = read_uint_safe(bs, 16)
-    ave['ambient_light_y'] = read_uint_safe(bs, 16)
-    return ave
+    return AmbientViewingEnvironment(*read_struct_safe(bs, AVE_LAYOUT))
 
 def parse_content_colour_volume(bs):
     ccv = {}
@@ -1790,14 +2311,14 @@ def parse_content_colour_volume(bs):
         ccv['ccv_avg_luminance_value_present_flag'] = read_bool_safe(bs)
         ccv['ccv_reserved_zero_2bits'] = read_uint_safe(bs, 2)
         if ccv['ccv_primaries_present_flag']:
-            ccv['ccv_primaries_x'] = [read_uint_safe(bs, 32) for _ in range(3)]
-            ccv['ccv_primaries_y'] = [read_uint_safe(bs, 32) for _ in range(3)]
+            ccv['ccv_primaries_x'] = [read_u32_safe(bs) for _ in range(3)]
+            ccv['ccv_primaries_y'] = [read_u32_safe(bs) for _ in range(3)]
         if ccv['ccv_min_luminance_value_present_flag']:
-            ccv['ccv_min_luminance_value'] = read_uint_safe(bs, 32)
+            ccv['ccv_min_luminance_value'] = read_u32_safe(bs)
         if ccv['ccv_max_luminance_value_present_flag']:
-            ccv['ccv_max_luminance_value'] = read_uint_safe(bs, 32)
+            ccv['ccv_max_luminance_value'] = read_u32_safe(bs)
         if ccv['ccv_avg_luminance_value_present_flag']:
-            ccv['ccv_avg_luminance_value'] = read_uint_safe(bs, 32)
+            ccv['ccv_avg_luminance_value'] = read_u32_safe(bs)
     return ccv
 
 def parse_equirectangular_projection(bs):
@@ -1826,16 +2347,16 @@ def parse_fisheye_video_info(bs):
     fvi['fisheye_cancel_flag'] = read_bool_safe(bs)
     if not fvi['fisheye_cancel_flag']:
         fvi['fisheye_persistence_flag'] = read_bool_safe(bs)
-        fvi['fisheye_view_dimension'] = read_uint_safe(bs, 8)
-        fvi['fisheye_scene_radius'] = read_uint_safe(bs, 32)
+        fvi['fisheye_view_dimension'] = read_u8_safe(bs)
+        fvi['fisheye_scene_radius'] = read_u32_safe(bs)
         fvi['fisheye_camera_center_azimuth'] = read_se_safe(bs)
         fvi['fisheye_camera_center_elevation'] = read_se_safe(bs)
         fvi['fisheye_camera_center_tilt'] = read_se_safe(bs)
         fvi['fisheye_camera_center_offset'] = read_se_safe(bs)
-        fvi['fisheye_circular_region_radius'] = read_uint_safe(bs, 32)
-        fvi['fisheye_field_of_view'] = read_uint_safe(bs, 32)
+        fvi['fisheye_circular_region_radius'] = read_u32_safe(bs)
+        fvi['fisheye_field_of_view'] = read_u32_safe(bs)
         fvi['num_polynomial_coeffs'] = read_uint_safe(bs, 6)
-        fvi['polynomial_coeff'] = [read_se_safe(bs) for _ in range(fvi['num_polynomial_coeffs'])]
+        fvi['polynomial_coeff'] = read_ses_safe(bs, fvi['num_polynomial_coeffs'])
     return fvi
 
 def parse_sphere_rotation(bs):
@@ -1848,6 +2369,48 @@ def parse_sphere_rotation(bs):
         sr['roll_rotation'] = read_se_safe(bs)
     return sr
 
+# A packed region (4-bit reserved, 3-bit transform, guard band flag, then 4 x u(32) and 4 x u(16))
+# and its guard band (4 x u(8), then the flag, four 3-bit types and 3 reserved bits) both stay
+# byte-aligned when the payload is, so each decodes with one unpack
+RWP_REGION_LAYOUT = struct.Struct('>B4I4H')
+RWP_GUARD_BAND_LAYOUT = struct.Struct('>4BH')
+
+def _read_rwp_region(bs):
+    pos = bs.pos
+    if pos & 7 == 0 and pos + 8 * RWP_REGION_LAYOUT.size <= bs.len:
+        bs.pos = pos + 8 * RWP_REGION_LAYOUT.size
+        first, *sizes = RWP_REGION_LAYOUT.unpack_from(bs.buf, pos >> 3)
+        return (first >> 4, (first >> 1) & 7, bool(first & 1), *sizes)
+    ru = read_uint_safe
+    return (ru(bs, 4), ru(bs, 3), read_bool_safe(bs), ru(bs, 32), ru(bs, 32), ru(bs, 32), ru(bs, 32),
+            ru(bs, 16), ru(bs, 16), ru(bs, 16), ru(bs, 16))
+
+def _read_rwp_guard_band(bs):
+    pos = bs.pos
+    if pos & 7 == 0 and pos + 8 * RWP_GUARD_BAND_LAYOUT.size <= bs.len:
+        bs.pos = pos + 8 * RWP_GUARD_BAND_LAYOUT.size
+        left, right, top, bottom, rest = RWP_GUARD_BAND_LAYOUT.unpack_from(bs.buf, pos >> 3)
+        return (left, right, top, bottom, bool(rest >> 15), [(rest >> shift) & 7 for shift in (12, 9, 6, 3)],
+                rest & 7)
+    ru = read_uint_safe
+    return (ru(bs, 8), ru(bs, 8), ru(bs, 8), ru(bs, 8), read_bool_safe(bs), [ru(bs, 3) for _ in range(4)], ru(bs, 3))
+
+# The region table as numpy records; usable in one go only while no region carries a guard band
+RWP_REGION_DTYPE = np.dtype([('flags', 'u1'), ('proj_region', '>u4', (4,)), ('packed_region', '>u2', (4,))])
+
+def _read_rwp_region_table(bs, num_regions):
+    pos = bs.pos
+    if pos & 7 or pos + 8 * RWP_REGION_DTYPE.itemsize * num_regions > bs.len:
+        return None
+    table = np.frombuffer(bs.buf, dtype=RWP_REGION_DTYPE, count=num_regions, offset=pos >> 3)
+    flags = table['flags']
+    # A set guard band flag shifts every record after it, so that case is left to the per-region reads
+    if (flags & 1).any():
+        return None
+    bs.pos = pos + 8 * RWP_REGION_DTYPE.itemsize * num_regions
+    return ([(flags >> 4).tolist(), ((flags >> 1) & 7).tolist(), [False] * num_regions]
+            + table['proj_region'].T.tolist() + table['packed_region'].T.tolist())
+
 def parse_regionwise_packing(bs):
     rp = {}
     rp['rwp_cancel_flag'] = read_bool_safe(bs)
@@ -1855,48 +2418,28 @@ def parse_regionwise_packing(bs):
         rp['rwp_persistence_flag'] = read_bool_safe(bs)
         rp['constituent_picture_matching_flag'] = read_bool_safe(bs)
         rp['rwp_reserved_zero_5bits'] = read_uint_safe(bs, 5)
-        rp['num_packed_regions'] = read_uint_safe(bs, 8)
-        rp['proj_picture_width'] = read_uint_safe(bs, 32)
-        rp['proj_picture_height'] = read_uint_safe(bs, 32)
-        rp['packed_picture_width'] = read_uint_safe(bs, 16)
-        rp['packed_picture_height'] = read_uint_safe(bs, 16)
-        rp['rwp_reserved_zero_4bits'] = read_uint_safe(bs, 4)
-        rp['rwp_transform_type'] = []
-        rp['rwp_guard_band_flag'] = []
-        rp['proj_region_width'] = []
-        rp['proj_region_height'] = []
-        rp['proj_region_top'] = []
-        rp['proj_region_left'] = []
-        rp['packed_region_width'] = []
-        rp['packed_region_height'] = []
-        rp['packed_region_top'] = []
-        rp['packed_region_left'] = []
-        rp['left_guard_band_width'] = []
-        rp['right_guard_band_width'] = []
-        rp['top_guard_band_height'] = []
-        rp['bottom_guard_band_height'] = []
-        for i in range(rp['num_packed_regions']):
-            rp['rwp_reserved_zero_4bits'].append(read_uint_safe(bs, 4))
-            rp['rwp_transform_type'].append(read_uint_safe(bs, 3))
-            rp['rwp_guard_band_flag'].append(read_bool_safe(bs))
-            rp['proj_region_width'].append(read_uint_safe(bs, 32))
-            rp['proj_region_height'].append(read_uint_safe(bs, 32))
-            rp['proj_region_top'].append(read_uint_safe(bs, 32))
-            rp['proj_region_left'].append(read_uint_safe(bs, 32))
-            rp['packed_region_width'].append(read_uint_safe(bs, 16))
-            rp['packed_region_height'].append(read_uint_safe(bs, 16))
-            rp['packed_region_top'].append(read_uint_safe(bs, 16))
-            rp['packed_region_left'].append(read_uint_safe(bs, 16))
-            if rp['rwp_guard_band_flag'][i]:
-                rp['left_guard_band_width'].append(read_uint_safe(bs, 8))
-                rp['right_guard_band_width'].append(read_uint_safe(bs, 8))
-                rp['top_guard_band_height'].append(read_uint_safe(bs, 8))
-                rp['bottom_guard_band_height'].append(read_uint_safe(bs, 8))
-            else:
-                rp['left_guard_band_width'].append(None)
-                rp['right_guard_band_width'].append(None)
-                rp['top_guard_band_height'].append(None)
-                rp['bottom_guard_band_height'].append(None)
+        rp['num_packed_regions'] = read_u8_safe(bs)
+        rp['proj_picture_width'] = read_u32_safe(bs)
+        rp['proj_picture_height'] = read_u32_safe(bs)
+        rp['packed_picture_width'] = read_u16_safe(bs)
+        rp['packed_picture_height'] = read_u16_safe(bs)
+        num_regions = rp['num_packed_regions']
+        region_columns = _read_rwp_region_table(bs, num_regions)
+        guard_bands = [(None,) * 7] * num_regions
+        if region_columns is None:
+            regions = [None] * num_regions
+            for i in range(num_regions):
+                region = regions[i] = _read_rwp_region(bs)
+                if region[2]:
+                    guard_bands[i] = _read_rwp_guard_band(bs)
+            region_columns = _columns(regions, 11)
+        (rp['rwp_reserved_zero_4bits'], rp['rwp_transform_type'], rp['rwp_guard_band_flag'],
+         rp['proj_region_width'], rp['proj_region_height'], rp['proj_region_top'], rp['proj_region_left'],
+         rp['packed_region_width'], rp['packed_region_height'], rp['packed_region_top'],
+         rp['packed_region_left']) = region_columns
+        (rp['left_guard_band_width'], rp['right_guard_band_width'], rp['top_guard_band_height'],
+         rp['bottom_guard_band_height'], rp['guard_band_not_used_for_pred_flag'], rp['guard_band_type'],
+         rp['rwp_guard_band_reserved_zero_3bits']) = _columns(guard_bands, 7)
     return rp
 
 def parse_omni_viewport(bs):
@@ -1906,48 +2449,30 @@ def parse_omni_viewport(bs):
     if not ov['omni_viewport_cancel_flag']:
         ov['omni_viewport_persistence_flag'] = read_bool_safe(bs)
         ov['omni_viewport_cnt_minus1'] = read_uint_safe(bs, 4)
-        ov['omni_viewport_azimuth'] = []
-        ov['omni_viewport_elevation'] = []
-        ov['omni_viewport_tilt'] = []
-        ov['omni_viewport_hor_range'] = []
-        ov['omni_viewport_ver_range'] = []
-        for i in range(ov['omni_viewport_cnt_minus1'] + 1):
-            ov['omni_viewport_azimuth'].append(read_se_safe(bs))
-            ov['omni_viewport_elevation'].append(read_se_safe(bs))
-            ov['omni_viewport_tilt'].append(read_se_safe(bs))
-            ov['omni_viewport_hor_range'].append(read_ue_safe(bs))
-            ov['omni_viewport_ver_range'].append(read_ue_safe(bs))
+        se, ue = read_se_safe, read_ue_safe
+        viewports = [(se(bs), se(bs), se(bs), ue(bs), ue(bs)) for _ in range(ov['omni_viewport_cnt_minus1'] + 1)]
+        (ov['omni_viewport_azimuth'], ov['omni_viewport_elevation'], ov['omni_viewport_tilt'],
+         ov['omni_viewport_hor_range'], ov['omni_viewport_ver_range']) = _columns(viewports, 5)
     return ov
 
-def parse_regional_nesting(bs):
-    rn = {}
-    rn['regional_nesting_id'] = read_ue_safe(bs)
-    rn['regional_nesting_cancel_flag'] = read_bool_safe(bs)
-    if not rn['regional_nesting_cancel_flag']:
-        rn['regional_nesting_persistence_flag'] = read_bool_safe(bs)
-        rn['num_regions_minus1'] = read_ue_safe(bs)
-        rn['regional_nesting_sei_payload'] = []
-        for i in range(rn['num_regions_minus1'] + 1):
-            rn['regional_nesting_sei_payload'].append(parse_sei_payload(bs))
-    return rn
-
 def parse_mcts_extraction_info_sets(bs):
     meis = {}
     meis['num_mcts_sets'] = read_ue_safe(bs)
-    meis['num_mcts_in_set_minus1'] = []
-    meis['default_target_output_layer_idc'] = []
-    meis['extraction_info_present_for_set'] = []
-    meis['num_referenced_mcts'] = []
-    meis['referenced_mcts_idx'] = []
-    for i in range(meis['num_mcts_sets']):
-        meis['num_mcts_in_set_minus1'].append(read_ue_safe(bs))
-        meis['default_target_output_layer_idc'].append(read_uint_safe(bs, 2))
-        meis['extraction_info_present_for_set'].append(read_bool_safe(bs))
-        if meis['extraction_info_present_for_set'][i]:
-            meis['num_referenced_mcts'].append(read_ue_safe(bs))
-            meis['referenced_mcts_idx'].append([])
-            for j in range(meis['num_referenced_mcts'][i]):
-                meis['referenced_mcts_idx'][i].append(read_ue_safe(bs))
+    num_mcts_sets = meis['num_mcts_sets']
+    num_mcts_in_set_minus1 = meis['num_mcts_in_set_minus1'] = [None] * num_mcts_sets
+    default_target_output_layer_idc = meis['default_target_output_layer_idc'] = [None] * num_mcts_sets
+    extraction_info_present_for_set = meis['extraction_info_present_for_set'] = [None] * num_mcts_sets
+    num_referenced_mcts = meis['num_referenced_mcts'] = []
+    referenced_mcts_idx = meis['referenced_mcts_idx'] = []
+    for i in range(num_mcts_sets):
+        num_mcts_in_set_minus1[i] = read_ue_safe(bs)
+        default_target_output_layer_idc[i] = read_uint_safe(bs, 2)
+        extraction_info_present_for_set[i] = read_bool_safe(bs)
+        if extraction_info_present_for_set[i]:
+            # Only the sets with extraction info get an entry, so index by the count just read
+            num_referenced = read_ue_safe(bs)
+            num_referenced_mcts.append(num_referenced)
+            referenced_mcts_idx.append(read_ues_safe(bs, num_referenced))
     return meis
 
 def parse_mcts_extraction_info_nesting(bs):
@@ -1955,10 +2480,11 @@ def parse_mcts_extraction_info_nesting(bs):
     mein['all_mcts_flag'] = read_bool_safe(bs)
     if not mein['all_mcts_flag']:
         mein['num_mcts'] = read_ue_safe(bs)
-        mein['mcts_id'] = [read_ue_safe(bs) for _ in range(mein['num_mcts'])]
+        mein['mcts_id'] = read_ues_safe(bs, mein['num_mcts'])
+    byte_alignment(bs)
     mein['nested_sei_payloads'] = []
     while more_data_in_payload(bs):
-        mein['nested_sei_payloads'].append(parse_sei_payload(bs))
+        mein['nested_sei_payloads'].append(_parse_nested_sei_message(bs))
     return mein
 
 def parse_alpha_channel_info(bs):
@@ -1967,8 +2493,9 @@ def parse_alpha_channel_info(bs):
     if not aci['alpha_channel_cancel_flag']:
         aci['alpha_channel_use_idc'] = read_uint_safe(bs, 3)
         aci['alpha_channel_bit_depth_minus8'] = read_uint_safe(bs, 3)
-        aci['alpha_transparent_value'] = read_uint_safe(bs, aci['alpha_channel_bit_depth_minus8'] + 8)
-        aci['alpha_opaque_value'] = read_uint_safe(bs, aci['alpha_channel_bit_depth_minus8'] + 8)
+        bit_depth = aci['alpha_channel_bit_depth_minus8'] + 8
+        aci['alpha_transparent_value'] = read_uint_safe(bs, bit_depth)
+        aci['alpha_opaque_value'] = read_uint_safe(bs, bit_depth)
         aci['alpha_channel_incr_flag'] = read_bool_safe(bs)
         aci['alpha_channel_clip_flag'] = read_bool_safe(bs)
         if aci['alpha_channel_clip_flag']:
@@ -1977,22 +2504,19 @@ def parse_alpha_channel_info(bs):
 
 def parse_depth_representation_info(bs):
     dri = {}
-    dri['z_near_flag'] = read_bool_safe(bs)
-    dri['z_far_flag'] = read_bool_safe(bs)
-    dri['d_min_flag'] = read_bool_safe(bs)
-    dri['d_max_flag'] = read_bool_safe(bs)
-    dri['depth_representation_type'] = read_uint_safe(bs, 3)
+    (dri['z_near_flag'], dri['z_far_flag'], dri['d_min_flag'], dri['d_max_flag'],
+     dri['depth_representation_type']) = read_fields_safe(bs, (1, 1, 1, 1, 3))
     if dri['z_near_flag']:
-        dri['z_near_val'] = read_uint_safe(bs, 32)
+        dri['z_near_val'] = read_u32_safe(bs)
     if dri['z_far_flag']:
-        dri['z_far_val'] = read_uint_safe(bs, 32)
+        dri['z_far_val'] = read_u32_safe(bs)
     if dri['d_min_flag']:
-        dri['d_min_val'] = read_uint_safe(bs, 32)
+        dri['d_min_val'] = read_u32_safe(bs)
     if dri['d_max_flag']:
-        dri['d_max_val'] = read_uint_safe(bs, 32)
+        dri['d_max_val'] = read_u32_safe(bs)
     if dri['depth_representation_type'] == 3:
-        dri['depth_nonlinear_representation_num_minus1'] = read_uint_safe(bs, 16)
-        dri['depth_nonlinear_representation_model'] = [read_uint_safe(bs, 16) for _ in range(dri['depth_nonlinear_representation_num_minus1'] + 1)]
+        dri['depth_nonlinear_representation_num_minus1'] = read_u16_safe(bs)
+        dri['depth_nonlinear_representation_model'] = read_uints_safe(bs, dri['depth_nonlinear_representation_num_minus1'] + 1, 16)
     return dri
 
 def parse_multiview_scene_info(bs):
@@ -2001,6 +2525,17 @@ def parse_multiview_scene_info(bs):
     msi['max_disparity_range'] = read_ue_safe(bs)
     return msi
 
+def _read_mai_float(bs, prec):
+    # sign, 6-bit exponent and a mantissa whose length follows from the exponent and precision
+    sign = read_bool_safe(bs)
+    exponent = read_uint_safe(bs, 6)
+    if exponent is None:
+        return sign, None, None
+    length = max(0, prec - 30) if exponent == 0 else max(0, exponent + prec - 31)
+    return sign, exponent, read_uint_safe(bs, length)
+
+MAI_INTRINSIC_FIELDS = ('focal_length_x', 'focal_length_y', 'principal_point_x', 'principal_point_y', 'skew_factor')
+
 def parse_multiview_acquisition_info(bs):
     mai = {}
     mai['intrinsic_param_flag'] = read_bool_safe(bs)
@@ -2012,59 +2547,65 @@ def parse_multiview_acquisition_info(bs):
         mai['prec_principal_point'] = read_ue_safe(bs)
         mai['prec_skew_factor'] = read_ue_safe(bs)
         num_views = 1 if mai['intrinsic_params_equal_flag'] else mai['num_views_minus1'] + 1
-        mai['sign_focal_length_x'] = [read_bool_safe(bs) for _ in range(num_views)]
-        mai['exponent_focal_length_x'] = [read_uint_safe(bs, 6) for _ in range(num_views)]
-        mai['mantissa_focal_length_x'] = [read_uint_safe(bs, mai['prec_focal_length']) for _ in range(num_views)]
-        mai['sign_focal_length_y'] = [read_bool_safe(bs) for _ in range(num_views)]
-        mai['exponent_focal_length_y'] = [read_uint_safe(bs, 6) for _ in range(num_views)]
-        mai['mantissa_focal_length_y'] = [read_uint_safe(bs, mai['prec_focal_length']) for _ in range(num_views)]
-        mai['sign_principal_point_x'] = [read_bool_safe(bs) for _ in range(num_views)]
-        mai['exponent_principal_point_x'] = [read_uint_safe(bs, 6) for _ in range(num_views)]
-        mai['mantissa_principal_point_x'] = [read_uint_safe(bs, mai['prec_principal_point']) for _ in range(num_views)]
-        mai['sign_principal_point_y'] = [read_bool_safe(bs) for _ in range(num_views)]
-        mai['exponent_principal_point_y'] = [read_uint_safe(bs, 6) for _ in range(num_views)]
-        mai['mantissa_principal_point_y'] = [read_uint_safe(bs, mai['prec_principal_point']) for _ in range(num_views)]
-        mai['sign_skew_factor'] = [read_bool_safe(bs) for _ in range(num_views)]
-        mai['exponent_skew_factor'] = [read_uint_safe(bs, 6) for _ in range(num_views)]
-        mai['mantissa_skew_factor'] = [read_uint_safe(bs, mai['prec_skew_factor']) for _ in range(num_views)]
+        precs = (mai['prec_focal_length'], mai['prec_focal_length'], mai['prec_principal_point'],
+                 mai['prec_principal_point'], mai['prec_skew_factor'])
+        # All the parameters of one view are coded together, view after view
+        rows = [[value for prec in precs for value in _read_mai_float(bs, prec)] for _ in range(num_views)]
+        columns = iter(_columns(rows, 3 * len(MAI_INTRINSIC_FIELDS)))
+        for field in MAI_INTRINSIC_FIELDS:
+            mai[f'sign_{field}'] = next(columns)
+            mai[f'exponent_{field}'] = next(columns)
+            mai[f'mantissa_{field}'] = next(columns)
     if mai['extrinsic_param_flag']:
         mai['prec_rotation_param'] = read_ue_safe(bs)
         mai['prec_translation_param'] = read_ue_safe(bs)
-        for i in range(mai['num_views_minus1']):
-            mai[f'sign_r_{i}'] = [read_bool_safe(bs) for _ in range(3)]
-            mai[f'exponent_r_{i}'] = [read_uint_safe(bs, 6) for _ in range(3)]
-            mai[f'mantissa_r_{i}'] = [read_uint_safe(bs, mai['prec_rotation_param']) for _ in range(3)]
-            mai[f'sign_t_{i}'] = [read_bool_safe(bs) for _ in range(3)]
-            mai[f'exponent_t_{i}'] = [read_uint_safe(bs, 6) for _ in range(3)]
-            mai[f'mantissa_t_{i}'] = [read_uint_safe(bs, mai['prec_translation_param']) for _ in range(3)]
+        prec_rotation, prec_translation = mai['prec_rotation_param'], mai['prec_translation_param']
+        for i in range(mai['num_views_minus1'] + 1):
+            sign_r = [[None] * 3 for _ in range(3)]
+            exponent_r = [[None] * 3 for _ in range(3)]
+            mantissa_r = [[None] * 3 for _ in range(3)]
+            sign_t, exponent_t, mantissa_t = [None] * 3, [None] * 3, [None] * 3
+            # Each row of the rotation matrix is followed by its translation component
+            for j in range(3):
+                for k in range(3):
+                    sign_r[j][k], exponent_r[j][k], mantissa_r[j][k] = _read_mai_float(bs, prec_rotation)
+                sign_t[j], exponent_t[j], mantissa_t[j] = _read_mai_float(bs, prec_translation)
+            mai[f'sign_r_{i}'] = sign_r
+            mai[f'exponent_r_{i}'] = exponent_r
+            mai[f'mantissa_r_{i}'] = mantissa_r
+            mai[f'sign_t_{i}'] = sign_t
+            mai[f'exponent_t_{i}'] = exponent_t
+            mai[f'mantissa_t_{i}'] = mantissa_t
     return mai
 
 def parse_multiview_view_position(bs):
     mvp = {}
     mvp['num_views_minus1'] = read_ue_safe(bs)
-    mvp['view_position'] = [read_ue_safe(bs) for _ in range(mvp['num_views_minus1'] + 1)]
+    mvp['view_position'] = read_ues_safe(bs, mvp['num_views_minus1'] + 1)
     return mvp
 
 def parse_sei_manifest(bs):
     sm = {}
     sm['manifest_num_sei_msg_types'] = read_ue_safe(bs)
-    sm['manifest_sei_payload_type'] = []
-    sm['manifest_sei_description'] = []
-    for i in range(sm['manifest_num_sei_msg_types']):
-        sm['manifest_sei_payload_type'].append(read_uint_safe(bs, 16))
-        sm['manifest_sei_description'].append(read_string(bs))
+    num_sei_msg_types = sm['manifest_num_sei_msg_types']
+    manifest_sei_payload_type = sm['manifest_sei_payload_type'] = [None] * num_sei_msg_types
+    manifest_sei_description = sm['manifest_sei_description'] = [None] * num_sei_msg_types
+    for i in range(num_sei_msg_types):
+        manifest_sei_payload_type[i] = read_u16_safe(bs)
+        manifest_sei_description[i] = read_string(bs)
     return sm
 
 def parse_sei_prefix_indication(bs):
     spi = {}
     spi['num_sei_prefix_indications_minus1'] = read_ue_safe(bs)
-    spi['prefix_sei_payload_type'] = []
-    spi['num_bits_in_prefix_indication_minus1'] = []
-    spi['sei_prefix_data_bit'] = []
-    for i in range(spi['num_sei_prefix_indications_minus1'] + 1):
-        spi['prefix_sei_payload_type'].append(read_uint_safe(bs, 16))
-        spi['num_bits_in_prefix_indication_minus1'].append(read_ue_safe(bs))
-        spi['sei_prefix_data_bit'].append([read_bool_safe(bs) for _ in range(spi['num_bits_in_prefix_indication_minus1'][i] + 1)])
+    num_indications = spi['num_sei_prefix_indications_minus1'] + 1
+    prefix_sei_payload_type = spi['prefix_sei_payload_type'] = [None] * num_indications
+    num_bits_in_prefix_indication_minus1 = spi['num_bits_in_prefix_indication_minus1'] = [None] * num_indications
+    sei_prefix_data_bit = spi['sei_prefix_data_bit'] = [None] * num_indications
+    for i in range(num_indications):
+        prefix_sei_payload_type[i] = read_u16_safe(bs)
+        num_bits = num_bits_in_prefix_indication_minus1[i] = read_ue_safe(bs)
+        sei_prefix_data_bit[i] = read_flags_safe(bs, num_bits + 1)
     return spi
 
 def parse_annotated_regions(bs):
@@ -2093,24 +2634,96 @@ def parse_annotated_regions(bs):
             ar['annotated_regions'].append(region)
     return ar
 
+# payload_type -> parser(bs, payload_size, sps); looked up once per SEI message
+_SEI_PAYLOAD_PARSERS = {
+    0: lambda bs, payload_size, sps: parse_buffering_period(bs, sps),
+    1: lambda bs, payload_size, sps: parse_pic_timing(bs, sps),
+    3: lambda bs, payload_size, sps: parse_filler_payload(bs, payload_size),
+    4: lambda bs, payload_size, sps: parse_user_data_registered_itu_t_t35(bs, payload_size),
+    5: lambda bs, payload_size, sps: parse_user_data_unregistered(bs, payload_size),
+    130: lambda bs, payload_size, sps: parse_decoding_unit_info(bs, sps),
+    133: lambda bs, payload_size, sps: parse_scalable_nesting(bs, payload_size, sps),
+}
+# The rest only need the bitstream and are called directly, without a wrapper frame
+_SEI_BITSTREAM_PARSERS = {
+    2: parse_pan_scan_rect,
+    6: parse_recovery_point,
+    9: parse_scene_info,
+    15: parse_picture_snapshot,
+    16: parse_progressive_refinement_segment_start,
+    17: parse_progressive_refinement_segment_end,
+    19: parse_film_grain_characteristics,
+    22: parse_post_filter_hint,
+    23: parse_tone_mapping_info,
+    45: parse_frame_packing_arrangement,
+    47: parse_display_orientation,
+    128: parse_structure_of_pictures_info,
+    129: parse_active_parameter_sets,
+    131: parse_temporal_sub_layer_zero_index,
+    132: parse_decoded_picture_hash,
+    134: parse_region_refresh_info,
+    135: parse_no_display,
+    136: parse_time_code,
+    137: parse_mastering_display_colour_volume,
+    138: parse_segmented_rect_frame_packing_arrangement,
+    139: parse_temporal_motion_constrained_tile_sets,
+    140: parse_chroma_resampling_filter_hint,
+    141: parse_knee_function_info,
+    142: parse_colour_remapping_info,
+    143: parse_deinterlaced_field_identification,
+    144: parse_content_light_level_info,
+    145: parse_dependent_rap_indication,
+    146: parse_coded_region_completion,
+    147: parse_alternative_transfer_characteristics,
+    148: parse_ambient_viewing_environment,
+    149: parse_content_colour_volume,
+    150: parse_equirectangular_projection,
+    151: parse_cubemap_projection,
+    152: parse_fisheye_video_info,
+    154: parse_sphere_rotation,
+    155: parse_regionwise_packing,
+    156: parse_omni_viewport,
+    158: parse_mcts_extraction_info_sets,
+    159: parse_mcts_extraction_info_nesting,
+    161: parse_alpha_channel_info,
+    162: parse_depth_representation_info,
+    163: parse_multiview_scene_info,
+    164: parse_multiview_acquisition_info,
+    165: parse_multiview_view_position,
+    200: parse_sei_manifest,
+    201: parse_sei_prefix_indication,
+    202: parse_annotated_regions,
+}
+
 def read_string(bs):
     string_length = read_ue_safe(bs)
-    return ''.join([chr(read_uint_safe(bs, 8)) for _ in range(string_length)])
+    pos = bs.pos
+    # Each byte maps to one character, so an aligned string is a latin-1 decode of the buffer
+    if pos & 7 == 0 and pos + 8 * string_length <= bs.len:
+        bs.pos = pos + 8 * string_length
+        return str(bs.buf[pos >> 3:(pos >> 3) + string_length], 'latin-1')
+    return ''.join([chr(read_u8_safe(bs)) for _ in range(string_length)])
 
 def more_rbsp_data(bs):
-    if bs.pos >= bs.len:
+    # Any set bit before the final byte, checked on the buffer rather than a '0'/'1' string
+    pos = bs.pos
+    buf = bs.buf
+    byte_pos = pos >> 3
+    last_byte = (bs.len >> 3) - 1
+    if byte_pos >= last_byte:
         return False
-    current_pos = bs.pos
-    trailing_bits = bs.read(f'bin:{bs.len - bs.pos}')
-    bs.pos = current_pos  # Reset position
-    return '1' in trailing_bits[:-8]
+    if buf[byte_pos] & (0xFF >> (pos & 7)):
+        return True
+    return bytes(buf[byte_pos + 1:last_byte]).count(0) != last_byte - byte_pos - 1
 
 def parse_slice_segment(data, nal_unit_type, sps, pps, shared_state=None):
     """
     Parse a single slice segment, initializing shared state when necessary.
     """
     slice_segment = {}
-    bs = BitStream(data)
+    # The header is only a few bytes at the front of the NAL unit, so read it in place rather than
+    # copying the whole slice
+    bs = BitReader(data, copy=False)
     
     # Parse slice_segment_header
     slice_segment['header'] = parse_slice_segment_header(bs, nal_unit_type, sps, pps)
@@ -2118,63 +2731,87 @@ def parse_slice_segment(data, nal_unit_type, sps, pps, shared_state=None):
     return slice_segment
 
 
+def ceil_log2(x):
+    # Ceil(Log2(x)) for the bit widths of u(v) fields, exact for any int
+    return (x - 1).bit_length() if x > 1 else 0
+
+# Every slice of a picture (and usually of the whole stream) shares one SPS, so the values the slice
+# header derives from it are worked out once per SPS object
+SLICE_HEADER_CONTEXT_CACHE_SIZE = 8
+_slice_header_contexts = OrderedDict()
+
+def _slice_header_sps_context(sps):
+    cached = _slice_header_contexts.get(id(sps))
+    # Compare the object too, an id can be reused once its SPS is gone
+    if cached is not None and cached[0] is sps:
+        return cached[1]
+
+    log2_min = sps.get('log2_min_luma_coding_block_size_minus3', 0) + 3
+    log2_diff = sps.get('log2_diff_max_min_luma_coding_block_size', 0)
+    CtbLog2SizeY = log2_min + log2_diff
+    CtbSizeY = 1 << CtbLog2SizeY
+    pic_width  = sps.get('pic_width_in_luma_samples', 0)
+    pic_height = sps.get('pic_height_in_luma_samples', 0)
+    PicWidthInCtbsY  = (pic_width  + CtbSizeY - 1) // CtbSizeY
+    PicHeightInCtbsY = (pic_height + CtbSizeY - 1) // CtbSizeY
+    PicSizeInCtbsY   = PicWidthInCtbsY * PicHeightInCtbsY
+    slice_address_bits = max(1, ceil_log2(PicSizeInCtbsY)) if PicSizeInCtbsY > 0 else 0
+
+    cfi = sps.get('chroma_format_idc', 1)
+    scp = sps.get('separate_colour_plane_flag', 0)
+    ChromaArrayType = 0 if (cfi == 3 and scp == 1) else cfi
+
+    context = (slice_address_bits, ChromaArrayType)
+    _slice_header_contexts[id(sps)] = (sps, context)
+    if len(_slice_header_contexts) > SLICE_HEADER_CONTEXT_CACHE_SIZE:
+        _slice_header_contexts.popitem(last=False)
+    return context
+
+# slice_type values 0, 1 and 2
+SLICE_TYPES = ('B', 'P', 'I')
+
 def parse_slice_segment_header(bs, nal_unit_type, sps, pps):
+    rb, ru, rs, rui = read_bool_safe, read_ue_safe, read_se_safe, read_uint_safe
+    slice_address_bits, ChromaArrayType = _slice_header_sps_context(sps)
     slice_header = {}
 
-    slice_header['first_slice_segment_in_pic_flag'] = read_bool_safe(bs)
+    slice_header['first_slice_segment_in_pic_flag'] = rb(bs)
 
     if nal_unit_type >= 16 and nal_unit_type <= 23:
-        slice_header['no_output_of_prior_pics_flag'] = read_bool_safe(bs)
+        slice_header['no_output_of_prior_pics_flag'] = rb(bs)
 
-    slice_header['slice_pic_parameter_set_id'] = read_ue_safe(bs)
+    slice_header['slice_pic_parameter_set_id'] = ru(bs)
 
     slice_header['dependent_slice_segment_flag'] = False  # Set the default value
     slice_header['slice_segment_address'] = 0 if slice_header['first_slice_segment_in_pic_flag'] else None # Set the default value
 
     if slice_header.get('first_slice_segment_in_pic_flag', False) == False:
         if pps.get('dependent_slice_segments_enabled_flag', False):
-            slice_header['dependent_slice_segment_flag'] = read_bool_safe(bs)
-
-        log2_min = sps.get('log2_min_luma_coding_block_size_minus3', 0) + 3
-        log2_diff = sps.get('log2_diff_max_min_luma_coding_block_size', 0)
-        CtbLog2SizeY = log2_min + log2_diff
-        CtbSizeY = 1 << CtbLog2SizeY
-        pic_width  = sps.get('pic_width_in_luma_samples', 0)
-        pic_height = sps.get('pic_height_in_luma_samples', 0)
-        PicWidthInCtbsY  = (pic_width  + CtbSizeY - 1) // CtbSizeY
-        PicHeightInCtbsY = (pic_height + CtbSizeY - 1) // CtbSizeY
-        PicSizeInCtbsY   = PicWidthInCtbsY * PicHeightInCtbsY
-
-        if PicSizeInCtbsY > 0:
-            num_bits = max(1, math.ceil(math.log2(PicSizeInCtbsY)))
-            slice_header['slice_segment_address'] = read_uint_safe(bs, num_bits)
+            slice_header['dependent_slice_segment_flag'] = rb(bs)
+
+        if slice_address_bits:
+            slice_header['slice_segment_address'] = rui(bs, slice_address_bits)
         else:
             slice_header['slice_segment_address'] = 0
 
     if slice_header.get('dependent_slice_segment_flag') == False:
-        slice_header['slice_reserved_flag'] = [read_bool_safe(bs) for _ in range(pps.get('num_extra_slice_header_bits', 0))]
-
-        slice_header['slice_type'] = read_ue_safe(bs)  # 0 = B, 1 = P, 2 = I
-        if slice_header['slice_type'] == 0:
-            slice_header['slice_type'] = 'B'
-        elif slice_header['slice_type'] == 1:
-            slice_header['slice_type'] = 'P'
-        elif slice_header['slice_type'] == 2:
-            slice_header['slice_type'] = 'I'
+        slice_header['slice_reserved_flag'] = [rb(bs) for _ in range(pps.get('num_extra_slice_header_bits', 0))]
 
-        if not slice_header['slice_type'] in ['B', 'P', 'I']:
+        slice_type = ru(bs)
+        if slice_type is None or slice_type > 2:
             print("Error: slice type not supported")
             return False
+        slice_header['slice_type'] = SLICE_TYPES[slice_type]
 
         if pps.get('output_flag_present_flag', False):
-            slice_header['pic_output_flag'] = read_bool_safe(bs)
+            slice_header['pic_output_flag'] = rb(bs)
 
         if sps.get('separate_colour_plane_flag', False):
-            slice_header['colour_plane_id'] = read_uint_safe(bs, 2)
+            slice_header['colour_plane_id'] = rui(bs, 2)
 
         if nal_unit_type != 19 and nal_unit_type != 20:
-            slice_header['slice_pic_order_cnt_lsb'] = read_uint_safe(bs, sps['log2_max_pic_order_cnt_lsb_minus4'] + 4)
-            slice_header['short_term_ref_pic_set_sps_flag'] = read_bool_safe(bs)
+            slice_header['slice_pic_order_cnt_lsb'] = rui(bs, sps['log2_max_pic_order_cnt_lsb_minus4'] + 4)
+            slice_header['short_term_ref_pic_set_sps_flag'] = rb(bs)
 
             num_short_term_ref_pic_sets = sps['num_short_term_ref_pic_sets']
 
@@ -2182,133 +2819,142 @@ def parse_slice_segment_header(bs, nal_unit_type, sps, pps):
                 stRpsIdx = num_short_term_ref_pic_sets
                 slice_header['short_term_ref_pic_set'] = parse_short_term_ref_pic_set(bs, stRpsIdx, num_short_term_ref_pic_sets)
             elif num_short_term_ref_pic_sets > 1:
-                bit_length = math.ceil(math.log2(num_short_term_ref_pic_sets))
-                slice_header['short_term_ref_pic_set_idx'] = read_uint_safe(bs, bit_length)
+                bit_length = ceil_log2(num_short_term_ref_pic_sets)
+                slice_header['short_term_ref_pic_set_idx'] = rui(bs, bit_length)
                 
             if sps.get('long_term_ref_pics_present_flag', False):
                 if sps.get('num_long_term_ref_pics_sps', 0) > 0:
-                    slice_header['num_long_term_sps'] = read_ue_safe(bs)
-                slice_header['num_long_term_pics'] = read_ue_safe(bs)
-
-                slice_header['lt_idx_sps'] = list()
-                slice_header['poc_lsb_lt'] = list()
-                slice_header['used_by_curr_pic_lt_flag'] = list()
-                slice_header['delta_poc_msb_present_flag'] = list()
-                slice_header['delta_poc_msb_cycle_lt'] = list()
-
-                num_long_term = slice_header['num_long_term_sps'] + slice_header['num_long_term_pics']
+                    slice_header['num_long_term_sps'] = ru(bs)
+                slice_header['num_long_term_pics'] = ru(bs)
+
+                lt_idx_sps = slice_header['lt_idx_sps'] = list()
+                poc_lsb_lt = slice_header['poc_lsb_lt'] = list()
+                used_by_curr_pic_lt_flag = slice_header['used_by_curr_pic_lt_flag'] = list()
+                delta_poc_msb_present_flag = slice_header['delta_poc_msb_present_flag'] = list()
+                delta_poc_msb_cycle_lt = slice_header['delta_poc_msb_cycle_lt'] = list()
+
+                num_long_term_sps = slice_header['num_long_term_sps']
+                num_long_term = num_long_term_sps + slice_header['num_long_term_pics']
+                lt_idx_bits = ceil_log2(sps['num_long_term_ref_pics_sps']) if num_long_term_sps > 0 else 0
+                poc_lsb_bits = sps['log2_max_pic_order_cnt_lsb_minus4'] + 4
                 for _ in range(num_long_term):
-                    if slice_header['num_long_term_sps'] > 0:
-                        if math.ceil(math.log2(sps['num_long_term_ref_pics_sps'])) != 0:
-                            slice_header['lt_idx_sps'].append(read_uint_safe(bs, math.ceil(math.log2(sps['num_long_term_ref_pics_sps']))))
-                        else:
-                            slice_header['lt_idx_sps'].append(None)
-                    slice_header['poc_lsb_lt'].append(read_uint_safe(bs, sps['log2_max_pic_order_cnt_lsb_minus4'] + 4))
-                    slice_header['used_by_curr_pic_lt_flag'].append(read_bool_safe(bs))
-                    slice_header['delta_poc_msb_present_flag'].append(read_bool_safe(bs))
-                    if slice_header['delta_poc_msb_present_flag'][-1]:
-                        slice_header['delta_poc_msb_cycle_lt'].append(read_ue_safe(bs))
+                    if num_long_term_sps > 0:
+                        lt_idx_sps.append(rui(bs, lt_idx_bits) if lt_idx_bits != 0 else None)
+                    # poc_lsb_lt and the two flags after it come out of one read
+                    value = rui(bs, poc_lsb_bits + 2)
+                    if value is None:
+                        poc_lsb_lt.append(rui(bs, poc_lsb_bits))
+                        used_by_curr_pic_lt_flag.append(rb(bs))
+                        msb_present = rb(bs)
                     else:
-                        slice_header['delta_poc_msb_cycle_lt'].append(None)
+                        poc_lsb_lt.append(value >> 2)
+                        used_by_curr_pic_lt_flag.append(bool(value & 2))
+                        msb_present = bool(value & 1)
+                    delta_poc_msb_present_flag.append(msb_present)
+                    delta_poc_msb_cycle_lt.append(ru(bs) if msb_present else None)
 
             if sps.get('sps_temporal_mvp_enabled_flag', False):
-                slice_header['slice_temporal_mvp_enabled_flag'] = read_bool_safe(bs)
+                slice_header['slice_temporal_mvp_enabled_flag'] = rb(bs)
 
         if sps.get('sample_adaptive_offset_enabled_flag', False):
-            slice_header['slice_sao_luma_flag']  = read_bool_safe(bs)
-            cfi = sps.get('chroma_format_idc', 1)
-            scp = sps.get('separate_colour_plane_flag', 0)
-            ChromaArrayType = 0 if (cfi == 3 and scp == 1) else cfi
+            slice_header['slice_sao_luma_flag']  = rb(bs)
             if ChromaArrayType != 0:
-                slice_header['slice_sao_chroma_flag'] = read_bool_safe(bs)
+                slice_header['slice_sao_chroma_flag'] = rb(bs)
 
         if slice_header['slice_type'] in ['B', 'P']:
-            slice_header['num_ref_idx_active_override_flag'] = read_bool_safe(bs)
+            slice_header['num_ref_idx_active_override_flag'] = rb(bs)
             if slice_header.get('num_ref_idx_active_override_flag'):
-                slice_header['num_ref_idx_l0_active_minus1'] = read_ue_safe(bs)
+                slice_header['num_ref_idx_l0_active_minus1'] = ru(bs)
                 if slice_header['slice_type'] == 'B':
-                    slice_header['num_ref_idx_l1_active_minus1'] = read_ue_safe(bs)
-
-            NumPocTotalurr = 0
-            for i in slice_header.get('short_term_ref_pic_set', {}).get('used_by_curr_pic_flag', []):
-                NumPocTotalurr += 1
-            for lt_flag in slice_header.get('used_by_curr_pic_lt_flag', []):
-                if lt_flag:
-                    NumPocTotalurr += 1
-            
-            if pps.get('lists_modification_present_flag', False) and NumPocTotalurr > 1:
+                    slice_header['num_ref_idx_l1_active_minus1'] = ru(bs)
+            else:
+                # Without an override the PPS defaults are the active counts
+                slice_header['num_ref_idx_l0_active_minus1'] = pps.get('num_ref_idx_l0_default_active_minus1')
+                if slice_header['slice_type'] == 'B':
+                    slice_header['num_ref_idx_l1_active_minus1'] = pps.get('num_ref_idx_l1_default_active_minus1')
+
+            NumPocTotalCurr = (len(slice_header.get('short_term_ref_pic_set', {}).get('used_by_curr_pic_flag', []))
+                               + sum(map(bool, slice_header.get('used_by_curr_pic_lt_flag', []))))
+
+            if pps.get('lists_modification_present_flag', False) and NumPocTotalCurr > 1:
                 slice_header['ref_pic_lists_modification'] = parse_ref_pic_lists_modification(bs, slice_header)
 
             if slice_header['slice_type'] == 'B':
-                slice_header['mvd_l1_zero_flag'] = read_bool_safe(bs)
+                slice_header['mvd_l1_zero_flag'] = rb(bs)
 
             if pps.get('cabac_init_present_flag', False):
-                slice_header['cabac_init_flag'] = read_bool_safe(bs)
+                slice_header['cabac_init_flag'] = rb(bs)
 
+            num_ref_idx_l0_active_minus1 = slice_header.get('num_ref_idx_l0_active_minus1')
+            num_ref_idx_l1_active_minus1 = slice_header.get('num_ref_idx_l1_active_minus1')
             if slice_header.get('slice_temporal_mvp_enabled_flag'):
                 if slice_header['slice_type'] == 'B':
-                    slice_header['collocated_from_l0_flag'] = read_bool_safe(bs)
-                if (slice_header.get('collocated_from_l0_flag') and slice_header.get('num_ref_idx_l0_active_minus1') is not None and slice_header.get('num_ref_idx_l0_active_minus1') > 0) or \
-                        (not slice_header.get('collocated_from_l0_flag') and slice_header.get(
-                            'num_ref_idx_l1_active_minus1') is not None and slice_header.get(
-                            'num_ref_idx_l1_active_minus1') > 0):
-                    slice_header['collocated_ref_idx'] = read_ue_safe(bs)
+                    slice_header['collocated_from_l0_flag'] = rb(bs)
+                # Not coded for P slices, where it is inferred to be 1
+                collocated_from_l0_flag = slice_header.get('collocated_from_l0_flag', True)
+                if (collocated_from_l0_flag and num_ref_idx_l0_active_minus1 is not None and num_ref_idx_l0_active_minus1 > 0) or \
+                        (not collocated_from_l0_flag and num_ref_idx_l1_active_minus1 is not None and num_ref_idx_l1_active_minus1 > 0):
+                    slice_header['collocated_ref_idx'] = ru(bs)
 
             if (pps.get('weighted_pred_flag', False) and slice_header['slice_type'] == 'P') or \
                     (pps.get('weighted_bipred_flag', False) and slice_header['slice_type'] == 'B'):
                 slice_header['pred_weight_table'] = parse_pred_weight_table(bs, slice_header, sps,
-                                                                            slice_header.get('num_ref_idx_l0_active_minus1'),
-                                                                            slice_header.get('num_ref_idx_l1_active_minus1'))
+                                                                            num_ref_idx_l0_active_minus1,
+                                                                            num_ref_idx_l1_active_minus1)
 
-            slice_header['five_minus_max_num_merge_cand'] = read_ue_safe(bs)
+            slice_header['five_minus_max_num_merge_cand'] = ru(bs)
 
             if sps.get('sps_scc_extension_flag', False):
                 scc_ext = sps.get('scc_extension', {})
                 if scc_ext.get('motion_vector_resolution_control_idc', 0) == 2:
-                    slice_header['use_integer_mv_flag'] = read_bool_safe(bs)
+                    slice_header['use_integer_mv_flag'] = rb(bs)
 
-        slice_header['slice_qp_delta'] = read_se_safe(bs)
+        slice_header['slice_qp_delta'] = rs(bs)
 
         if pps.get('pps_slice_chroma_qp_offsets_present_flag', False):
-            slice_header['slice_cb_qp_offset'] = read_se_safe(bs)
-            slice_header['slice_cr_qp_offset'] = read_se_safe(bs)
+            slice_header['slice_cb_qp_offset'] = rs(bs)
+            slice_header['slice_cr_qp_offset'] = rs(bs)
 
         if pps.get('pps_slice_act_qp_offsets_present_flag', False):
-            slice_header['slice_act_y_qp_offset'] = read_se_safe(bs)
-            slice_header['slice_act_cb_qp_offset'] = read_se_safe(bs)
-            slice_header['slice_act_cr_qp_offset'] = read_se_safe(bs)
+            slice_header['slice_act_y_qp_offset'] = rs(bs)
+            slice_header['slice_act_cb_qp_offset'] = rs(bs)
+            slice_header['slice_act_cr_qp_offset'] = rs(bs)
 
         if pps.get('pps_range_extension', {}):
             if pps['pps_range_extension'].get('chroma_qp_offset_list_enabled_flag', False):
-                slice_header['cu_chroma_qp_offset_enabled_flag'] = read_bool_safe(bs)
+                slice_header['cu_chroma_qp_offset_enabled_flag'] = rb(bs)
 
         if pps.get('deblocking_filter_override_enabled_flag', False):
-            slice_header['deblocking_filter_override_flag'] = read_bool_safe(bs)
+            slice_header['deblocking_filter_override_flag'] = rb(bs)
         if slice_header.get('deblocking_filter_override_flag'):
-            slice_header['slice_deblocking_filter_disabled_flag'] = read_bool_safe(bs)
+            slice_header['slice_deblocking_filter_disabled_flag'] = rb(bs)
             if not slice_header.get('slice_deblocking_filter_disabled_flag'):
-                slice_header['slice_beta_offset_div2'] = read_se_safe(bs)
-                slice_header['slice_tc_offset_div2'] = read_se_safe(bs)
+                slice_header['slice_beta_offset_div2'] = rs(bs)
+                slice_header['slice_tc_offset_div2'] = rs(bs)
 
         if pps.get('pps_loop_filter_across_slices_enabled_flag', False) and (slice_header.get('slice_sao_luma_flag') or slice_header.get('slice_sao_chroma_flag') or not slice_header.get('slice_deblocking_filter_disabled_flag')):
-            slice_header['slice_loop_filter_across_slices_enabled_flag'] = read_bool_safe(bs)
+            slice_header['slice_loop_filter_across_slices_enabled_flag'] = rb(bs)
 
 
     if pps.get('tiles_enabled_flag', False) or pps.get('entropy_coding_sync_enabled_flag', False):
-        slice_header['num_entry_point_offsets'] = read_ue_safe(bs)
+        slice_header['num_entry_point_offsets'] = ru(bs)
         if slice_header.get('num_entry_point_offsets') is not None:
             if slice_header['num_entry_point_offsets'] > 0:
-                slice_header['offset_len_minus1'] = read_ue_safe(bs)
+                slice_header['offset_len_minus1'] = ru(bs)
                 if slice_header['num_entry_point_offsets'] > 1000:
                     slice_header['entry_point_offset_minus1'] = [None]
+                    # Not kept, but still stepped over (as far as whole offsets fit) so the fields after them line up
+                    if slice_header['offset_len_minus1'] is not None:
+                        offset_bits = slice_header['offset_len_minus1'] + 1
+                        bs.pos += min(slice_header['num_entry_point_offsets'], (bs.len - bs.pos) // offset_bits) * offset_bits
                 else:
                     slice_header['entry_point_offset_minus1'] = [
-                        read_uint_safe(bs, slice_header['offset_len_minus1'] + 1) for _ in
+                        rui(bs, slice_header['offset_len_minus1'] + 1) for _ in
                         range(slice_header['num_entry_point_offsets'])]
 
     if pps.get('slice_segment_header_extension_present_flag', False):
-        slice_header['slice_segment_header_extension_length'] = read_ue_safe(bs)
-        slice_header['slice_segment_header_extension_data_byte'] = [read_uint_safe(bs, 8) for _ in range(
+        slice_header['slice_segment_header_extension_length'] = ru(bs)
+        slice_header['slice_segment_header_extension_data_byte'] = [rui(bs, 8) for _ in range(
             slice_header['slice_segment_header_extension_length'])]
 
     byte_alignment(bs)
@@ -2320,16 +2966,12 @@ def parse_ref_pic_lists_modification(bs, slice_header):
 
     ref_pic_list_modification['ref_pic_list_modification_flag_l0'] = read_bool_safe(bs)
     if ref_pic_list_modification['ref_pic_list_modification_flag_l0']:
-        ref_pic_list_modification['list_entry_l0'] = []
-        for i in range(slice_header['num_ref_idx_l0_active_minus1'] + 1):
-            ref_pic_list_modification['list_entry_l0'].append(read_ue_safe(bs))
+        ref_pic_list_modification['list_entry_l0'] = read_ues_safe(bs, slice_header['num_ref_idx_l0_active_minus1'] + 1)
 
     if slice_header['slice_type'] == 'B':
         ref_pic_list_modification['ref_pic_list_modification_flag_l1'] = read_bool_safe(bs)
         if ref_pic_list_modification['ref_pic_list_modification_flag_l1']:
-            ref_pic_list_modification['list_entry_l1'] = []
-            for i in range(slice_header['num_ref_idx_l1_active_minus1'] + 1):
-                ref_pic_list_modification['list_entry_l1'].append(read_ue_safe(bs))
+            ref_pic_list_modification['list_entry_l1'] = read_ues_safe(bs, slice_header['num_ref_idx_l1_active_minus1'] + 1)
 
     return ref_pic_list_modification
 
@@ -2342,46 +2984,44 @@ def parse_pred_weight_table(bs, slice_header, sps, num_ref_idx_l0_active_minus1,
     if ChromaArrayType != 0:
         pred_weight_table['delta_chroma_log2_weight_denom'] = read_se_safe(bs)
 
-    pred_weight_table['luma_weight_l0'] = []
-    pred_weight_table['luma_offset_l0'] = []
-    pred_weight_table['chroma_weight_l0'] = []
-    pred_weight_table['chroma_offset_l0'] = []
     if num_ref_idx_l0_active_minus1 is not None:
-        for i in range(num_ref_idx_l0_active_minus1 + 1):
-            pred_weight_table['luma_weight_l0_flag'] = read_bool_safe(bs)
-            if pred_weight_table['luma_weight_l0_flag']:
-                pred_weight_table['luma_weight_l0'].append(read_se_safe(bs))
-                pred_weight_table['luma_offset_l0'].append(read_se_safe(bs))
-            if ChromaArrayType != 0:
-                pred_weight_table['chroma_weight_l0_flag'] = read_bool_safe(bs)
-                if pred_weight_table['chroma_weight_l0_flag']:
-                    pred_weight_table['delta_chroma_weight_l0'] = [[read_se_safe(bs) for _ in range(2)] for _ in range(num_ref_idx_l0_active_minus1 + 1)]
-                    pred_weight_table['delta_chroma_offset_l0'] = [[read_se_safe(bs) for _ in range(2)] for _ in range(num_ref_idx_l0_active_minus1 + 1)]
-
-    if num_ref_idx_l1_active_minus1 is not None:
-        if slice_header['slice_type'] == 'B':  # B-frame
-            pred_weight_table['luma_weight_l1'] = []
-            pred_weight_table['luma_offset_l1'] = []
-            pred_weight_table['chroma_weight_l1'] = []
-            pred_weight_table['chroma_offset_l1'] = []
-
-            for i in range(num_ref_idx_l1_active_minus1 + 1):
-                pred_weight_table['luma_weight_l1_flag'] = read_bool_safe(bs)
-                if pred_weight_table['luma_weight_l1_flag']:
-                    pred_weight_table['luma_weight_l1'].append(read_se_safe(bs))
-                    pred_weight_table['luma_offset_l1'].append(read_se_safe(bs))
-                if ChromaArrayType != 0:
-                    pred_weight_table['chroma_weight_l1_flag'] = read_bool_safe(bs)
-                    if pred_weight_table['chroma_weight_l1_flag']:
-                        pred_weight_table['delta_chroma_weight_l1'] = [[read_se_safe(bs) for _ in range(2)] for _ in range(num_ref_idx_l1_active_minus1 + 1)]
-                        pred_weight_table['delta_chroma_offset_l1'] = [[read_se_safe(bs) for _ in range(2)] for _ in range(num_ref_idx_l1_active_minus1 + 1)]
+        _parse_pred_weight_list(bs, pred_weight_table, 'l0', num_ref_idx_l0_active_minus1, ChromaArrayType)
+    if num_ref_idx_l1_active_minus1 is not None and slice_header['slice_type'] == 'B':
+        _parse_pred_weight_list(bs, pred_weight_table, 'l1', num_ref_idx_l1_active_minus1, ChromaArrayType)
 
     return pred_weight_table
 
+def _parse_pred_weight_list(bs, pred_weight_table, lx, num_ref_idx_active_minus1, ChromaArrayType):
+    num_refs = num_ref_idx_active_minus1 + 1
+    rb, rs = read_bool_safe, read_se_safe
+    # All luma flags, then all chroma flags, then the weights of each reference whose flag is set
+    luma_weight_flag = [rb(bs) for _ in range(num_refs)]
+    chroma_weight_flag = [rb(bs) for _ in range(num_refs)] if ChromaArrayType != 0 else [False] * num_refs
+    luma_weight = [None] * num_refs
+    luma_offset = [None] * num_refs
+    delta_chroma_weight = [None] * num_refs
+    delta_chroma_offset = [None] * num_refs
+    for i in range(num_refs):
+        if luma_weight_flag[i]:
+            luma_weight[i] = rs(bs)
+            luma_offset[i] = rs(bs)
+        if chroma_weight_flag[i]:
+            cb_weight, cb_offset, cr_weight, cr_offset = rs(bs), rs(bs), rs(bs), rs(bs)
+            delta_chroma_weight[i] = [cb_weight, cr_weight]
+            delta_chroma_offset[i] = [cb_offset, cr_offset]
+    pred_weight_table[f'luma_weight_{lx}_flag'] = luma_weight_flag
+    if ChromaArrayType != 0:
+        pred_weight_table[f'chroma_weight_{lx}_flag'] = chroma_weight_flag
+    pred_weight_table[f'luma_weight_{lx}'] = luma_weight
+    pred_weight_table[f'luma_offset_{lx}'] = luma_offset
+    if ChromaArrayType != 0:
+        pred_weight_table[f'delta_chroma_weight_{lx}'] = delta_chroma_weight
+        pred_weight_table[f'delta_chroma_offset_{lx}'] = delta_chroma_offset
+
 
 
 def parse_aud(data):
-    bs = BitStream(data)
+    bs = BitReader(data)
     aud = {}
     aud['primary_pic_type'] = read_uint_safe(bs, 3)
     return aud
@@ -2393,73 +3033,74 @@ def parse_eob(data):
     return {}
 
 def parse_fd(data):
-    bs = BitStream(data)
+    bs = BitReader(data)
     fd = {}
     fd['fd_intensity_compensation_flag'] = read_bool_safe(bs)
     return fd
 
 def parse_vui_parameters(bs, sps):
+    rb, ru, rui = read_bool_safe, read_ue_safe, read_uint_safe
     vui = {}
 
-    vui['aspect_ratio_info_present_flag'] = read_bool_safe(bs)
+    vui['aspect_ratio_info_present_flag'] = rb(bs)
     if vui['aspect_ratio_info_present_flag']:
-        vui['aspect_ratio_idc'] = read_uint_safe(bs, 8)
+        vui['aspect_ratio_idc'] = rui(bs, 8)
         if vui['aspect_ratio_idc'] == 255:  # EXTENDED_SAR
-            vui['sar_width'] = read_uint_safe(bs, 16)
-            vui['sar_height'] = read_uint_safe(bs, 16)
+            vui['sar_width'] = rui(bs, 16)
+            vui['sar_height'] = rui(bs, 16)
 
-    vui['overscan_info_present_flag'] = read_bool_safe(bs)
+    vui['overscan_info_present_flag'] = rb(bs)
     if vui['overscan_info_present_flag']:
-        vui['overscan_appropriate_flag'] = read_bool_safe(bs)
+        vui['overscan_appropriate_flag'] = rb(bs)
 
-    vui['video_signal_type_present_flag'] = read_bool_safe(bs)
+    vui['video_signal_type_present_flag'] = rb(bs)
     if vui['video_signal_type_present_flag']:
-        vui['video_format'] = read_uint_safe(bs, 3)
-        vui['video_full_range_flag'] = read_bool_safe(bs)
-        vui['colour_description_present_flag'] = read_bool_safe(bs)
+        vui['video_format'] = rui(bs, 3)
+        vui['video_full_range_flag'] = rb(bs)
+        vui['colour_description_present_flag'] = rb(bs)
         if vui['colour_description_present_flag']:
-            vui['colour_primaries'] = read_uint_safe(bs, 8)
-            vui['transfer_characteristics'] = read_uint_safe(bs, 8)
-            vui['matrix_coeffs'] = read_uint_safe(bs, 8)
+            vui['colour_primaries'] = rui(bs, 8)
+            vui['transfer_characteristics'] = rui(bs, 8)
+            vui['matrix_coeffs'] = rui(bs, 8)
 
-    vui['chroma_loc_info_present_flag'] = read_bool_safe(bs)
+    vui['chroma_loc_info_present_flag'] = rb(bs)
     if vui['chroma_loc_info_present_flag']:
-        vui['chroma_sample_loc_type_top_field'] = read_ue_safe(bs)
-        vui['chroma_sample_loc_type_bottom_field'] = read_ue_safe(bs)
+        vui['chroma_sample_loc_type_top_field'] = ru(bs)
+        vui['chroma_sample_loc_type_bottom_field'] = ru(bs)
 
-    vui['neutral_chroma_indication_flag'] = read_bool_safe(bs)
-    vui['field_seq_flag'] = read_bool_safe(bs)
-    vui['frame_field_info_present_flag'] = read_bool_safe(bs)
-    vui['default_display_window_flag'] = read_bool_safe(bs)
+    vui['neutral_chroma_indication_flag'] = rb(bs)
+    vui['field_seq_flag'] = rb(bs)
+    vui['frame_field_info_present_flag'] = rb(bs)
+    vui['default_display_window_flag'] = rb(bs)
     if vui['default_display_window_flag']:
-        vui['def_disp_win_left_offset'] = read_ue_safe(bs)
-        vui['def_disp_win_right_offset'] = read_ue_safe(bs)
-        vui['def_disp_win_top_offset'] = read_ue_safe(bs)
-        vui['def_disp_win_bottom_offset'] = read_ue_safe(bs)
+        vui['def_disp_win_left_offset'] = ru(bs)
+        vui['def_disp_win_right_offset'] = ru(bs)
+        vui['def_disp_win_top_offset'] = ru(bs)
+        vui['def_disp_win_bottom_offset'] = ru(bs)
 
-    vui['vui_timing_info_present_flag'] = read_bool_safe(bs)
+    vui['vui_timing_info_present_flag'] = rb(bs)
     if vui['vui_timing_info_present_flag']:
-        vui['vui_num_units_in_tick'] = read_uint_safe(bs, 32)
-        vui['vui_time_scale'] = read_uint_safe(bs, 32)
-        vui['vui_poc_proportional_to_timing_flag'] = read_bool_safe(bs)
+        vui['vui_num_units_in_tick'] = rui(bs, 32)
+        vui['vui_time_scale'] = rui(bs, 32)
+        vui['vui_poc_proportional_to_timing_flag'] = rb(bs)
         if vui['vui_poc_proportional_to_timing_flag']:
-            vui['vui_num_ticks_poc_diff_one_minus1'] = read_ue_safe(bs)
+            vui['vui_num_ticks_poc_diff_one_minus1'] = ru(bs)
 
-    vui['vui_hrd_parameters_present_flag'] = read_bool_safe(bs)
+    vui['vui_hrd_parameters_present_flag'] = rb(bs)
     if vui['vui_hrd_parameters_present_flag']:
         vui['hrd_parameters'] = parse_hrd_parameters(bs, True,
                                                      sps.get('sps_max_sub_layers_minus1'))  # Assuming values based on common_inf_present_flag and max_num_sub_layers_minus1
 
-    vui['bitstream_restriction_flag'] = read_bool_safe(bs)
+    vui['bitstream_restriction_flag'] = rb(bs)
     if vui['bitstream_restriction_flag']:
-        vui['tiles_fixed_structure_flag'] = read_bool_safe(bs)
-        vui['motion_vectors_over_pic_boundaries_flag'] = read_bool_safe(bs)
-        vui['restricted_ref_pic_lists_flag'] = read_bool_safe(bs)
-        vui['min_spatial_segmentation_idc'] = read_ue_safe(bs)
-        vui['max_bytes_per_pic_denom'] = read_ue_safe(bs)
-        vui['max_bits_per_min_cu_denom'] = read_ue_safe(bs)
-        vui['log2_max_mv_length_horizontal'] = read_ue_safe(bs)
-        vui['log2_max_mv_length_vertical'] = read_ue_safe(bs)
+        vui['tiles_fixed_structure_flag'] = rb(bs)
+        vui['motion_vectors_over_pic_boundaries_flag'] = rb(bs)
+        vui['restricted_ref_pic_lists_flag'] = rb(bs)
+        vui['min_spatial_segmentation_idc'] = ru(bs)
+        vui['max_bytes_per_pic_denom'] = ru(bs)
+        vui['max_bits_per_min_cu_denom'] = ru(bs)
+        vui['log2_max_mv_length_horizontal'] = ru(bs)
+        vui['log2_max_mv_length_vertical'] = ru(bs)
 
     return vui
 
@@ -2501,50 +3142,41 @@ def parse_hrd_parameters(bs, common_inf_present_flag, max_num_sub_layers_minus1)
 
     for i in range(max_num_sub_layers_minus1 + 1):
         hrd['fixed_pic_rate_general_flag'].append(read_bool_safe(bs))
+        # fixed_pic_rate_within_cvs_flag is inferred to be 1 when the general flag is set
         if not hrd['fixed_pic_rate_general_flag'][i]:
             hrd['fixed_pic_rate_within_cvs_flag'].append(read_bool_safe(bs))
         else:
-            hrd['fixed_pic_rate_within_cvs_flag'].append(0)
+            hrd['fixed_pic_rate_within_cvs_flag'].append(1)
+        # low_delay_hrd_flag is only coded without elemental_duration_in_tc_minus1, and is 0 otherwise
         if hrd['fixed_pic_rate_within_cvs_flag'][i]:
             hrd['elemental_duration_in_tc_minus1'].append(read_ue_safe(bs))
+            hrd['low_delay_hrd_flag'].append(False)
         else:
             hrd['elemental_duration_in_tc_minus1'].append(None)
-        hrd['low_delay_hrd_flag'].append(read_bool_safe(bs))
+            hrd['low_delay_hrd_flag'].append(read_bool_safe(bs))
+        # cpb_cnt_minus1 is inferred to be 0 when not present
         if not hrd['low_delay_hrd_flag'][i]:
             hrd['cpb_cnt_minus1'].append(read_ue_safe(bs))
         else:
-            hrd['cpb_cnt_minus1'].append(None)
+            hrd['cpb_cnt_minus1'].append(0)
 
-        if hrd['nal_hrd_parameters_present_flag'] or hrd['vcl_hrd_parameters_present_flag']:
-            if hrd['cpb_cnt_minus1'][i] is not None:
+        # sub_layer_hrd_parameters(i) for the NAL HRD, then again for the VCL HRD
+        if hrd['cpb_cnt_minus1'][i] is not None:
+            for present_flag in ('nal_hrd_parameters_present_flag', 'vcl_hrd_parameters_present_flag'):
+                if not hrd[present_flag]:
+                    continue
                 for j in range(hrd['cpb_cnt_minus1'][i] + 1):
-                    if hrd['nal_hrd_parameters_present_flag']:
-                        hrd['bit_rate_value_minus1'].append(read_ue_safe(bs))
-                        hrd['cpb_size_value_minus1'].append(read_ue_safe(bs))
-                        if hrd['sub_pic_hrd_params_present_flag']:
-                            hrd['cpb_size_du_value_minus1'].append(read_ue_safe(bs))
-                            hrd['bit_rate_du_value_minus1'].append(read_ue_safe(bs))
-                        hrd['cbr_flag'].append(read_bool_safe(bs))
-
-                    if hrd['vcl_hrd_parameters_present_flag']:
-                        hrd['bit_rate_value_minus1'].append(read_ue_safe(bs))
-                        hrd['cpb_size_value_minus1'].append(read_ue_safe(bs))
-                        if hrd['sub_pic_hrd_params_present_flag']:
-                            hrd['cpb_size_du_value_minus1'].append(read_ue_safe(bs))
-                            hrd['bit_rate_du_value_minus1'].append(read_ue_safe(bs))
-                        hrd['cbr_flag'].append(read_bool_safe(bs))
+                    hrd['bit_rate_value_minus1'].append(read_ue_safe(bs))
+                    hrd['cpb_size_value_minus1'].append(read_ue_safe(bs))
+                    if hrd['sub_pic_hrd_params_present_flag']:
+                        hrd['cpb_size_du_value_minus1'].append(read_ue_safe(bs))
+                        hrd['bit_rate_du_value_minus1'].append(read_ue_safe(bs))
+                    hrd['cbr_flag'].append(read_bool_safe(bs))
 
     return hrd
 
 
 def byte_alignment(bs):
-    while bs.pos % 8 != 0:
-        bit = bs.read(1)
-        if bs.pos % 8 == 0:
-            if bit != 1:
-                pass
-                # print(f"Warning: last bit before byte alignment is not 1 (got {bit})")
-        else:
-            if bit != 0:
-                pass
-                # print(f"Warning: non-last bit before byte alignment is not 0 (got {bit})")
\ No newline at end of file
+    # Skip to the byte boundary in one read; the alignment bit values are not checked
+    if bs.pos & 7:
+        bs.read_uint(8 - (bs.pos & 7))
\ No newline at end of file